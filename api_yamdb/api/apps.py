@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from api_yamdb import slow_queries, sqlite
+        from reviews import changes
+        from . import list_counts, title_cache, title_documents
+
+        connection_created.connect(sqlite.on_connection_created)
+        connection_created.connect(slow_queries.on_connection_created)
+        changes.connect()
+        list_counts.connect()
+        # Документы обновляются раньше сброса кэша: иначе промах кэша
+        # успеет прочитать и закэшировать старый документ.
+        changes.subscribe(title_documents.refresh_documents)
+        changes.subscribe(title_cache.invalidate)
+        changes.subscribe(list_counts.titles_changed)
@@ -0,0 +1,80 @@
+"""
+JWT-аутентификация с кэшем проверенных токенов.
+
+Клиент присылает один и тот же access-токен в каждом запросе, а
+JWTAuthentication каждый раз заново проверяет подпись и разбирает
+claims. Здесь успешно проверенный токен запоминается в LRU-кэше
+процесса размером JWT_VERIFIED_CACHE_SIZE и до истечения срока
+(claim exp) берётся оттуда. В кэш попадают только прошедшие проверку
+токены, поэтому подделать запись нельзя. Пользователь по-прежнему
+загружается из базы на каждый запрос, так что деактивация учётной
+записи действует сразу.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api_yamdb import metrics
+
+
+class VerifiedTokenCache:
+
+    def __init__(self):
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            entry = self.tokens.get(raw_token)
+            if entry is None:
+                return None
+            token, expires = entry
+            if expires <= time.time():
+                del self.tokens[raw_token]
+                return None
+            self.tokens.move_to_end(raw_token)
+            return token
+
+    def set(self, raw_token, token, size):
+        with self.lock:
+            self.tokens[raw_token] = (token, token['exp'])
+            self.tokens.move_to_end(raw_token)
+            while len(self.tokens) > size:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+def reset():
+    """Блокировка кэша могла быть захвачена в момент fork."""
+    global verified_tokens
+    verified_tokens = VerifiedTokenCache()
+
+
+os.register_at_fork(after_in_child=reset)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_validated_token(self, raw_token):
+        size = settings.JWT_VERIFIED_CACHE_SIZE
+        if not size:
+            return super().get_validated_token(raw_token)
+        token = verified_tokens.get(raw_token)
+        metrics.inc(
+            'yamdb_cache_requests_total', cache='jwt',
+            result='miss' if token is None else 'hit'
+        )
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            verified_tokens.set(raw_token, token, size)
+        return token
@@ -1,14 +1,91 @@
+from django.db.models import Count, Exists, OuterRef
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
 from reviews.models import Title
 
+GENRE_MATCH_ANY = 'any'
+GENRE_MATCH_ALL = 'all'
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Фильтр по списку значений через запятую: ?category=films,books."""
+
 
 class TitleFilter(filters.FilterSet):
+    """
+    Фильтры произведений.
+
+    Диапазоны по году, рейтингу и числу отзывов сравнивают
+    индексированные колонки Title. Жанры проверяются подзапросом
+    по промежуточной таблице, поэтому строки произведений
+    не дублируются.
+    """
     name = filters.CharFilter(field_name='name', lookup_expr='exact')
-    category = filters.CharFilter(
-        field_name='category__slug', lookup_expr='exact'
+    category = CharInFilter(field_name='category__slug', lookup_expr='in')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=((GENRE_MATCH_ANY, GENRE_MATCH_ANY),
+                 (GENRE_MATCH_ALL, GENRE_MATCH_ALL)),
+        method='filter_noop'
+    )
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    min_reviews = filters.NumberFilter(
+        field_name='review_count', lookup_expr='gte'
     )
-    genre = filters.CharFilter(field_name='genre__slug', lookup_expr='exact')
 
     class Meta:
         model = Title
         fields = ['name', 'category', 'genre', 'year']
+
+    def filter_noop(self, queryset, name, value):
+        # Значение читается в filter_genre.
+        return queryset
+
+    def filter_genre(self, queryset, name, value):
+        slugs = set(value)
+        if not slugs:
+            return queryset
+        title_genres = Title.genre.through.objects.filter(
+            genre__slug__in=slugs
+        )
+        if self.form.cleaned_data.get('genre_match') == GENRE_MATCH_ALL:
+            matching = title_genres.values('title_id').annotate(
+                matched=Count('genre_id')
+            ).filter(matched=len(slugs)).values('title_id')
+            return queryset.filter(pk__in=matching)
+        return queryset.filter(
+            Exists(title_genres.filter(title_id=OuterRef('pk')))
+        )
+
+
+class StrictOrderingFilter(OrderingFilter):
+    """
+    Сортировка только по полям из ordering_fields вьюсета.
+
+    Поля в ordering_fields должны быть покрыты индексом или
+    денормализованной колонкой. Неизвестное поле в ?ordering=
+    не игнорируется молча, а возвращает ошибку 400.
+    """
+
+    def get_valid_fields(self, queryset, view, context={}):
+        fields = getattr(view, 'ordering_fields', None) or ()
+        return [(field, field) for field in fields]
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid_fields = {
+            field for field, _ in self.get_valid_fields(queryset, view)
+        }
+        invalid_fields = [
+            term for term in fields if term.lstrip('-') not in valid_fields
+        ]
+        if invalid_fields:
+            raise ValidationError({self.ordering_param: [
+                'Сортировка по полям {} не поддерживается.'.format(
+                    ', '.join(invalid_fields)
+                )
+            ]})
+        return fields
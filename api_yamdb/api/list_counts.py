@@ -0,0 +1,113 @@
+"""
+Кэш числа объектов для списков без собственного счётчика.
+
+Списки произведений, жанров, категорий и пользователей не хранят
+счётчик в строке родителя, как отзывы и комментарии, поэтому
+пагинация берёт COUNT(*) отсюда. Значение хранится под ключом
+с хэшем SQL запроса вместе с версией модели, для которой оно
+посчитано. Изменения модели после коммита транзакции заменяют её
+версию; произведения меняют версию через конвейер reviews.changes.
+
+Как и в кэше карточек (api.title_cache), версия читается до подсчёта,
+а кэш должен быть общим для процессов: если LIST_COUNT_CACHE_ALIAS —
+кэш памяти процесса, число каждый раз считается запросом. Записи
+в обход сигналов (bulk_create в load_data) видны не позже чем через
+LIST_COUNT_CACHE_TIMEOUT.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from reviews.models import Category, Genre, Title
+
+from api_yamdb import metrics
+
+COUNT_KEY = 'list-count:{}'
+VERSION_KEY = 'list-count-version:{}'
+
+tracked = set()
+
+
+def get_cache():
+    return caches[settings.LIST_COUNT_CACHE_ALIAS]
+
+
+def is_enabled():
+    return not isinstance(get_cache(), LocMemCache)
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def query_key(queryset):
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.sha1(repr((sql, params)).encode()).hexdigest()
+    return COUNT_KEY.format(digest)
+
+
+def get_count(queryset):
+    """
+    Возвращает число объектов queryset, по возможности из кэша.
+    None, если модель не отслеживается или кэш выключен.
+    """
+    label = queryset.model._meta.label_lower
+    if label not in tracked or not is_enabled():
+        return None
+    cache = get_cache()
+    count_key = query_key(queryset)
+    version_key = VERSION_KEY.format(label)
+    values = cache.get_many([count_key, version_key])
+    version, entry = values.get(version_key), values.get(count_key)
+    if version is not None and entry and entry['version'] == version:
+        metrics.inc(
+            'yamdb_cache_requests_total', cache='list_count', result='hit'
+        )
+        return entry['count']
+    metrics.inc(
+        'yamdb_cache_requests_total', cache='list_count', result='miss'
+    )
+    if version is None:
+        version = new_version()
+        if not cache.add(version_key, version, timeout=None):
+            version = cache.get(version_key, version)
+    count = queryset.count()
+    cache.set(
+        count_key, {'version': version, 'count': count},
+        timeout=settings.LIST_COUNT_CACHE_TIMEOUT
+    )
+    return count
+
+
+def invalidate(model):
+    """Меняет версию модели после коммита, её числа пересчитываются."""
+    label = model._meta.label_lower
+
+    def replace_version():
+        if is_enabled():
+            get_cache().set(VERSION_KEY.format(label), new_version(),
+                            timeout=None)
+
+    transaction.on_commit(replace_version)
+
+
+def titles_changed(title_ids):
+    # Вызывается конвейером reviews.changes уже после коммита.
+    invalidate(Title)
+
+
+def model_changed(sender, **kwargs):
+    invalidate(sender)
+
+
+def connect():
+    tracked.add(Title._meta.label_lower)
+    for model in (Category, Genre, get_user_model()):
+        tracked.add(model._meta.label_lower)
+        post_save.connect(model_changed, sender=model)
+        post_delete.connect(model_changed, sender=model)
@@ -0,0 +1,83 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from api.authentication import verified_tokens
+from api_yamdb.loadtest import percentile
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures token issuance and authenticated GET throughput, '
+        'in-process on a scratch copy of the schema'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            self.run_benchmark(options['requests'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run_benchmark(self, count):
+        user = User.objects.create(
+            username='benchmark', email='benchmark@example.com'
+        )
+        self.stdout.write(f'{count} iterations per case')
+        self.stdout.write(f'{"case":<34}{"per s":>10}{"p50":>9}{"p99":>9}')
+        self.report('issue: refresh + access', self.measure(
+            count, lambda: str(RefreshToken.for_user(user).access_token)
+        ))
+        self.report('issue: access only', self.measure(
+            count, lambda: str(AccessToken.for_user(user))
+        ))
+
+        client = APIClient()
+        code = default_token_generator.make_token(user)
+        self.report('POST /auth/token/', self.measure(
+            count, lambda: client.post('/api/v1/auth/token/', data={
+                'username': user.username, 'confirmation_code': code
+            })
+        ))
+
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        size = settings.JWT_VERIFIED_CACHE_SIZE
+        try:
+            for name, cache_size in (('no cache', 0), ('LRU cache', size)):
+                settings.JWT_VERIFIED_CACHE_SIZE = cache_size
+                verified_tokens.clear()
+                self.report(f'GET /users/me/, {name}', self.measure(
+                    count, lambda: client.get('/api/v1/users/me/')
+                ))
+        finally:
+            settings.JWT_VERIFIED_CACHE_SIZE = size
+
+    def measure(self, count, func):
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(count):
+            request_started = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - request_started)
+        return latencies, time.perf_counter() - started
+
+    def report(self, name, stats):
+        latencies, elapsed = stats
+        self.stdout.write(
+            f'{name:<34}{len(latencies) / elapsed:>10.0f}'
+            f'{percentile(latencies, 50) * 1000:>7.2f}ms'
+            f'{percentile(latencies, 99) * 1000:>7.2f}ms'
+        )
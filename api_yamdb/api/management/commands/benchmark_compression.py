@@ -0,0 +1,91 @@
+import random
+import time
+
+from django.core.cache import caches
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import TitleSerializerGet
+from api_yamdb.compression import COMPRESSORS, compress_cached
+from reviews.models import Title
+
+WORDS = (
+    'фильм', 'книга', 'музыка', 'история', 'герой', 'финал', 'сюжет',
+    'автор', 'жанр', 'драма', 'комедия', 'эпоха', 'роман', 'песня',
+)
+
+
+class Command(BaseCommand):
+    help = 'Measures CPU cost and bytes saved by response compression'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--titles', type=int, default=10,
+            help='Titles per payload (one API page by default).'
+        )
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument(
+            '--synthetic', action='store_true',
+            help='Use generated titles instead of the database.'
+        )
+
+    def handle(self, *args, **options):
+        payload = self.build_payload(options['titles'], options['synthetic'])
+        iterations = options['iterations']
+        self.stdout.write(
+            f'Payload: {len(payload)} bytes, {iterations} iterations'
+        )
+        self.stdout.write(
+            f'{"encoding":<10}{"bytes":>10}{"ratio":>8}{"saved":>10}'
+            f'{"ms/resp":>10}{"MB/s":>9}{"cached ms":>11}'
+        )
+        for encoding, compress in COMPRESSORS.items():
+            compressed = compress(payload)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                compress(payload)
+            elapsed = (time.perf_counter() - started) / iterations
+
+            caches[settings.COMPRESSION_CACHE_ALIAS].clear()
+            compress_cached(payload, encoding)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                compress_cached(payload, encoding)
+            cached = (time.perf_counter() - started) / iterations
+
+            self.stdout.write(
+                f'{encoding:<10}{len(compressed):>10}'
+                f'{len(payload) / len(compressed):>8.1f}'
+                f'{len(payload) - len(compressed):>10}'
+                f'{elapsed * 1000:>10.3f}'
+                f'{len(payload) / elapsed / 1e6:>9.1f}'
+                f'{cached * 1000:>11.3f}'
+            )
+
+    def build_payload(self, count, synthetic):
+        if not synthetic:
+            titles = Title.objects.visible().select_related(
+                'category'
+            ).prefetch_related('genre')[:count]
+            data = TitleSerializerGet(titles, many=True).data
+            if data:
+                return JSONRenderer().render({'results': data})
+
+        generator = random.Random(0)
+        data = [
+            {
+                'id': index,
+                'name': f'Произведение {index}',
+                'year': generator.randint(1900, 2024),
+                'rating': round(generator.uniform(1, 10), 1),
+                'review_count': generator.randint(0, 500),
+                'description': ' '.join(
+                    generator.choice(WORDS) for _ in range(80)
+                ),
+                'genre': [{'name': 'Драма', 'slug': 'drama'}],
+                'category': {'name': 'Фильм', 'slug': 'movie'},
+            }
+            for index in range(count)
+        ]
+        return JSONRenderer().render({'results': data})
@@ -0,0 +1,151 @@
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api_yamdb.loadtest import percentile
+from api_yamdb.sqlite import apply_pragmas
+
+SCHEMA = (
+    'CREATE TABLE title (id INTEGER PRIMARY KEY, review_count INTEGER)',
+    'CREATE TABLE review (id INTEGER PRIMARY KEY, title_id INTEGER, '
+    'author_id INTEGER, score INTEGER, text TEXT, pub_date REAL)',
+    'CREATE INDEX review_title_date ON review (title_id, pub_date)',
+)
+READ_SQL = (
+    'SELECT id, author_id, score, text FROM review WHERE title_id = ? '
+    'ORDER BY pub_date DESC LIMIT 10'
+)
+# Как POST отзыва: вставка и обновление счётчика в одной транзакции.
+WRITE_SQL = (
+    'INSERT INTO review (title_id, author_id, score, text, pub_date) '
+    'VALUES (?, ?, ?, ?, ?)',
+    'UPDATE title SET review_count = review_count + 1 WHERE id = ?',
+)
+# Таймаут sqlite3.connect по умолчанию, с ним работает бэкенд Django.
+DEFAULT_TIMEOUT = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures SQLite read and write throughput with concurrent threads '
+        'with default settings and with SQLITE_PRAGMAS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=5)
+        parser.add_argument('--titles', type=int, default=100)
+        parser.add_argument('--reviews', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{options["readers"]} readers, {options["writers"]} writers, '
+            f'{options["duration"]}s per run'
+        )
+        self.stdout.write(
+            f'{"config":<10}{"reads/s":>10}{"writes/s":>10}'
+            f'{"locked":>8}{"read p99":>10}{"write p99":>11}'
+        )
+        for name, pragmas in (
+            ('default', {}), ('tuned', settings.SQLITE_PRAGMAS)
+        ):
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory) / 'benchmark.sqlite3'
+                self.seed(path, pragmas, options)
+                self.report(name, self.run(path, pragmas, options), options)
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(
+            path, timeout=DEFAULT_TIMEOUT, isolation_level=None,
+            check_same_thread=False
+        )
+        apply_pragmas(connection, pragmas)
+        return connection
+
+    def seed(self, path, pragmas, options):
+        connection = self.connect(path, pragmas)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        generator = random.Random(0)
+        connection.execute('BEGIN')
+        connection.executemany(
+            'INSERT INTO title (id, review_count) VALUES (?, 0)',
+            [(index,) for index in range(options['titles'])]
+        )
+        connection.executemany(
+            WRITE_SQL[0], [
+                self.review(generator, options['titles'])
+                for _ in range(options['reviews'])
+            ]
+        )
+        connection.execute('COMMIT')
+        connection.close()
+
+    def review(self, generator, titles):
+        return (
+            generator.randrange(titles), generator.randrange(1000),
+            generator.randint(1, 10), 'Отзыв ' * 20, time.time()
+        )
+
+    def run(self, path, pragmas, options):
+        stats = {'reads': [], 'writes': [], 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def worker(write, seed):
+            connection = self.connect(path, pragmas)
+            generator = random.Random(seed)
+            latencies, locked = [], 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    if write:
+                        review = self.review(generator, options['titles'])
+                        connection.execute('BEGIN')
+                        connection.execute(WRITE_SQL[0], review)
+                        connection.execute(WRITE_SQL[1], (review[0],))
+                        connection.execute('COMMIT')
+                    else:
+                        connection.execute(
+                            READ_SQL, (generator.randrange(options['titles']),)
+                        ).fetchall()
+                except sqlite3.OperationalError:
+                    locked += 1
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+                    continue
+                latencies.append(time.perf_counter() - started)
+            connection.close()
+            with lock:
+                stats['writes' if write else 'reads'] += latencies
+                stats['locked'] += locked
+
+        threads = [
+            threading.Thread(target=worker, args=(False, index))
+            for index in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=(True, -index - 1))
+            for index in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+
+    def report(self, name, stats, options):
+        duration = options['duration']
+        self.stdout.write(
+            f'{name:<10}{len(stats["reads"]) / duration:>10.0f}'
+            f'{len(stats["writes"]) / duration:>10.0f}'
+            f'{stats["locked"]:>8}'
+            f'{percentile(stats["reads"], 99) * 1000:>9.1f}ms'
+            f'{percentile(stats["writes"], 99) * 1000:>10.1f}ms'
+        )
@@ -0,0 +1,133 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+
+from api_yamdb.loadtest import percentile
+from api_yamdb.write_queue import run_write, write_queue
+from reviews.models import Category, Review, Title
+from users.models import User
+
+
+def create_review(author, title, score):
+    """То же, что делает POST отзыва: вставка и пересчёт рейтинга."""
+    Review.objects.create(
+        author=author, title=title, score=score, text='Отзыв ' * 20
+    )
+    Title.objects.filter(pk=title.pk).refresh_ratings()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures review write latency under contention with and without '
+        'the single-writer queue, on a scratch copy of the schema'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=16)
+        parser.add_argument(
+            '--writes', type=int, default=50, help='Reviews per writer.'
+        )
+        parser.add_argument('--readers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            self.run_benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run_benchmark(self, options):
+        category = Category.objects.create(name='Фильм', slug='benchmark')
+        titles = [
+            Title.objects.create(name=f'Title {index}', year=2000,
+                                 category=category)
+            for index in range(options['writes'])
+        ]
+        authors = [
+            User.objects.create(username=f'writer{index}',
+                                email=f'writer{index}@example.com')
+            for index in range(options['writers'])
+        ]
+        self.stdout.write(
+            f'{options["writers"]} writers x {options["writes"]} reviews, '
+            f'{options["readers"]} readers'
+        )
+        self.stdout.write(
+            f'{"mode":<8}{"writes/s":>10}{"w p50":>9}{"w p99":>9}'
+            f'{"errors":>8}{"reads/s":>9}{"r p99":>9}'
+        )
+        enabled = settings.WRITE_QUEUE_ENABLED
+        try:
+            for mode, use_queue in (('direct', False), ('queue', True)):
+                settings.WRITE_QUEUE_ENABLED = use_queue
+                Review.objects.all().delete()
+                self.report(mode, self.run(authors, titles, options))
+        finally:
+            write_queue.stop()
+            settings.WRITE_QUEUE_ENABLED = enabled
+
+    def run(self, authors, titles, options):
+        stats = {'writes': [], 'reads': [], 'errors': 0}
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def writer(author):
+            latencies, errors = [], 0
+            for index, title in enumerate(titles):
+                started = time.perf_counter()
+                try:
+                    run_write(create_review, author, title, index % 10 + 1)
+                except OperationalError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+            connections.close_all()
+            with lock:
+                stats['writes'] += latencies
+                stats['errors'] += errors
+
+        def reader():
+            latencies = []
+            while not done.is_set():
+                started = time.perf_counter()
+                list(Review.objects.filter(
+                    title=titles[len(latencies) % len(titles)]
+                ).order_by('-pub_date')[:10])
+                latencies.append(time.perf_counter() - started)
+            connections.close_all()
+            with lock:
+                stats['reads'] += latencies
+
+        writers = [
+            threading.Thread(target=writer, args=(author,))
+            for author in authors
+        ]
+        readers = [
+            threading.Thread(target=reader) for _ in range(options['readers'])
+        ]
+        started = time.perf_counter()
+        for thread in writers + readers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stats['elapsed'] = time.perf_counter() - started
+        done.set()
+        for thread in readers:
+            thread.join()
+        return stats
+
+    def report(self, mode, stats):
+        elapsed = stats['elapsed']
+        self.stdout.write(
+            f'{mode:<8}{len(stats["writes"]) / elapsed:>10.0f}'
+            f'{percentile(stats["writes"], 50) * 1000:>7.1f}ms'
+            f'{percentile(stats["writes"], 99) * 1000:>7.1f}ms'
+            f'{stats["errors"]:>8}'
+            f'{len(stats["reads"]) / elapsed:>9.0f}'
+            f'{percentile(stats["reads"], 99) * 1000:>7.1f}ms'
+        )
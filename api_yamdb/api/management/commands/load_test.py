@@ -0,0 +1,140 @@
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api_yamdb.loadtest import (
+    VirtualUser, apply_confirmation_codes, parse_collection, percentile,
+    read_confirmation_codes
+)
+
+DEFAULT_COLLECTION = (
+    settings.BASE_DIR.parent / 'postman_collection'
+    / 'Ymdb-collection.postman_collection.json'
+)
+SETUP_FOLDERS = (
+    'registration // No Auth/get_confirmatior_codes',
+    'registration // No Auth/get_tokens',
+)
+
+
+def folder_path(request, depth=None):
+    return '/'.join(request.folder[:depth])
+
+
+class Command(BaseCommand):
+    help = (
+        'Replays the Postman collection with concurrent virtual users and '
+        'reports throughput, errors and latency percentiles per folder'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collection', default=DEFAULT_COLLECTION)
+        parser.add_argument(
+            '--base-url', default=None,
+            help='Server to test instead of the URLs in the collection.'
+        )
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument(
+            '--iterations', type=int, default=1,
+            help='Collection passes per virtual user.'
+        )
+        parser.add_argument(
+            '--folder', action='append', default=None,
+            help='Replay only folders starting with this path; repeatable.'
+        )
+        parser.add_argument(
+            '--depth', type=int, default=2,
+            help='Folder depth to group the report by.'
+        )
+        parser.add_argument(
+            '--mail-dir', default=None,
+            help='Mail sink with confirmation codes, EMAIL_FILE_PATH '
+                 'by default.'
+        )
+
+    def handle(self, *args, **options):
+        with open(options['collection'], encoding='utf-8') as collection:
+            variables, collection_requests = parse_collection(
+                json.load(collection)
+            )
+
+        variables = self.set_up(variables, collection_requests, options)
+        scenario = [
+            request for request in collection_requests
+            if not folder_path(request).startswith(SETUP_FOLDERS)
+            and (not options['folder'] or folder_path(request).startswith(
+                tuple(options['folder'])))
+        ]
+        if not scenario:
+            raise CommandError('No requests match the selected folders')
+
+        self.stdout.write(
+            f'{options["users"]} virtual users x {options["iterations"]} '
+            f'iterations x {len(scenario)} requests'
+        )
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['users']) as executor:
+            batches = executor.map(
+                lambda _: self.run_user(variables, scenario, options),
+                range(options['users'])
+            )
+            results = [result for batch in batches for result in batch]
+        self.report(results, time.perf_counter() - started, options['depth'])
+
+    def set_up(self, variables, collection_requests, options):
+        """Регистрация и получение токенов, один раз перед нагрузкой."""
+        user = VirtualUser(requests.Session(), variables, options['base_url'])
+        for folder in SETUP_FOLDERS:
+            if folder.endswith('get_tokens'):
+                codes = read_confirmation_codes(options['mail_dir'])
+                apply_confirmation_codes(user.variables, codes)
+            for result in user.run([
+                request for request in collection_requests
+                if folder_path(request) == folder
+            ]):
+                if result.unexpected or result.failed:
+                    raise CommandError(
+                        f'Setup request {result.name} returned '
+                        f'{result.status}; run postman_collection/'
+                        f'set_up_data.sh first'
+                    )
+        return user.variables
+
+    def run_user(self, variables, scenario, options):
+        user = VirtualUser(requests.Session(), variables, options['base_url'])
+        results = []
+        for _ in range(options['iterations']):
+            results += user.run(scenario)
+        return results
+
+    def report(self, results, elapsed, depth):
+        groups = defaultdict(list)
+        for result in results:
+            groups[folder_path(result, depth)].append(result)
+
+        failed = sum(result.failed for result in results)
+        self.stdout.write(
+            f'{len(results)} requests in {elapsed:.2f}s, '
+            f'{len(results) / elapsed:.1f} req/s, '
+            f'errors {failed / len(results):.1%}'
+        )
+        self.stdout.write(
+            f'{"folder":<48}{"reqs":>6}{"req/s":>8}{"errors":>8}'
+            f'{"unexp.":>8}{"p50 ms":>8}{"p90 ms":>8}{"p99 ms":>8}'
+        )
+        for folder, group in groups.items():
+            latencies = [result.elapsed * 1000 for result in group]
+            self.stdout.write(
+                f'{folder[:47]:<48}{len(group):>6}'
+                f'{len(group) / elapsed:>8.1f}'
+                f'{sum(r.failed for r in group) / len(group):>8.1%}'
+                f'{sum(r.unexpected for r in group) / len(group):>8.1%}'
+                f'{percentile(latencies, 50):>8.1f}'
+                f'{percentile(latencies, 90):>8.1f}'
+                f'{percentile(latencies, 99):>8.1f}'
+            )
@@ -0,0 +1,135 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в отдельном процессе: холодный старт воркера и первый запрос.
+STARTUP_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from wsgiref.util import setup_testing_defaults
+application = get_wsgi_application()
+ready = time.perf_counter()
+environ = {'PATH_INFO': sys.argv[1], 'REQUEST_METHOD': 'GET'}
+setup_testing_defaults(environ)
+statuses = []
+body = b''.join(application(
+    environ, lambda status, headers, exc_info=None: statuses.append(status)
+))
+finished = time.perf_counter()
+print(json.dumps({
+    'setup': ready - started,
+    'first_request': finished - ready,
+    'total': finished - started,
+    'status': statuses[0],
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """Разбирает вывод python -X importtime: [(модуль, self, cumulative)]."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append(
+            (name.rstrip(), int(self_us), int(cumulative_us))
+        )
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        'Profiles worker cold start: import time per module and '
+        'time to the first request'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-module', default=os.environ.get(
+                'DJANGO_SETTINGS_MODULE', 'api_yamdb.settings'
+            ),
+            help='Settings profile to start, e.g. api_yamdb.settings_api.'
+        )
+        parser.add_argument('--path', default='/api/v1/')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument(
+            '--runs', type=int, default=3,
+            help='Cold starts to run; timings are medians.'
+        )
+        parser.add_argument(
+            '--target', type=float, default=None,
+            help='Fail if median time to first response exceeds N seconds.'
+        )
+
+    def handle(self, *args, **options):
+        runs = [self.cold_start(options) for _ in range(options['runs'])]
+        timings, modules = runs[0]
+        self.report_modules(modules, options['top'])
+
+        median = {
+            key: statistics.median(run[0][key] for run in runs)
+            for key in ('setup', 'first_request', 'total')
+        }
+        self.stdout.write(
+            f'\nSettings: {options["settings_module"]}, '
+            f'GET {options["path"]} -> {timings["status"]}, '
+            f'{timings["modules"]} modules loaded'
+        )
+        self.stdout.write(
+            f'Median of {len(runs)} runs: setup {median["setup"]:.3f}s, '
+            f'first request {median["first_request"]:.3f}s, '
+            f'time to first response {median["total"]:.3f}s'
+        )
+
+        target = options['target']
+        if target is not None:
+            if median['total'] > target:
+                raise CommandError(
+                    f'Time to first response {median["total"]:.3f}s '
+                    f'exceeds target {target:.3f}s'
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'Within target of {target:.3f}s'
+            ))
+
+    def cold_start(self, options):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': options['settings_module'],
+        }
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT,
+             options['path']],
+            cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True
+        )
+        if process.returncode:
+            raise CommandError(process.stderr[-2000:])
+        timings = json.loads(process.stdout.strip().splitlines()[-1])
+        return timings, parse_importtime(process.stderr)
+
+    def report_modules(self, modules, top):
+        packages = defaultdict(int)
+        for name, self_us, _ in modules:
+            packages[name.strip().split('.')[0]] += self_us
+
+        self.stdout.write(f'Top {top} packages by own import time:')
+        for package, self_us in sorted(
+            packages.items(), key=lambda item: item[1], reverse=True
+        )[:top]:
+            self.stdout.write(f'{self_us / 1000:>10.1f} ms  {package}')
+
+        self.stdout.write(f'\nTop {top} modules by cumulative import time:')
+        for name, _, cumulative_us in sorted(
+            modules, key=lambda item: item[2], reverse=True
+        )[:top]:
+            self.stdout.write(f'{cumulative_us / 1000:>10.1f} ms  {name}')
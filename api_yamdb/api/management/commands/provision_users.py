@@ -0,0 +1,58 @@
+import csv
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.provisioning import provision_users, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates users in bulk from a CSV or JSON file with username, email '
+        'and optional first_name, last_name, bio, role and password columns'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--workers', type=int, default=settings.USER_PROVISION_WORKERS,
+            help='Processes that hash passwords.'
+        )
+        parser.add_argument(
+            '--report', default=None,
+            help='Write per-row results to this JSON file.'
+        )
+
+    def handle(self, *args, **options):
+        rows = self.read_rows(Path(options['path']))
+        summary = summarize(provision_users(rows, options['workers']))
+        for result in summary['results']:
+            if result['status'] != 'created':
+                self.stdout.write(self.style.ERROR(
+                    f'Row {result["row"]} ({result["username"]}): '
+                    f'{json.dumps(result["errors"], ensure_ascii=False)}'
+                ))
+        if options['report']:
+            Path(options['report']).write_text(
+                json.dumps(summary, ensure_ascii=False, indent=2),
+                encoding='utf-8'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {summary["created"]} users, '
+            f'{summary["failed"]} rows failed'
+        ))
+
+    def read_rows(self, path):
+        try:
+            with open(path, encoding='utf-8') as file:
+                if path.suffix == '.json':
+                    return json.load(file)
+                # Пустые ячейки CSV — отсутствующие поля, а не пустые строки.
+                return [
+                    {key: value for key, value in row.items() if value}
+                    for row in csv.DictReader(file)
+                ]
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Cannot read {path}: {error}')
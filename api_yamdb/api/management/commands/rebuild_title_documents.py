@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.title_documents import refresh_documents
+from reviews.models import Title, TitleDocument
+from reviews.purge import in_batches
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the title document store in parallel batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.TITLE_DOCUMENTS_BATCH_SIZE
+        )
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stale, _ = TitleDocument.objects.exclude(
+            pk__in=Title.objects.visible().values('pk')
+        ).delete()
+        title_ids = list(
+            Title.objects.visible().values_list('pk', flat=True)
+        )
+        batches = list(in_batches(title_ids, options['batch_size']))
+        with ThreadPoolExecutor(options['workers']) as executor:
+            for done, _ in enumerate(
+                executor.map(self.rebuild, batches), 1
+            ):
+                self.stdout.write(
+                    f'Batch {done}/{len(batches)} done', ending='\r'
+                )
+        self.stdout.write(
+            f'Rebuilt {len(title_ids)} documents, removed {stale} stale, '
+            f'in {time.perf_counter() - started:.2f}s'
+        )
+
+    def rebuild(self, title_ids):
+        # У каждого потока своё соединение, закрываем его за собой.
+        try:
+            refresh_documents(title_ids)
+        finally:
+            connections.close_all()
@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb.loadtest import percentile
+from api_yamdb.traffic import ANONYMOUS, read_traffic
+from users.constants import UserRole
+from users.models import User
+
+IDENTITY_USERS = {
+    UserRole.USER: {'role': UserRole.USER},
+    UserRole.MODERATOR: {'role': UserRole.MODERATOR},
+    UserRole.ADMIN: {'role': UserRole.ADMIN},
+    'superuser': {'role': UserRole.ADMIN, 'is_superuser': True},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Replays captured traffic against a local server and compares '
+        'its latency profile with the recorded one'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--traffic-dir', default=None,
+            help='Captured traffic, TRAFFIC_CAPTURE_DIR by default.'
+        )
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument(
+            '--speed', type=float, default=1,
+            help='1 keeps recorded pacing, 10 is ten times faster, '
+                 '0 sends requests as fast as possible.'
+        )
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument(
+            '--reads-only', action='store_true',
+            help='Skip POST, PUT, PATCH and DELETE requests.'
+        )
+
+    def handle(self, *args, **options):
+        entries = read_traffic(
+            options['traffic_dir'] or settings.TRAFFIC_CAPTURE_DIR
+        )
+        replayable = [
+            entry for entry in entries
+            if entry['method'] == 'GET' or not (
+                options['reads_only'] or 'body_sha256' in entry
+            )
+        ]
+        skipped = len(entries) - len(replayable)
+        entries = replayable
+        if not entries:
+            raise CommandError('No captured requests to replay')
+
+        self.tokens = self.get_tokens(
+            {entry['identity'] for entry in entries}
+        )
+        self.base_url = options['base_url'].rstrip('/')
+        self.local = threading.local()
+        self.stdout.write(
+            f'Replaying {len(entries)} requests at speed '
+            f'{options["speed"] or "max"}, {skipped} writes skipped '
+            f'(body not captured or --reads-only)'
+        )
+
+        first = entries[0]['time']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            futures = []
+            for entry in entries:
+                if options['speed']:
+                    delay = (
+                        (entry['time'] - first) / options['speed']
+                        - (time.perf_counter() - started)
+                    )
+                    if delay > 0:
+                        time.sleep(delay)
+                futures.append(executor.submit(self.send, entry))
+            results = [future.result() for future in futures]
+        self.report(results, time.perf_counter() - started)
+
+    def get_tokens(self, identities):
+        """Токены локальных пользователей для каждого класса из записи."""
+        tokens = {}
+        for identity in identities - {ANONYMOUS}:
+            user, _ = User.objects.get_or_create(
+                username=f'replay-{identity}',
+                defaults={
+                    'email': f'replay-{identity}@example.com',
+                    **IDENTITY_USERS.get(identity, {}),
+                }
+            )
+            tokens[identity] = str(AccessToken.for_user(user))
+        return tokens
+
+    def get_session(self):
+        # requests.Session не потокобезопасна: у каждого потока своя.
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def send(self, entry):
+        url = self.base_url + entry['path']
+        if entry['query']:
+            url += '?' + entry['query']
+        headers = {}
+        token = self.tokens.get(entry['identity'])
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        body = entry.get('body')
+        if body:
+            headers['Content-Type'] = entry['content_type']
+        started = time.perf_counter()
+        try:
+            response = self.get_session().request(
+                entry['method'], url, data=body and body.encode(),
+                headers=headers, timeout=30
+            )
+            status = response.status_code
+        except OSError:
+            status = None
+        return entry, status, (time.perf_counter() - started) * 1000
+
+    def report(self, results, elapsed):
+        groups = defaultdict(list)
+        for entry, status, duration_ms in results:
+            groups[entry['route'] or entry['path']].append(
+                (entry, status, duration_ms)
+            )
+        mismatched = sum(
+            status != entry['status'] for entry, status, _ in results
+        )
+        self.stdout.write(
+            f'{len(results)} requests in {elapsed:.2f}s, '
+            f'{mismatched} with a different status than recorded'
+        )
+        self.stdout.write(
+            f'{"route":<28}{"reqs":>6}{"status≠":>9}'
+            f'{"p50 rec":>9}{"p50 now":>9}{"p99 rec":>9}{"p99 now":>9}'
+            f'{"Δp99 %":>9}'
+        )
+        for route, group in sorted(
+            groups.items(), key=lambda item: -len(item[1])
+        ):
+            recorded = [entry['duration_ms'] for entry, _, _ in group]
+            replayed = [duration_ms for _, _, duration_ms in group]
+            recorded_p99 = percentile(recorded, 99)
+            replayed_p99 = percentile(replayed, 99)
+            change = (
+                (replayed_p99 - recorded_p99) / recorded_p99
+                if recorded_p99 else 0
+            )
+            self.stdout.write(
+                f'{route[:27]:<28}{len(group):>6}'
+                f'{sum(s != e["status"] for e, s, _ in group):>9}'
+                f'{percentile(recorded, 50):>9.1f}'
+                f'{percentile(replayed, 50):>9.1f}'
+                f'{recorded_p99:>9.1f}{replayed_p99:>9.1f}'
+                f'{change:>+9.0%}'
+            )
@@ -0,0 +1,96 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SORT_KEYS = {
+    'total': lambda group: group['total_ms'],
+    'count': lambda group: group['count'],
+    'max': lambda group: group['max_ms'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Aggregates the slow query log by normalized SQL: counts, '
+        'timings, origins and the captured query plan'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', default=None,
+            help='Log file to read, SLOW_QUERY_LOG by default.'
+        )
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--sort', choices=tuple(SORT_KEYS), default='total'
+        )
+        parser.add_argument(
+            '--origin', default=None,
+            help='Only queries whose origin contains this string.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['log'] or settings.SLOW_QUERY_LOG
+        try:
+            with open(path, encoding='utf-8') as log:
+                entries = [json.loads(line) for line in log if line.strip()]
+        except FileNotFoundError:
+            raise CommandError(f'Slow query log {path} not found')
+
+        if options['origin']:
+            entries = [
+                entry for entry in entries
+                if options['origin'] in entry['origin']
+            ]
+        groups = self.aggregate(entries)
+        self.stdout.write(
+            f'{len(entries)} slow queries, {len(groups)} distinct statements'
+        )
+        for group in sorted(
+            groups.values(), key=SORT_KEYS[options['sort']], reverse=True
+        )[:options['top']]:
+            self.report_group(group)
+
+    def aggregate(self, entries):
+        groups = {}
+        for entry in entries:
+            group = groups.setdefault(entry['sql'], {
+                'sql': entry['sql'],
+                'count': 0,
+                'total_ms': 0,
+                'max_ms': 0,
+                'origins': defaultdict(int),
+                'chains': defaultdict(int),
+                'slowest': entry,
+            })
+            group['count'] += 1
+            group['total_ms'] += entry['duration_ms']
+            group['origins'][entry['origin']] += 1
+            if entry['chain']:
+                group['chains'][entry['chain'][-1]] += 1
+            if entry['duration_ms'] >= group['max_ms']:
+                group['max_ms'] = entry['duration_ms']
+                group['slowest'] = entry
+        return groups
+
+    def report_group(self, group):
+        self.stdout.write(
+            f'\n{group["count"]} x, total {group["total_ms"]:.1f} ms, '
+            f'avg {group["total_ms"] / group["count"]:.1f} ms, '
+            f'max {group["max_ms"]:.1f} ms'
+        )
+        self.stdout.write(f'  SQL: {group["sql"]}')
+        for origin, count in sorted(
+            group['origins'].items(), key=lambda item: -item[1]
+        ):
+            self.stdout.write(f'  origin: {origin} ({count})')
+        for caller, count in sorted(
+            group['chains'].items(), key=lambda item: -item[1]
+        ):
+            self.stdout.write(f'  called from: {caller} ({count})')
+        slowest = group['slowest']
+        self.stdout.write(f'  slowest params: {slowest["params"]}')
+        for line in slowest['plan'] or ():
+            self.stdout.write(f'  plan: {line}')
@@ -0,0 +1,104 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from api_yamdb import metrics
+
+from . import list_counts
+
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('0', 'false', 'no')
+
+
+class CachedCountLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Limit/offset пагинация без COUNT(*) на каждой странице.
+
+    Наличие следующей страницы определяется выборкой limit + 1 строк.
+    Ключ `count` управляется параметром ?count=true|false, значение
+    по умолчанию задаёт настройка PAGINATION_INCLUDE_COUNT. Число
+    объектов берётся из счётчика вьюсета (метод get_cached_count,
+    например review_count произведения), для остальных списков —
+    из кэша api.list_counts, и только если модель там не отслеживается,
+    считается запросом к базе.
+    """
+    count_query_param = 'count'
+    template = 'rest_framework/pagination/previous_and_next.html'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.request = request
+        metrics.observe(
+            'yamdb_pagination_offset', self.offset,
+            route=metrics.current_route()
+        )
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        self.count = None
+        if self.count_requested(request):
+            self.count = self.get_count_value(queryset, view)
+        return rows[:self.limit]
+
+    def count_requested(self, request):
+        value = request.query_params.get(self.count_query_param, '').lower()
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+        return getattr(settings, 'PAGINATION_INCLUDE_COUNT', True)
+
+    def get_count_value(self, queryset, view):
+        get_cached_count = getattr(view, 'get_cached_count', None)
+        if get_cached_count is not None:
+            count = get_cached_count()
+            if count is not None:
+                return count
+        count = list_counts.get_count(queryset)
+        if count is not None:
+            return count
+        return self.get_count(queryset)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_html_context(self):
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+        }
+
+
+class AuthorActivityPagination(CursorPagination):
+    """
+    Keyset-пагинация ленты отзывов и комментариев пользователя.
+
+    Страница выбирается условием по pub_date, которое обслуживает
+    индекс (author, -pub_date), а не смещением.
+    """
+    ordering = '-pub_date'
+
+    def get_ordering(self, request, queryset, view):
+        # Порядок ленты фиксирован и не зависит от фильтров вьюсета.
+        return (self.ordering,)
@@ -0,0 +1,150 @@
+"""
+Массовое создание пользователей администратором.
+
+Строки проверяются сериализатором по одной, а уникальность username
+и email — одним запросом на все строки и по самой пачке. Пароли,
+если они заданы, команда provision_users хэширует в пуле процессов:
+PBKDF2 занимает процессор, и в одном потоке тысячи хэшей считались бы
+минутами. HTTP-запрос хэширует в своём потоке (workers=1): запуск пула
+из многопоточного воркера копировал бы его вместе с соединениями
+и фоновыми потоками на каждый запрос, а число паролей в запросе
+ограничено USER_PROVISION_MAX_PASSWORD_ROWS.
+Пользователи вставляются через bulk_create, результат возвращается
+по каждой строке в исходном порядке.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db.models import Q
+
+from users.constants import ROLE_FLAGS
+from users.models import User
+
+from . import list_counts
+from .serializers import UserProvisionSerializer
+
+USERNAME_TAKEN = 'Это имя пользователя уже занято.'
+EMAIL_TAKEN = 'Этот email уже зарегистрирован.'
+
+
+def hash_passwords(passwords, workers=None):
+    """Хэширует пароли в workers процессах, сохраняя порядок."""
+    workers = min(workers or settings.USER_PROVISION_WORKERS, len(passwords))
+    if workers <= 1:
+        return [make_password(password) for password in passwords]
+    # При запуске процессов через spawn Django в них нужно настроить.
+    with ProcessPoolExecutor(workers, initializer=django.setup) as executor:
+        return list(executor.map(
+            make_password, passwords,
+            chunksize=max(1, len(passwords) // (workers * 4))
+        ))
+
+
+def row_result(index, row, status, **extra):
+    username = row.get('username') if isinstance(row, dict) else None
+    return {'row': index, 'username': username, 'status': status, **extra}
+
+
+def validate_rows(rows, results):
+    valid = {}
+    for index, row in enumerate(rows):
+        serializer = UserProvisionSerializer(data=row)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            results[index] = row_result(
+                index, row, 'error', errors=serializer.errors
+            )
+    return valid
+
+
+def reject_duplicates(rows, valid, results):
+    """Отсеивает строки, чей username или email занят в базе или пачке."""
+    taken = User.objects.filter(
+        Q(username__in=[data['username'] for data in valid.values()])
+        | Q(email__in=[data['email'] for data in valid.values()])
+    ).values_list('username', 'email')
+    usernames = {username for username, _ in taken}
+    emails = {email for _, email in taken}
+    for index, data in list(valid.items()):
+        errors = {}
+        if data['username'] in usernames:
+            errors['username'] = [USERNAME_TAKEN]
+        if data['email'] in emails:
+            errors['email'] = [EMAIL_TAKEN]
+        usernames.add(data['username'])
+        emails.add(data['email'])
+        if errors:
+            del valid[index]
+            results[index] = row_result(
+                index, rows[index], 'error', errors=errors
+            )
+
+
+def create_users(rows, valid, results, workers=None):
+    with_password = [
+        index for index, data in valid.items() if data.get('password')
+    ]
+    hashes = dict(zip(with_password, hash_passwords(
+        [valid[index]['password'] for index in with_password], workers
+    )))
+    users = {}
+    for index, data in valid.items():
+        data = {**data}
+        data.pop('password', None)
+        users[index] = User(
+            **data, **ROLE_FLAGS[data['role']],
+            password=hashes.get(index) or make_password(None)
+        )
+    # Строки, которые успел занять параллельный запрос, пропускаются
+    # базой; созданных пользователей находим по паре username и email,
+    # а для остальных — какое из полей оказалось занято.
+    User.objects.bulk_create(users.values(), ignore_conflicts=True)
+    # bulk_create не отправляет post_save, число пользователей
+    # в кэше списка сбрасывается вручную.
+    list_counts.invalidate(User)
+    saved = User.objects.filter(
+        Q(username__in=[user.username for user in users.values()])
+        | Q(email__in=[user.email for user in users.values()])
+    ).values_list('username', 'pk', 'email')
+    by_username = {username: (pk, email) for username, pk, email in saved}
+    emails = {email for _, _, email in saved}
+    for index, user in users.items():
+        pk, email = by_username.get(user.username, (None, None))
+        if email == user.email:
+            results[index] = row_result(index, rows[index], 'created', id=pk)
+            continue
+        errors = {}
+        if pk is not None:
+            errors['username'] = [USERNAME_TAKEN]
+        if user.email in emails:
+            errors['email'] = [EMAIL_TAKEN]
+        results[index] = row_result(
+            index, rows[index], 'error', errors=errors
+        )
+
+
+def provision_users(rows, workers=None):
+    """
+    Создаёт пользователей из списка словарей. Возвращает список
+    результатов: {'row', 'username', 'status': 'created', 'id'} или
+    {'row', 'username', 'status': 'error', 'errors'}.
+    """
+    results = [None] * len(rows)
+    valid = validate_rows(rows, results)
+    if valid:
+        reject_duplicates(rows, valid, results)
+    if valid:
+        create_users(rows, valid, results, workers)
+    return results
+
+
+def summarize(results):
+    created = sum(result['status'] == 'created' for result in results)
+    return {
+        'created': created,
+        'failed': len(results) - created,
+        'results': results,
+    }
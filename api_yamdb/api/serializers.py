@@ -1,10 +1,16 @@
 from rest_framework import serializers
 from rest_framework.generics import get_object_or_404
+from django.contrib.auth import password_validation
 from django.contrib.auth.tokens import default_token_generator
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.encoding import smart_str
 from rest_framework.exceptions import NotFound
+from rest_framework.relations import MANY_RELATION_KWARGS
 from django.core.mail import send_mail
 
 from reviews.models import Category, Comment, Genre, Review, Title
+from users.constants import ROLE_FLAGS, UserRole
 from users.models import User, validate_username
 
 
@@ -45,6 +51,7 @@ class TokenObtainSerializer(serializers.Serializer):
             )
 
         data['username'] = username
+        data['user'] = user
         return data
 
 
@@ -60,15 +67,36 @@ class AdminUserCreateSerializer(serializers.ModelSerializer):
                   'first_name', 'last_name', 'role', 'bio']
 
     def create(self, validated_data):
-        role = validated_data.pop('role', 'user')
-        user = User.objects.create_user(**validated_data)
-        if role == 'admin':
-            user.is_staff = True
-            user.is_superuser = True
-        elif role == 'moderator':
-            user.is_staff = True
-        user.save()
-        return user
+        # Флаги роли передаются сразу в create_user: одна запись вместо
+        # INSERT и следующего за ним UPDATE.
+        role = validated_data.get('role', UserRole.USER)
+        return User.objects.create_user(**validated_data, **ROLE_FLAGS[role])
+
+
+class UserProvisionSerializer(serializers.ModelSerializer):
+    """
+    Строка массового создания пользователей. Уникальность username
+    и email здесь не проверяется: api.provisioning проверяет её одним
+    запросом для всех строк.
+    """
+    role = serializers.ChoiceField(
+        choices=[role for role, _ in UserRole.CHOICES],
+        default=UserRole.USER
+    )
+    password = serializers.CharField(write_only=True, required=False)
+
+    class Meta:
+        model = User
+        fields = ['username', 'email', 'first_name',
+                  'last_name', 'role', 'bio', 'password']
+        extra_kwargs = {
+            'username': {'validators': [validate_username]},
+            'email': {'validators': []},
+        }
+
+    def validate_password(self, value):
+        password_validation.validate_password(value)
+        return value
 
 
 class MeUserSerializer(serializers.ModelSerializer):
@@ -90,26 +118,51 @@ class SignUpSerializer(serializers.ModelSerializer):
         model = User
         fields = ('email', 'username')
 
-    def validate_username(self, value):
-        if User.objects.filter(
-            username=value).exists() and not User.objects.filter(
-                email=self.initial_data.get('email')).exists():
-            raise serializers.ValidationError(
-                'Это имя пользователя уже занято.'
-            )
-        return value
+    def validate(self, data):
+        # Один запрос находит и пользователя с таким username,
+        # и пользователя с таким email.
+        users = list(User.objects.filter(
+            Q(username=data['username']) | Q(email=data['email'])
+        )[:2])
+        errors = {}
+        for user in users:
+            if user.username != data['username']:
+                errors['email'] = ['Этот email уже зарегистрирован.']
+            elif user.email != data['email']:
+                errors['username'] = ['Это имя пользователя уже занято.']
+        if errors:
+            raise serializers.ValidationError(errors)
+        self.existing_user = users[0] if users else None
+        return data
 
-    def validate_email(self, value):
-        if User.objects.filter(
-            email=value).exists() and not User.objects.filter(
-                username=self.initial_data.get('username')).exists():
-            raise serializers.ValidationError(
-                'Этот email уже зарегистрирован.'
-            )
-        return value
+    def get_or_insert(self, validated_data):
+        """
+        Возвращает найденного при валидации пользователя или создаёт нового.
+
+        Вставка защищена уникальными ограничениями username и email:
+        если параллельный запрос успел создать пользователя, повторно
+        читаем его и сверяем пару username/email.
+        """
+        if self.existing_user is not None:
+            return self.existing_user
+        try:
+            with transaction.atomic():
+                return User.objects.create(**validated_data)
+        except IntegrityError:
+            user = User.objects.filter(
+                Q(username=validated_data['username'])
+                | Q(email=validated_data['email'])
+            ).first()
+            if (user is None
+                    or user.username != validated_data['username']
+                    or user.email != validated_data['email']):
+                raise serializers.ValidationError(
+                    {'detail': 'Имя пользователя или email уже заняты.'}
+                )
+            return user
 
     def create(self, validated_data):
-        user, _ = User.objects.get_or_create(**validated_data)
+        user = self.get_or_insert(validated_data)
 
         # Отправка confirmation_code после всей валидации
         confirmation_code = default_token_generator.make_token(user)
@@ -123,7 +176,25 @@ class SignUpSerializer(serializers.ModelSerializer):
         return user
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class SlugModelSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор модели с уникальным slug.
+    Проверка уникальности в валидаторе не защищает от одновременных
+    запросов с одним slug: ошибка вставки возвращается как ошибка
+    валидации, а не как 500.
+    """
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {'slug': ['Объект с таким slug уже существует.']}
+            )
+
+
+class CategorySerializer(SlugModelSerializer):
     """
     Сериализатор для модели Category.
     Используется для преобразования данных модели Category в JSON формат
@@ -135,7 +206,7 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SlugModelSerializer):
     """
     Сериализатор для модели Genre.
     Используется для преобразования данных модели Genre в JSON формат
@@ -159,7 +230,7 @@ class TitleSerializerGet(serializers.ModelSerializer):
     description = serializers.CharField(default='', allow_blank=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('is_hidden',)
         model = Title
 
     def get_category(self, obj):
@@ -171,6 +242,47 @@ class TitleSerializerGet(serializers.ModelSerializer):
         }
 
 
+class SlugListField(serializers.ManyRelatedField):
+    """
+    Список объектов по slug: все значения ищутся одним запросом
+    с IN, а не отдельным SELECT на каждое значение.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        if any(isinstance(item, (dict, list)) for item in data):
+            child.fail('invalid')
+        slugs = [smart_str(item) for item in data]
+        objects = {
+            getattr(obj, child.slug_field): obj
+            for obj in child.get_queryset().filter(
+                **{f'{child.slug_field}__in': set(slugs)}
+            )
+        }
+        for slug in slugs:
+            if slug not in objects:
+                child.fail(
+                    'does_not_exist', slug_name=child.slug_field, value=slug
+                )
+        return [objects[slug] for slug in slugs]
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, у которого many=True создаёт SlugListField."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return SlugListField(**list_kwargs)
+
+
 class TitleSerializer(serializers.ModelSerializer):
 
     """
@@ -181,14 +293,15 @@ class TitleSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         slug_field='slug', queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         slug_field='slug', queryset=Genre.objects.all(), many=True
     )
     rating = serializers.FloatField(read_only=True)
     description = serializers.CharField(required=False, allow_blank=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('is_hidden',)
+        read_only_fields = ('review_count',)
         model = Title
 
     def validate(self, attrs):
@@ -199,6 +312,46 @@ class TitleSerializer(serializers.ModelSerializer):
             )
         return attrs
 
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        with transaction.atomic():
+            title = super().create(validated_data)
+            self.set_genres(title, genres, current=set())
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if genres is not None:
+                self.set_genres(instance, genres)
+        return instance
+
+    def set_genres(self, title, genres, current=None):
+        """
+        Приводит жанры произведения к genres: связи, которых не стало,
+        удаляются одним DELETE, новые добавляются одним INSERT.
+
+        Запись в промежуточную таблицу не отправляет m2m_changed, но идёт
+        в одной транзакции с save() произведения, а его post_save уже
+        передал произведение в конвейер reviews.changes.
+        """
+        through = Title.genre.through
+        wanted = {genre.pk for genre in genres}
+        if current is None:
+            current = set(through.objects.filter(
+                title_id=title.pk
+            ).values_list('genre_id', flat=True))
+        if current - wanted:
+            through.objects.filter(
+                title_id=title.pk, genre_id__in=current - wanted
+            ).delete()
+        if wanted - current:
+            through.objects.bulk_create(
+                through(title_id=title.pk, genre_id=pk)
+                for pk in wanted - current
+            )
+
     def to_representation(self, instance):
         return TitleSerializerGet(instance).data
 
@@ -213,7 +366,9 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comment_count')
+        read_only_fields = ('comment_count',)
 
     def validate(self, data):
         request = self.context.get('request')
@@ -248,3 +403,28 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class UserReviewSerializer(ReviewSerializer):
+    """Отзыв в ленте пользователя вместе с произведением."""
+    title_id = serializers.IntegerField(read_only=True)
+    title_name = serializers.CharField(source='title.name', read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title_id', 'title_name')
+
+
+class UserCommentSerializer(CommentSerializer):
+    """Комментарий в ленте пользователя вместе с отзывом и произведением."""
+    review_id = serializers.IntegerField(read_only=True)
+    title_id = serializers.IntegerField(
+        source='review.title_id', read_only=True
+    )
+    title_name = serializers.CharField(
+        source='review.title.name', read_only=True
+    )
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + (
+            'review_id', 'title_id', 'title_name'
+        )
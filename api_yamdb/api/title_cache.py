@@ -0,0 +1,86 @@
+"""
+Кэш карточек произведений для GET /api/v1/titles/{id}/.
+
+Готовое представление TitleSerializerGet хранится под ключом с id
+произведения вместе с токеном версии, с которым оно было построено.
+Отдельный ключ хранит текущую версию произведения. Сигналы об изменении
+самого произведения, его отзывов, жанров и переименовании категории или
+жанра (reviews.changes) после коммита транзакции заменяют версию
+на новую, и старая карточка перестаёт совпадать с ней.
+
+Версия читается до построения карточки: если изменение закоммитится,
+пока карточка строится, она будет сохранена со старой версией и не
+будет отдана. Версии и карточки должны лежать в общем для всех
+процессов кэше, иначе процесс не узнает об изменениях в другом: если
+TITLE_CACHE_ALIAS — кэш памяти процесса (LocMemCache), карточки не
+кэшируются и всегда берутся из хранилища документов.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from api_yamdb import metrics
+
+DETAIL_KEY = 'title-detail:{}'
+VERSION_KEY = 'title-version:{}'
+
+
+def get_cache():
+    return caches[settings.TITLE_CACHE_ALIAS]
+
+
+def is_enabled():
+    return not isinstance(get_cache(), LocMemCache)
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def get_detail(title_id):
+    """
+    Возвращает (карточка, версия). Карточка None, если её нет в кэше
+    или она построена для другой версии; версия None, если кэш выключен.
+    """
+    if not is_enabled():
+        return None, None
+    cache = get_cache()
+    detail_key = DETAIL_KEY.format(title_id)
+    version_key = VERSION_KEY.format(title_id)
+    values = cache.get_many([detail_key, version_key])
+    version, entry = values.get(version_key), values.get(detail_key)
+    if version is not None and entry and entry['version'] == version:
+        metrics.inc(
+            'yamdb_cache_requests_total', cache='title_detail', result='hit'
+        )
+        return entry['data'], version
+    metrics.inc(
+        'yamdb_cache_requests_total', cache='title_detail', result='miss'
+    )
+    if version is None:
+        version = new_version()
+        if not cache.add(version_key, version, timeout=None):
+            version = cache.get(version_key, version)
+    return None, version
+
+
+def set_detail(title_id, version, data):
+    if version is None:
+        return
+    get_cache().set(
+        DETAIL_KEY.format(title_id),
+        {'version': version, 'data': data},
+        timeout=settings.TITLE_CACHE_TIMEOUT
+    )
+
+
+def invalidate(title_ids):
+    """Меняет версии произведений, их карточки перестают отдаваться."""
+    if not is_enabled():
+        return
+    get_cache().set_many(
+        {VERSION_KEY.format(pk): new_version() for pk in title_ids},
+        timeout=None
+    )
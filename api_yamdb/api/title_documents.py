@@ -0,0 +1,51 @@
+"""
+Хранилище готовых документов произведений (TitleDocument).
+
+Документ — результат TitleSerializerGet, посчитанный заранее: чтение
+карточки или страницы списка берёт его одним запросом по первичному
+ключу, без JOIN с категорией и жанрами. Документы пересобираются
+конвейером reviews.changes после коммита изменений, в том числе для
+всех произведений переименованной категории или жанра. Если документа
+нет (хранилище ещё не собрано), представление строится сериализатором.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from reviews.models import Title, TitleDocument
+from reviews.purge import in_batches
+from .serializers import TitleSerializerGet
+
+
+def build_documents(title_ids):
+    titles = Title.objects.visible().filter(
+        pk__in=title_ids
+    ).select_related('category').prefetch_related('genre')
+    return {title.pk: TitleSerializerGet(title).data for title in titles}
+
+
+def refresh_documents(title_ids):
+    """
+    Пересобирает документы произведений. Документы скрытых и удалённых
+    произведений удаляются.
+    """
+    for batch in in_batches(title_ids, settings.TITLE_DOCUMENTS_BATCH_SIZE):
+        documents = build_documents(batch)
+        with transaction.atomic():
+            TitleDocument.objects.filter(pk__in=batch).delete()
+            TitleDocument.objects.bulk_create(
+                TitleDocument(title_id=pk, document=document)
+                for pk, document in documents.items()
+            )
+
+
+def get_documents(title_ids):
+    """
+    Возвращает {id: документ} для видимых произведений, у которых
+    документ собран. Видимость проверяется по таблице Title: если
+    пересборка после скрытия произведения не удалась, его документ
+    остаётся в хранилище, но не отдаётся.
+    """
+    return dict(TitleDocument.objects.filter(
+        pk__in=title_ids,
+        title_id__in=Title.objects.visible().values('pk')
+    ).values_list('title_id', 'document'))
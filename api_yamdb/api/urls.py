@@ -3,7 +3,8 @@ from rest_framework import routers
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
                     ReviewViewSet, TitleViewSet, UserViewSet,
-                    AdminCreateUserView, CustomTokenObtainView, UserSignupView)
+                    AdminBulkCreateUsersView, AdminCreateUserView,
+                    CustomTokenObtainView, UserSignupView)
 
 router = routers.DefaultRouter()
 router.register(r'users', UserViewSet, basename='users')
@@ -28,4 +29,8 @@ urlpatterns = [
         'auth/admin/create/',
         AdminCreateUserView.as_view(),
         name='admin_create_user'),
+    path(
+        'auth/admin/create/bulk/',
+        AdminBulkCreateUsersView.as_view(),
+        name='admin_bulk_create_users'),
 ]
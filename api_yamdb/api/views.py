@@ -1,25 +1,32 @@
-from django.db.models import Avg
-
+from django.conf import settings
+from django.db import transaction
 from rest_framework import filters, status, viewsets, mixins
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
-from reviews.models import Category, Genre, Review, Title
+from api_yamdb.write_queue import run_write
+from reviews.constants import PurgeJobKind
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.purge import schedule_purge
 from users.models import User
+from . import title_cache, title_documents
+from .provisioning import provision_users, summarize
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
                           IsAuthorOrModerOrAdminOrSuperuser
                           )
-from .filters import TitleFilter
+from .filters import StrictOrderingFilter, TitleFilter
+from .pagination import AuthorActivityPagination
 from .serializers import (CategorySerializer, CommentSerializer,
                           ReviewSerializer, TitleSerializer,
                           TitleSerializerGet, AdminUserCreateSerializer,
                           MeUserSerializer, MeUserUpdateSerializer,
                           UserSerializer, TokenObtainSerializer,
-                          SignUpSerializer, GenreSerializer)
+                          SignUpSerializer, GenreSerializer,
+                          UserCommentSerializer, UserReviewSerializer)
 
 
 class UserSignupView(APIView):
@@ -40,11 +47,11 @@ class CustomTokenObtainView(APIView):
         serializer = TokenObtainSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        username = serializer.validated_data.get('username')
-        user = User.objects.get(username=username)
-        refresh = RefreshToken.for_user(user)
+        # Пользователь уже загружен при проверке кода подтверждения,
+        # а refresh-токен клиенту не выдаётся: подписываем только access.
+        token = AccessToken.for_user(serializer.validated_data['user'])
         data = {
-            'token': str(refresh.access_token),
+            'token': str(token),
         }
 
         return Response(data, status=status.HTTP_200_OK)
@@ -62,10 +69,45 @@ class AdminCreateUserView(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class AdminBulkCreateUsersView(APIView):
+    """Создание списка пользователей с результатом по каждой строке."""
+    permission_classes = [IsAdmin]
+
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {'detail': 'Expected a list of users.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > settings.USER_PROVISION_MAX_ROWS:
+            return Response(
+                {'detail': f'At most {settings.USER_PROVISION_MAX_ROWS} '
+                           f'users per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        with_password = sum(
+            isinstance(row, dict) and bool(row.get('password'))
+            for row in rows
+        )
+        if with_password > settings.USER_PROVISION_MAX_PASSWORD_ROWS:
+            return Response(
+                {'detail': f'At most '
+                           f'{settings.USER_PROVISION_MAX_PASSWORD_ROWS} '
+                           f'users with a password per request; use the '
+                           f'provision_users command for larger batches.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Без пула процессов: fork из потока воркера копирует соединения
+        # и фоновые потоки процесса.
+        return Response(summarize(provision_users(rows, workers=1)))
+
+
 class TitleViewSet(viewsets.ModelViewSet):
     queryset = Title.objects.all()
     serializer_class = TitleSerializer
     filterset_class = TitleFilter
+    ordering_fields = ('name', 'year', 'rating', 'review_count')
     permission_classes = [IsAdminOrReadOnly]
     http_method_names = ['get', 'post', 'patch', 'delete']
 
@@ -76,9 +118,76 @@ class TitleViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """
-        Переопределяем этот метод, чтобы добавить аннотацию с рейтингом.
+        Рейтинг хранится в самой таблице Title, категория и жанры
+        подгружаются заранее, без отдельного запроса на каждую строку.
+        """
+        return Title.objects.visible().select_related(
+            'category'
+        ).prefetch_related('genre')
+
+    def get_documents(self, title_ids):
+        """
+        Документы произведений в порядке title_ids. Несобранные документы
+        строятся сериализатором.
+        """
+        documents = title_documents.get_documents(title_ids)
+        missing = [pk for pk in title_ids if pk not in documents]
+        if missing:
+            documents.update(title_documents.build_documents(missing))
+        return [documents[pk] for pk in title_ids if pk in documents]
+
+    def get_document(self, title_id):
+        if not settings.TITLE_DOCUMENTS_READS:
+            return None
+        return title_documents.get_documents([title_id]).get(title_id)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Фильтры, сортировка и пагинация применяются к таблице Title,
+        а страница отдаётся из хранилища документов.
         """
-        return Title.objects.annotate(rating=Avg('reviews__score'))
+        if not settings.TITLE_DOCUMENTS_READS:
+            return super().list(request, *args, **kwargs)
+        title_ids = self.filter_queryset(
+            Title.objects.visible()
+        ).values_list('pk', flat=True)
+        page = self.paginate_queryset(title_ids)
+        if page is None:
+            return Response(self.get_documents(list(title_ids)))
+        return self.get_paginated_response(self.get_documents(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Карточка отдаётся из кэша, пока произведение не изменилось,
+        при промахе — из хранилища документов.
+        """
+        title_id = self.kwargs[self.lookup_field]
+        if not str(title_id).isdigit():
+            return super().retrieve(request, *args, **kwargs)
+        data, version = title_cache.get_detail(title_id)
+        if data is None:
+            data = self.get_document(int(title_id))
+            if data is None:
+                data = super().retrieve(request, *args, **kwargs).data
+            title_cache.set_detail(title_id, version, data)
+        return Response(data)
+
+    def perform_create(self, serializer):
+        run_write(serializer.save)
+
+    def perform_update(self, serializer):
+        run_write(serializer.save)
+
+    def perform_destroy(self, instance):
+        """
+        Произведение сразу скрывается, а отзывы и комментарии
+        удаляются фоновой задачей порциями.
+        """
+        with transaction.atomic():
+            titles = Title.objects.filter(pk=instance.pk)
+            titles.update(is_hidden=True)
+            titles.notify_changed()
+            schedule_purge(PurgeJobKind.TITLE, instance.pk)
 
 
 class GenreViewSet(mixins.ListModelMixin,
@@ -93,8 +202,9 @@ class GenreViewSet(mixins.ListModelMixin,
     lookup_field = 'slug'
     permission_classes = [IsAdminOrReadOnly]
 
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (filters.SearchFilter, StrictOrderingFilter)
     search_fields = ('name',)
+    ordering_fields = ('name', 'slug')
 
 
 class CategoryViewSet(mixins.ListModelMixin,
@@ -109,26 +219,57 @@ class CategoryViewSet(mixins.ListModelMixin,
     lookup_field = 'slug'
     permission_classes = [IsAdminOrReadOnly]
 
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (filters.SearchFilter, StrictOrderingFilter)
     search_fields = ('name',)
+    ordering_fields = ('name', 'slug')
 
 
 class ReviewViewSet(viewsets.ModelViewSet):
     """ViewSet для работы с объектами модели Review."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorOrModerOrAdminOrSuperuser,)
+    ordering_fields = ('pub_date', 'score', 'comment_count')
     http_method_names = ['get', 'post', 'patch', 'delete']
 
     def get_title(self):
         """Метод получает Title по ID, переданному в URL параметрах."""
-        return get_object_or_404(Title, id=self.kwargs['title_id'])
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.visible(), id=self.kwargs['title_id']
+            )
+        return self._title
+
+    def get_cached_count(self):
+        """Число отзывов для пагинации берётся из Title.review_count."""
+        return self.get_title().review_count
 
     def get_queryset(self):
         """Метод возвращает все отзывы для конкретного произведения (Title)."""
         return self.get_title().reviews.all()
 
+    def refresh_title_rating(self):
+        """Пересчитывает рейтинг и число отзывов произведения."""
+        Title.objects.filter(id=self.kwargs['title_id']).refresh_ratings()
+
+    def save_review(self, serializer, **kwargs):
+        serializer.save(**kwargs)
+        self.refresh_title_rating()
+
+    def delete_review(self, instance):
+        instance.delete()
+        self.refresh_title_rating()
+
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        run_write(
+            self.save_review, serializer,
+            author=self.request.user, title=self.get_title()
+        )
+
+    def perform_update(self, serializer):
+        run_write(self.save_review, serializer)
+
+    def perform_destroy(self, instance):
+        run_write(self.delete_review, instance)
 
 
 class CommentViewSet(viewsets.ModelViewSet):
@@ -137,42 +278,84 @@ class CommentViewSet(viewsets.ModelViewSet):
     """
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrModerOrAdminOrSuperuser,)
+    ordering_fields = ('pub_date',)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
     def get_review(self):
         """
         Метод получает отзыв (Review) по ID, переданному в URL параметрах.
+        Проверяет, что отзыв относится к Title из URL.
         """
-        return get_object_or_404(Review, id=self.kwargs['review_id'])
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id'],
+                title__is_hidden=False
+            )
+        return self._review
 
     def get_queryset(self):
         """
         Метод возвращает все комментарии для конкретного отзыва (Review).
-        Проверяет существование Title с id, связанным с отзывом.
         """
-        title = get_object_or_404(Title, id=self.kwargs['title_id'])
-        review = get_object_or_404(
-            Review, id=self.kwargs['review_id'], title=title
-        )
-        return review.comments.all()
+        return self.get_review().comments.all()
+
+    def get_cached_count(self):
+        """Число комментариев для пагинации берётся из comment_count."""
+        return self.get_review().comment_count
+
+    def save_comment(self, serializer, **kwargs):
+        serializer.save(**kwargs)
+        Review.objects.filter(
+            id=self.kwargs['review_id']
+        ).change_comment_count(1)
+
+    def delete_comment(self, instance):
+        instance.delete()
+        Review.objects.filter(
+            id=self.kwargs['review_id']
+        ).change_comment_count(-1)
 
     def perform_create(self, serializer):
         """
         Метод сохраняет новый комментарий,
         связывая его с автором и отзывом (Review).
         """
-        serializer.save(author=self.request.user, review=self.get_review())
+        run_write(
+            self.save_comment, serializer,
+            author=self.request.user, review=self.get_review()
+        )
+
+    def perform_update(self, serializer):
+        run_write(serializer.save)
+
+    def perform_destroy(self, instance):
+        run_write(self.delete_comment, instance)
 
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (filters.SearchFilter, StrictOrderingFilter)
     permission_classes = [IsAdmin]
     lookup_field = 'username'
     search_fields = ('username',)
+    ordering_fields = ('username',)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def perform_destroy(self, instance):
+        """
+        Учётная запись сразу отключается, а отзывы и комментарии
+        пользователя удаляются фоновой задачей порциями.
+
+        UPDATE блокирует строку пользователя, поэтому параллельный
+        DELETE дождётся коммита и увидит уже созданную задачу.
+        """
+        with transaction.atomic():
+            User.objects.filter(pk=instance.pk).update(is_active=False)
+            schedule_purge(PurgeJobKind.USER, instance.pk)
+
     @action(detail=False, methods=['get', 'patch'],
             permission_classes=[IsAuthenticated])
     def me(self, request):
@@ -189,3 +372,59 @@ class UserViewSet(viewsets.ModelViewSet):
 
         serializer = MeUserSerializer(user, context={'request': request})
         return Response(serializer.data)
+
+    def get_activity_response(self, queryset, serializer_class):
+        """
+        Отдаёт страницу ленты пользователя с keyset-пагинацией.
+
+        Произведение подтягивается через select_related,
+        без отдельного запроса на каждую строку.
+        """
+        paginator = AuthorActivityPagination()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = serializer_class(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    def get_user_reviews(self, user):
+        return self.get_activity_response(
+            Review.objects.filter(
+                author=user, title__is_hidden=False
+            ).select_related(
+                'author', 'title'
+            ),
+            UserReviewSerializer
+        )
+
+    def get_user_comments(self, user):
+        return self.get_activity_response(
+            Comment.objects.filter(
+                author=user, review__title__is_hidden=False
+            ).select_related(
+                'author', 'review__title'
+            ),
+            UserCommentSerializer
+        )
+
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def reviews(self, request, username=None):
+        return self.get_user_reviews(
+            get_object_or_404(User, username=username, is_active=True)
+        )
+
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def comments(self, request, username=None):
+        return self.get_user_comments(
+            get_object_or_404(User, username=username, is_active=True)
+        )
+
+    @action(detail=False, methods=['get'], url_path='me/reviews',
+            permission_classes=[IsAuthenticated])
+    def me_reviews(self, request):
+        return self.get_user_reviews(request.user)
+
+    @action(detail=False, methods=['get'], url_path='me/comments',
+            permission_classes=[IsAuthenticated])
+    def me_comments(self, request):
+        return self.get_user_comments(request.user)
@@ -0,0 +1,142 @@
+"""
+Сжатие ответов API в gzip или brotli по заголовку Accept-Encoding.
+
+Сжатые тела кэшируются по хэшу исходного тела: одинаковые ответы
+(популярные страницы, ответы из кэша) сжимаются один раз, а на
+повторных запросах берутся готовыми. Кэшируются только ответы, которые
+повторяются: анонимные GET-запросы к маршрутам COMPRESSION_CACHE_ROUTES.
+Кэш COMPRESSION_CACHE_ALIAS отдельный, со своим пределом размера.
+Brotli используется, только если установлен пакет brotli.
+"""
+import gzip
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    'application/json', 'text/', 'application/javascript',
+)
+CACHE_KEY = 'compressed:{}:{}'
+ENCODING_RE = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q=([0-9.]+))?')
+
+
+def gzip_compress(content):
+    return gzip.compress(
+        content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0
+    )
+
+
+def brotli_compress(content):
+    return brotli.compress(
+        content, quality=settings.COMPRESSION_BROTLI_QUALITY
+    )
+
+
+COMPRESSORS = {'gzip': gzip_compress}
+if brotli is not None:
+    COMPRESSORS['br'] = brotli_compress
+
+# При равных q-весах предпочитаем brotli: он сжимает JSON плотнее.
+ENCODING_PREFERENCE = ('br', 'gzip')
+
+
+def choose_encoding(accept_encoding):
+    """Выбирает поддерживаемую кодировку с наибольшим q из Accept-Encoding."""
+    weights = {}
+    for part in accept_encoding.split(','):
+        match = ENCODING_RE.match(part)
+        if not match:
+            continue
+        name, quality = match.group(1).lower(), match.group(2)
+        try:
+            weights[name] = float(quality) if quality else 1.0
+        except ValueError:
+            continue
+    candidates = [
+        (weights.get(name, weights.get('*', 0)), -index, name)
+        for index, name in enumerate(ENCODING_PREFERENCE)
+        if name in COMPRESSORS
+    ]
+    quality, _, name = max(candidates)
+    return name if quality > 0 else None
+
+
+def is_cacheable(request):
+    """Ответ одинаков для всех клиентов и, вероятно, будет запрошен снова."""
+    match = request.resolver_match
+    return (
+        request.method in ('GET', 'HEAD')
+        and 'HTTP_AUTHORIZATION' not in request.META
+        and match is not None
+        and match.url_name in settings.COMPRESSION_CACHE_ROUTES
+    )
+
+
+def compress_cached(content, encoding):
+    """Сжимает тело, используя ранее сжатый вариант из кэша, если он есть."""
+    cache = caches[settings.COMPRESSION_CACHE_ALIAS]
+    key = CACHE_KEY.format(encoding, hashlib.sha1(content).hexdigest())
+    compressed = cache.get(key)
+    metrics.inc(
+        'yamdb_cache_requests_total', cache='compression',
+        result='miss' if compressed is None else 'hit'
+    )
+    if compressed is None:
+        compressed = COMPRESSORS[encoding](content)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы длиннее COMPRESSION_MIN_SIZE байт.
+
+    Поведение повторяет django.middleware.gzip.GZipMiddleware:
+    потоковые и уже сжатые ответы пропускаются, к ETag добавляется
+    суффикс кодировки, выставляется Vary: Accept-Encoding.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming
+                or response.has_header('Content-Encoding')
+                or len(response.content) < settings.COMPRESSION_MIN_SIZE
+                or not response.get('Content-Type', '').startswith(
+                    COMPRESSIBLE_CONTENT_TYPES)):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+
+        if is_cacheable(request):
+            compressed = compress_cached(response.content, encoding)
+        else:
+            compressed = COMPRESSORS[encoding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        if response.has_header('ETag'):
+            response['ETag'] = re.sub(
+                r'"$', f';{encoding}"', response['ETag']
+            )
+        return response
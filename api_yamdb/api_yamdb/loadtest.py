@@ -0,0 +1,231 @@
+"""
+Нагрузочный прогон Postman-коллекции без Postman.
+
+Коллекция разбирается в список запросов с путём папок. Переменные
+{{...}} подставляются из переменных коллекции и из значений, которые
+тестовые скрипты запросов сохраняют через pm.collectionVariables.set:
+скрипты не исполняются, из них извлекаются только пары
+«переменная — поле ответа» и ожидаемый статус-код. Коды подтверждения
+читаются из почтового ящика, настроенного в EMAIL_BACKEND.
+"""
+import email
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.core import mail
+
+VARIABLE_RE = re.compile(r'{{\s*(\w+)\s*}}')
+FIELD_RE = re.compile(
+    r'''const (\w+) = _\.get\(responseData, ["']([\w.]+)["']\)'''
+)
+SETTER_RE = re.compile(r'pm\.collectionVariables\.set\("(\w+)", (\w+)\)')
+STATUS_RE = re.compile(r'Статус-код ответа\D*(\d{3})')
+CODE_RE = re.compile(r'Your confirmation code is (\S+)')
+BASE_URL_RE = re.compile(r'^https?://[^/]+')
+MESSAGE_SEPARATOR = '-' * 79
+
+
+@dataclass
+class CollectionRequest:
+    name: str
+    folder: tuple
+    method: str
+    url: str
+    body: str = None
+    token: str = None
+    expected_status: int = None
+    captures: dict = field(default_factory=dict)
+
+
+def parse_script(lines):
+    """Извлекает из тестового скрипта ожидаемый статус и сохраняемые поля."""
+    source = '\n'.join(lines)
+    fields = dict(FIELD_RE.findall(source))
+    captures = {
+        variable: fields[local]
+        for variable, local in SETTER_RE.findall(source)
+        if local in fields
+    }
+    status = STATUS_RE.search(source)
+    return int(status.group(1)) if status else None, captures
+
+
+def get_token(auth, inherited):
+    """Bearer-токен запроса; пустая авторизация наследуется от папки."""
+    if not auth or auth.get('type') == 'inherit':
+        return inherited
+    return next(
+        (value['value'] for value in auth.get('bearer', ())
+         if value['key'] == 'token'),
+        None
+    )
+
+
+def parse_items(items, folder=(), token=None):
+    for item in items:
+        if 'item' in item:
+            yield from parse_items(
+                item['item'], folder + (item['name'],),
+                get_token(item.get('auth'), token)
+            )
+            continue
+        request = item['request']
+        url = request['url']
+        expected_status, captures = None, {}
+        for event in item.get('event', ()):
+            if event['listen'] == 'test':
+                expected_status, captures = parse_script(
+                    event['script']['exec']
+                )
+        yield CollectionRequest(
+            name=item['name'],
+            folder=folder,
+            method=request['method'],
+            url=url['raw'] if isinstance(url, dict) else url,
+            body=(request.get('body') or {}).get('raw'),
+            token=get_token(request.get('auth'), token),
+            expected_status=expected_status,
+            captures=captures,
+        )
+
+
+def parse_collection(data):
+    """Возвращает переменные коллекции и список её запросов."""
+    variables = {
+        variable['key']: variable.get('value', '')
+        for variable in data.get('variable', ())
+    }
+    return variables, list(parse_items(data['item']))
+
+
+def resolve(template, variables):
+    if template is None:
+        return None
+    return VARIABLE_RE.sub(
+        lambda match: str(variables.get(match.group(1), match.group(0))),
+        template
+    )
+
+
+def get_field(data, path):
+    for key in path.split('.'):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def read_confirmation_codes(mail_dir=None):
+    """Последний код подтверждения для каждого email из почтового ящика."""
+    codes = {}
+    if settings.EMAIL_BACKEND.endswith('locmem.EmailBackend'):
+        for message in getattr(mail, 'outbox', ()):
+            match = CODE_RE.search(message.body)
+            if match:
+                for recipient in message.to:
+                    codes[recipient] = match.group(1)
+        return codes
+
+    directory = Path(mail_dir or settings.EMAIL_FILE_PATH)
+    for path in sorted(
+            directory.glob('*.log'), key=lambda path: path.stat().st_mtime):
+        for raw in path.read_text(encoding='utf-8').split(MESSAGE_SEPARATOR):
+            message = email.message_from_string(raw.strip())
+            payload = message.get_payload(decode=True)
+            match = payload and CODE_RE.search(payload.decode())
+            if match and message['To']:
+                codes[message['To'].strip()] = match.group(1)
+    return codes
+
+
+def apply_confirmation_codes(variables, codes):
+    """Записывает коды в переменные вида <роль>ConfirmationCode."""
+    for key, value in list(variables.items()):
+        if key.endswith('Email') and value in codes:
+            variables[key[:-len('Email')] + 'ConfirmationCode'] = codes[value]
+
+
+@dataclass
+class Result:
+    folder: tuple
+    name: str
+    status: int
+    expected_status: int
+    elapsed: float
+
+    @property
+    def failed(self):
+        return self.status is None or self.status >= 500
+
+    @property
+    def unexpected(self):
+        return (
+            self.expected_status is not None
+            and self.status != self.expected_status
+        )
+
+
+class VirtualUser:
+    """Выполняет запросы коллекции по порядку в своей HTTP-сессии."""
+
+    def __init__(self, session, variables, base_url=None, timeout=30):
+        self.session = session
+        self.variables = dict(variables)
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def run(self, requests):
+        return [self.send(request) for request in requests]
+
+    def send(self, request):
+        url = resolve(request.url, self.variables)
+        if self.base_url:
+            url = BASE_URL_RE.sub(self.base_url.rstrip('/'), url)
+        headers = {}
+        if request.token:
+            headers['Authorization'] = (
+                f'Bearer {resolve(request.token, self.variables)}'
+            )
+        body = resolve(request.body, self.variables)
+        if body:
+            headers['Content-Type'] = 'application/json'
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                request.method, url, data=body and body.encode(),
+                headers=headers, timeout=self.timeout
+            )
+        except OSError:
+            return Result(
+                request.folder, request.name, None,
+                request.expected_status, time.perf_counter() - started
+            )
+        elapsed = time.perf_counter() - started
+        if request.captures and response.content:
+            self.capture(request, response)
+        return Result(
+            request.folder, request.name, response.status_code,
+            request.expected_status, elapsed
+        )
+
+    def capture(self, request, response):
+        """Сохраняет поля ответа в переменные, как тестовый скрипт."""
+        try:
+            data = response.json()
+        except ValueError:
+            return
+        for variable, path in request.captures.items():
+            value = get_field(data, path)
+            if value:
+                self.variables[variable] = value
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    if not values:
+        return 0
+    index = round(percent / 100 * (len(values) - 1))
+    return values[min(index, len(values) - 1)]
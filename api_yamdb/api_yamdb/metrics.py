@@ -0,0 +1,448 @@
+"""
+Метрики приложения в текстовом формате Prometheus (/metrics).
+
+Счётчики ведутся без блокировок: у каждого потока свой набор словарей,
+которые при чтении метрик копируются и суммируются. Набор завершившегося
+потока прибавляется к общему итогу процесса и больше не хранится, так
+что число наборов не растёт с числом созданных потоков. Для prefork-серверов
+(несколько процессов) задаётся METRICS_MULTIPROCESS_DIR: каждый процесс
+периодически сохраняет туда свой снимок, а /metrics суммирует снимки
+всех процессов. Снимки завершившихся воркеров главный процесс gunicorn
+переносит в общий итог retired.json (retire_process), поэтому счётчики
+не пропадают и не удваиваются при перезапуске воркеров, а каталог
+не растёт.
+
+Метки route — имена маршрутов из api/urls.py.
+
+/metrics отдаётся только адресам из METRICS_ALLOWED_IPS или запросу
+с заголовком «Authorization: Bearer <METRICS_SECRET>»; остальным
+отвечает 404.
+"""
+import atexit
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from django.http import Http404, HttpResponse
+
+from reviews.constants import PurgeJobStatus
+
+UNMATCHED_ROUTE = 'unmatched'
+
+_route = ContextVar('metrics_route', default=UNMATCHED_ROUTE)
+
+COUNTERS = {
+    'yamdb_requests_total': 'Обработанные запросы.',
+    'yamdb_db_queries_total': 'Запросы к базе данных.',
+    'yamdb_db_query_seconds_total': 'Время выполнения запросов к базе.',
+    'yamdb_cache_requests_total': 'Обращения к кэшу (result=hit|miss).',
+    'yamdb_throttled_requests_total': 'Запросы, отклонённые троттлингом.',
+}
+HISTOGRAMS = {
+    'yamdb_request_duration_seconds': (
+        'Длительность обработки запроса.',
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    ),
+    'yamdb_pagination_offset': (
+        'Смещение запрошенной страницы списка.',
+        (0, 10, 50, 100, 500, 1000, 5000, 10000),
+    ),
+}
+
+
+class Shard:
+    """Метрики одного потока: пишет только он, поэтому без блокировок."""
+
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.histograms = {}
+
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()
+# Метрики завершившихся потоков.
+_retired = Shard()
+# Наборы потоков, объекты которых собраны сборщиком мусора. Финализатор
+# только добавляет в список: он может сработать в любой момент, в том
+# числе под _shards_lock.
+_dead = []
+
+
+def get_shard():
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = _local.shard = Shard()
+        weakref.finalize(
+            threading.current_thread(), _dead.append, shard
+        ).atexit = False
+        with _shards_lock:
+            retire_dead_shards()
+            _shards.append(shard)
+        return shard
+
+
+def retire_dead_shards():
+    """Переносит метрики завершившихся потоков в _retired (под блокировкой)."""
+    while _dead:
+        shard = _dead.pop()
+        if shard in _shards:
+            _shards.remove(shard)
+            add_shard(_retired.counters, _retired.histograms, shard)
+
+
+def reset():
+    """Сбрасывает метрики процесса (в дочернем процессе после fork)."""
+    global _local, _retired, _dead, _snapshot_name
+    _local = threading.local()
+    _snapshot_name = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+    with _shards_lock:
+        _shards.clear()
+        _retired = Shard()
+        _dead = []
+
+
+os.register_at_fork(after_in_child=reset)
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    get_shard().counters[name, label_key(labels)] += value
+
+
+def observe(name, value, **labels):
+    histograms = get_shard().histograms
+    key = name, label_key(labels)
+    histogram = histograms.get(key)
+    if histogram is None:
+        buckets = HISTOGRAMS[name][1]
+        histogram = histograms[key] = [[0] * len(buckets), 0.0, 0]
+    for index, bound in enumerate(HISTOGRAMS[name][1]):
+        if value <= bound:
+            histogram[0][index] += 1
+            break
+    histogram[1] += value
+    histogram[2] += 1
+
+
+def current_route():
+    return _route.get()
+
+
+def add_shard(counters, histograms, shard):
+    for key, value in shard.counters.copy().items():
+        counters[key] += value
+    for key, (buckets, total, count) in shard.histograms.copy().items():
+        merge_histogram(histograms, key, list(buckets), total, count)
+
+
+def snapshot():
+    """Суммирует метрики всех потоков процесса."""
+    counters = defaultdict(float)
+    histograms = {}
+    with _shards_lock:
+        retire_dead_shards()
+        shards = [_retired, *_shards]
+    for shard in shards:
+        add_shard(counters, histograms, shard)
+    return counters, histograms
+
+
+def merge_histogram(histograms, key, buckets, total, count):
+    if key not in histograms:
+        histograms[key] = [buckets, total, count]
+        return
+    merged = histograms[key]
+    merged[0] = [left + right for left, right in zip(merged[0], buckets)]
+    merged[1] += total
+    merged[2] += count
+
+
+_last_flush = 0.0
+# Снимок процесса — <pid>-<токен>.json: токен отличает процесс, которому
+# достался pid завершившегося воркера.
+_snapshot_name = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+RETIRED_FILE = 'retired.json'
+# Сколько имён снимков завершившихся процессов помнить в RETIRED_FILE.
+RETIRED_NAMES_LIMIT = 1000
+
+
+def dump_metrics(counters, histograms, **extra):
+    return {
+        'counters': [
+            [name, labels, value]
+            for (name, labels), value in counters.items()
+        ],
+        'histograms': [
+            [name, labels, *histogram]
+            for (name, labels), histogram in histograms.items()
+        ],
+        **extra,
+    }
+
+
+def load_metrics(data, counters, histograms):
+    for name, labels, value in data['counters']:
+        counters[name, tuple(map(tuple, labels))] += value
+    for name, labels, buckets, total, count in data['histograms']:
+        merge_histogram(
+            histograms, (name, tuple(map(tuple, labels))),
+            buckets, total, count
+        )
+
+
+def write_json(path, data):
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(data), encoding='utf-8')
+    os.replace(temporary, path)
+
+
+def read_json(path):
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def flush():
+    """Сохраняет снимок процесса в METRICS_MULTIPROCESS_DIR."""
+    global _last_flush
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if not directory:
+        return
+    _last_flush = time.monotonic()
+    write_json(
+        Path(directory) / f'{_snapshot_name}.json', dump_metrics(*snapshot())
+    )
+
+
+def maybe_flush():
+    if (settings.METRICS_MULTIPROCESS_DIR and time.monotonic() - _last_flush
+            >= settings.METRICS_FLUSH_INTERVAL):
+        flush()
+
+
+atexit.register(lambda: settings.configured and flush())
+
+
+def retire_process(directory, pid):
+    """
+    Переносит снимки завершившегося процесса в общий итог RETIRED_FILE
+    и удаляет их. Вызывается из главного процесса gunicorn (child_exit),
+    поэтому одновременно выполняется только один перенос.
+
+    Итог записывается вместе с именами перенесённых снимков раньше, чем
+    они удаляются: collect() пропускает эти снимки и не считает их дважды.
+    """
+    directory = Path(directory)
+    paths = list(directory.glob(f'{pid}-*.json'))
+    if paths:
+        retired = read_json(directory / RETIRED_FILE) or {
+            'counters': [], 'histograms': [], 'names': []
+        }
+        counters, histograms = defaultdict(float), {}
+        for data in [retired, *map(read_json, paths)]:
+            if data is not None:
+                load_metrics(data, counters, histograms)
+        names = retired['names'] + [path.name for path in paths]
+        write_json(directory / RETIRED_FILE, dump_metrics(
+            counters, histograms, names=names[-RETIRED_NAMES_LIMIT:]
+        ))
+    for path in [*paths, *directory.glob(f'{pid}-*.tmp')]:
+        path.unlink(missing_ok=True)
+
+
+def collect():
+    """Метрики процесса или, в многопроцессном режиме, всех процессов."""
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if not directory:
+        return snapshot()
+    flush()
+    counters = defaultdict(float)
+    histograms = {}
+    directory = Path(directory)
+    retired = read_json(directory / RETIRED_FILE)
+    retired_names = set()
+    if retired is not None:
+        load_metrics(retired, counters, histograms)
+        retired_names = set(retired['names'])
+    # Недописанные снимки *.tmp под шаблон не попадают.
+    for path in directory.glob('*-*.json'):
+        if path.name in retired_names:
+            continue
+        data = read_json(path)
+        if data is not None:
+            load_metrics(data, counters, histograms)
+    return counters, histograms
+
+
+def format_labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(
+            name, str(value).replace('\\', r'\\').replace('"', r'\"')
+        )
+        for name, value in pairs
+    ) + '}'
+
+
+def format_bound(bound):
+    return str(float(bound))
+
+
+def render(counters, histograms, gauges):
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{format_labels(labels)} {value}')
+    for name, (help_text, bounds) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (metric, labels), (buckets, total, count) in sorted(
+                histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket in zip(bounds, buckets):
+                cumulative += bucket
+                lines.append(
+                    f'{name}_bucket'
+                    f'{format_labels(labels, le=format_bound(bound))} '
+                    f'{cumulative}'
+                )
+            lines += [
+                f'{name}_bucket{format_labels(labels, le="+Inf")} {count}',
+                f'{name}_sum{format_labels(labels)} {total}',
+                f'{name}_count{format_labels(labels)} {count}',
+            ]
+    for name, (help_text, values) in gauges.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+        for labels, value in values:
+            lines.append(f'{name}{format_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def cache_hit_ratios(counters):
+    requests = defaultdict(lambda: {'hit': 0, 'miss': 0})
+    for (name, labels), value in counters.items():
+        if name == 'yamdb_cache_requests_total':
+            labels = dict(labels)
+            requests[labels['cache']][labels['result']] += value
+    return [
+        ((('cache', cache),), results['hit'] / (
+            results['hit'] + results['miss']
+        ))
+        for cache, results in sorted(requests.items())
+        if results['hit'] + results['miss']
+    ]
+
+
+def purge_queue_depth():
+    from reviews.models import PurgeJob
+
+    depth = dict.fromkeys(
+        (PurgeJobStatus.PENDING, PurgeJobStatus.RUNNING), 0
+    )
+    depth.update(
+        PurgeJob.objects.filter(status__in=depth).values_list(
+            'status'
+        ).annotate(Count('id')).order_by()
+    )
+    return [((('status', status),), count) for status, count in depth.items()]
+
+
+def is_allowed(request):
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    secret = settings.METRICS_SECRET
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(secret) and hmac.compare_digest(
+        header.encode(), f'Bearer {secret}'.encode()
+    )
+
+
+def metrics_view(request):
+    if not is_allowed(request):
+        raise Http404
+    counters, histograms = collect()
+    gauges = {
+        'yamdb_cache_hit_ratio': (
+            'Доля попаданий в кэш.', cache_hit_ratios(counters)
+        ),
+        'yamdb_purge_jobs': (
+            'Задачи фонового удаления в очереди.', purge_queue_depth()
+        ),
+    }
+    return HttpResponse(
+        render(counters, histograms, gauges),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+class MetricsMiddleware:
+    """Считает запросы, их длительность и запросы к базе по маршрутам."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0, 0.0]
+
+        def count_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries[0] += 1
+                queries[1] += time.perf_counter() - started
+
+        token = _route.set(UNMATCHED_ROUTE)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(count_query)
+                    )
+                response = self.get_response(request)
+            route = _route.get()
+        finally:
+            _route.reset(token)
+
+        inc(
+            'yamdb_requests_total', route=route, method=request.method,
+            status=str(response.status_code)
+        )
+        observe(
+            'yamdb_request_duration_seconds',
+            time.perf_counter() - started, route=route
+        )
+        if queries[0]:
+            inc('yamdb_db_queries_total', queries[0], route=route)
+            inc('yamdb_db_query_seconds_total', queries[1], route=route)
+        if response.status_code == 429:
+            inc('yamdb_throttled_requests_total', route=route)
+        maybe_flush()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        _route.set(match.url_name or match._func_path)
@@ -0,0 +1,118 @@
+"""
+Профилирование отдельных запросов в продакшене.
+
+Профилируется случайная доля запросов (PROFILING_SAMPLE_RATE) или
+конкретный запрос, в котором администратор передал заголовок
+X-Profile со значением PROFILING_SECRET. Результаты пишутся в
+PROFILING_DIR/<имя view>/ в формате pstats (cProfile) или collapsed
+stacks для flamegraph.pl / speedscope (PROFILING_FORMAT).
+
+Если выборка выключена и секрет не задан, middleware исключает себя
+из цепочки при старте и не добавляет накладных расходов.
+"""
+import cProfile
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+
+class StackSampler:
+    """Снимает стек потока каждые interval секунд в отдельном потоке."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f'{code.co_name} '
+                    f'({code.co_filename}:{code.co_firstlineno})'
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as output:
+            for stack, count in self.stacks.items():
+                output.write(f'{stack} {count}\n')
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.url_name or match._func_path
+
+
+class ProfilingMiddleware:
+
+    def __init__(self, get_response):
+        if not (settings.PROFILING_SAMPLE_RATE or settings.PROFILING_SECRET):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def should_profile(self, request):
+        secret = settings.PROFILING_SECRET
+        header = request.META.get(PROFILE_HEADER)
+        # compare_digest не принимает строки с не-ASCII символами,
+        # поэтому сравниваются байты.
+        if secret and header and hmac.compare_digest(
+                header.encode(), secret.encode()):
+            return True
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        started = time.time()
+        if settings.PROFILING_FORMAT == 'collapsed':
+            with StackSampler(
+                threading.get_ident(), settings.PROFILING_INTERVAL
+            ) as profiler:
+                response = self.get_response(request)
+            suffix = 'collapsed'
+        else:
+            profiler = cProfile.Profile()
+            response = profiler.runcall(self.get_response, request)
+            suffix = 'prof'
+
+        directory = Path(settings.PROFILING_DIR) / get_view_name(request)
+        directory.mkdir(parents=True, exist_ok=True)
+        elapsed_ms = int((time.time() - started) * 1000)
+        path = directory / (
+            f'{int(started * 1000)}-{os.getpid()}-'
+            f'{request.method}-{elapsed_ms}ms.{suffix}'
+        )
+        if suffix == 'prof':
+            profiler.dump_stats(path)
+        else:
+            profiler.dump(path)
+        return response
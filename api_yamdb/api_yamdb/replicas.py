@@ -0,0 +1,91 @@
+"""
+Маршрутизация запросов к базе между основной базой и репликами для чтения.
+
+Чтение уходит на реплики только внутри безопасных (GET, HEAD, OPTIONS)
+HTTP-запросов. После успешного изменяющего запроса клиент на
+PRIMARY_STICKINESS_SECONDS секунд «прилипает» к основной базе и видит
+свои отзывы и комментарии даже при отстающей реплике. Отметка
+«прилипания» хранится в кэше PRIMARY_STICKINESS_CACHE_ALIAS, общем для
+всех воркеров. Команды управления и shell всегда работают с основной
+базой.
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY_DATABASE = 'default'
+STICKY_CACHE_KEY = 'primary-sticky:{}'
+
+# None — вне HTTP-запроса, True — нужна основная база, False — можно реплику.
+_use_primary = ContextVar('use_primary', default=None)
+
+
+@contextmanager
+def read_from_replicas(allowed=True):
+    """Разрешает (или запрещает) чтение с реплик внутри блока."""
+    token = _use_primary.set(not allowed)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def get_client_key(request):
+    """Ключ клиента для «прилипания»: токен авторизации или IP-адрес."""
+    identity = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return STICKY_CACHE_KEY.format(
+        hashlib.sha256(identity.encode()).hexdigest()[:32]
+    )
+
+
+class PrimaryReplicaRouter:
+    """Запись — в основную базу, чтение — на случайную реплику."""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.READ_REPLICAS
+        if not replicas or _use_primary.get() is not False:
+            return PRIMARY_DATABASE
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными основной базы.
+        return db not in settings.READ_REPLICAS
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Решает для каждого запроса, можно ли читать с реплик.
+
+    Стоит первым в MIDDLEWARE, чтобы все запросы к базе внутри HTTP-запроса,
+    включая сессии, аутентификацию и метрики, шли в выбранную базу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.READ_REPLICAS:
+            return self.get_response(request)
+
+        cache = caches[settings.PRIMARY_STICKINESS_CACHE_ALIAS]
+        key = get_client_key(request)
+        is_write = request.method not in SAFE_METHODS
+        with read_from_replicas(not (is_write or cache.get(key))):
+            response = self.get_response(request)
+        if is_write and response.status_code < 400:
+            cache.set(key, True, settings.PRIMARY_STICKINESS_SECONDS)
+        return response
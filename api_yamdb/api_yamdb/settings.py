@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -31,6 +32,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.replicas.ReplicaStickinessMiddleware',
+    'api_yamdb.profiling.ProfilingMiddleware',
+    'api_yamdb.metrics.MetricsMiddleware',
+    'api_yamdb.traffic.TrafficCaptureMiddleware',
+    'api_yamdb.slow_queries.SlowQueryOriginMiddleware',
+    'api_yamdb.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,9 +75,68 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Тестовая база в файле, а не в памяти: потоки получают
+        # собственные соединения и ждут блокировку вместо ошибки.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    },
+    # Реплика для чтения. Используется, только если указана в READ_REPLICAS;
+    # в тестах это отдельная база, которая не получает записей основной,
+    # то есть реплика с бесконечным отставанием.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('REPLICA_DB_NAME', BASE_DIR / 'db_replica.sqlite3'),
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db_replica.sqlite3',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['api_yamdb.replicas.PrimaryReplicaRouter']
+
+# Псевдонимы баз, с которых читают безопасные запросы, например
+# READ_REPLICAS=replica. Пустой список — всё идёт в default.
+READ_REPLICAS = [
+    alias for alias in os.getenv('READ_REPLICAS', '').split(',') if alias
+]
+
+# Сколько секунд после записи клиент читает из основной базы. Отметки
+# лежат в общем для воркеров кэше: следующий запрос клиента обычно
+# попадает в другой воркер.
+PRIMARY_STICKINESS_SECONDS = 5
+PRIMARY_STICKINESS_CACHE_ALIAS = 'shared'
+
+
+# PRAGMA для каждого соединения SQLite (api_yamdb.sqlite). Пустой словарь —
+# настройки SQLite по умолчанию. Замер: manage.py benchmark_sqlite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    # Отрицательное значение — размер в КиБ: 64 МиБ кэша страниц.
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
 }
 
+# Очередь записи с одним писателем (api_yamdb.write_queue): изменения
+# отзывов, комментариев и произведений выполняются одним потоком процесса,
+# задания, пришедшие за WRITE_QUEUE_WINDOW_MS, коммитятся вместе.
+# Замер: manage.py benchmark_write_queue.
+WRITE_QUEUE_ENABLED = os.getenv('WRITE_QUEUE_ENABLED', '') == '1'
+WRITE_QUEUE_WINDOW_MS = 2
+WRITE_QUEUE_MAX_BATCH = 64
+
+# Массовое создание пользователей (api.provisioning): сколько строк
+# принимает один запрос и в скольких процессах команда provision_users
+# хэширует пароли (HTTP-запрос хэширует их в своём потоке).
+USER_PROVISION_MAX_ROWS = 10000
+# Хэш пароля считается около 0,1 с, и запрос, который хэширует пароли
+# в одном потоке, должен уложиться в timeout gunicorn (30 с). Больше строк с паролями
+# создаёт команда provision_users.
+USER_PROVISION_MAX_PASSWORD_ROWS = 100
+USER_PROVISION_WORKERS = os.cpu_count() or 1
 
 # Password validation
 
@@ -111,20 +177,29 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CachedCountLimitOffsetPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
+        'api.filters.StrictOrderingFilter',
     ],
 }
 
+# Возвращать ли ключ `count` в списках, если клиент не передал ?count=.
+# Отзывы и комментарии берут его из счётчиков в строке родителя,
+# произведения, жанры, категории и пользователи — из общего кэша
+# LIST_COUNT_CACHE_ALIAS (api.list_counts); изменения в обход сигналов
+# видны в нём не позже чем через LIST_COUNT_CACHE_TIMEOUT секунд.
+PAGINATION_INCLUDE_COUNT = True
+LIST_COUNT_CACHE_ALIAS = 'shared'
+LIST_COUNT_CACHE_TIMEOUT = 300
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=10),
@@ -132,7 +207,119 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Сколько проверенных JWT помнит процесс (api.authentication),
+# 0 — проверять подпись каждого запроса заново.
+JWT_VERIFIED_CACHE_SIZE = 10000
+
 AUTH_USER_MODEL = 'users.User'
 
+# 'default' — кэш в памяти процесса. 'shared' — кэш, общий для всех
+# воркеров: Memcached по адресам MEMCACHED_LOCATION через запятую
+# (pip install pymemcache) или, если они не заданы, файловый кэш
+# в SHARED_CACHE_DIR, общий для процессов одной машины. 'compression' —
+# отдельный кэш процесса для сжатых тел, чтобы они не вытесняли
+# остальные ключи.
+MEMCACHED_LOCATION = os.getenv('MEMCACHED_LOCATION')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': MEMCACHED_LOCATION.split(','),
+    } if MEMCACHED_LOCATION else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('SHARED_CACHE_DIR', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'compression': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'compression',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Сжатие ответов (api_yamdb.compression): ответы короче порога не сжимаются.
+# Сжатые тела анонимных GET-запросов к маршрутам COMPRESSION_CACHE_ROUTES,
+# которые повторяются у разных клиентов, хранятся в кэше
+# COMPRESSION_CACHE_ALIAS; остальные ответы сжимаются без кэша.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSION_CACHE_ALIAS = 'compression'
+COMPRESSION_CACHE_TIMEOUT = 300
+COMPRESSION_CACHE_ROUTES = (
+    'title-list', 'title-detail', 'genre-list', 'category-list',
+)
+
+# Кэш карточек произведений (api.title_cache). Версии произведений лежат
+# в том же кэше, поэтому он должен быть общим для всех воркеров: в кэше
+# памяти процесса (LocMemCache) карточки не кэшируются.
+TITLE_CACHE_ALIAS = 'shared'
+TITLE_CACHE_TIMEOUT = 3600
+
+# Хранилище документов произведений (api.title_documents): отдавать ли
+# списки и карточки из него и по сколько документов пересобирать за раз.
+TITLE_DOCUMENTS_READS = True
+TITLE_DOCUMENTS_BATCH_SIZE = 500
+
+# Профилирование запросов (api_yamdb.profiling): доля случайных запросов
+# и секрет заголовка X-Profile. При 0 и пустом секрете профайлер выключен.
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_SECRET = os.getenv('PROFILING_SECRET', '')
+PROFILING_DIR = os.getenv('PROFILING_DIR', BASE_DIR / 'profiles')
+# 'pstats' — cProfile, 'collapsed' — стеки для flamegraph.
+PROFILING_FORMAT = 'pstats'
+PROFILING_INTERVAL = 0.001
+
+# Журнал медленных запросов (api_yamdb.slow_queries): порог в миллисекундах,
+# None — запись выключена. Сводка: manage.py slow_queries_report.
+SLOW_QUERY_THRESHOLD_MS = (
+    float(os.environ['SLOW_QUERY_THRESHOLD_MS'])
+    if os.getenv('SLOW_QUERY_THRESHOLD_MS') else None
+)
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', BASE_DIR / 'slow_queries.jsonl')
+
+# Метрики Prometheus (/metrics). Для нескольких процессов-воркеров задайте
+# общий каталог: процессы раз в METRICS_FLUSH_INTERVAL секунд сохраняют туда
+# свои счётчики, а /metrics их суммирует.
+METRICS_MULTIPROCESS_DIR = os.getenv('METRICS_MULTIPROCESS_DIR')
+METRICS_FLUSH_INTERVAL = 5
+# Кому отдаётся /metrics: адреса без проверки и секрет для заголовка
+# «Authorization: Bearer <секрет>». За обратным прокси на той же машине
+# все запросы приходят с 127.0.0.1, поэтому не проксируйте /metrics
+# наружу или очистите METRICS_ALLOWED_IPS и задайте секрет.
+METRICS_ALLOWED_IPS = tuple(filter(None, os.getenv(
+    'METRICS_ALLOWED_IPS', '127.0.0.1,::1'
+).split(',')))
+METRICS_SECRET = os.getenv('METRICS_SECRET', '')
+
+# Запись выборки трафика (api_yamdb.traffic) для команды replay_traffic:
+# доля записываемых запросов, 0 — запись выключена.
+TRAFFIC_CAPTURE_RATE = float(os.getenv('TRAFFIC_CAPTURE_RATE', 0))
+TRAFFIC_CAPTURE_DIR = os.getenv('TRAFFIC_CAPTURE_DIR', BASE_DIR / 'traffic')
+TRAFFIC_CAPTURE_MAX_BYTES = 50 * 1024 * 1024
+TRAFFIC_CAPTURE_BACKUPS = 5
+TRAFFIC_CAPTURE_MAX_BODY = 64 * 1024
+# Тела этих запросов не сохраняются: в них коды подтверждения,
+# пароли и персональные данные создаваемых пользователей.
+TRAFFIC_CAPTURE_REDACT_PATHS = ('/api/v1/auth/', '/api/auth/')
+# Тело с любым из этих полей (на любом уровне) не сохраняется.
+TRAFFIC_CAPTURE_SENSITIVE_FIELDS = frozenset({
+    'password', 'confirmation_code', 'token', 'access', 'refresh',
+    'secret',
+})
+
+# Фоновое удаление произведений и пользователей (reviews.purge):
+# 'thread', 'inline' или 'queue' (команда process_purge_jobs).
+PURGE_JOBS_MODE = 'thread'
+PURGE_CHUNK_SIZE = 1000
+# Задача в статусе running без heartbeat дольше этого числа секунд
+# считается брошенной (процесс упал или был перезапущен) и снова
+# выполняется командой process_purge_jobs.
+PURGE_JOB_STALE_AFTER = 600
+# Удалять контент через ON DELETE CASCADE базы (только PostgreSQL).
+PURGE_DB_CASCADE = False
+
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = "./conf_codes"
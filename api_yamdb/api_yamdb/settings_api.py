@@ -0,0 +1,54 @@
+"""
+Облегчённый профиль настроек для процессов, которые обслуживают только API.
+
+Использование: DJANGO_SETTINGS_MODULE=api_yamdb.settings_api.
+Отключены приложения и middleware, которые API не использует
+(админка, сессии, сообщения, статика, djoser), и браузерный рендерер
+DRF, поэтому воркер импортирует меньше модулей и быстрее отвечает на
+первый запрос. Время старта измеряет команда profile_startup.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+LEAN_EXCLUDED_APPS = (
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'djoser',
+)
+
+LEAN_EXCLUDED_MIDDLEWARE = (
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+)
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS if app not in LEAN_EXCLUDED_APPS
+]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in LEAN_EXCLUDED_MIDDLEWARE
+]
+
+ROOT_URLCONF = 'api_yamdb.urls_api'
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {
+        'context_processors': [
+            'django.template.context_processors.request',
+        ],
+    },
+}]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+}
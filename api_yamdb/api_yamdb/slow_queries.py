@@ -0,0 +1,158 @@
+"""
+Запись медленных SQL-запросов вместе с планом выполнения.
+
+Обёртка execute_wrapper замеряет каждый запрос и, если он выполнялся
+дольше SLOW_QUERY_THRESHOLD_MS, дописывает в SLOW_QUERY_LOG (JSON Lines)
+нормализованный SQL, параметры, источник запроса (view, команда и цепочка
+функций проекта — сериализатор, фильтр, пагинатор) и план, полученный
+сразу же через EXPLAIN QUERY PLAN (SQLite) или EXPLAIN (PostgreSQL).
+Сводку по журналу строит команда slow_queries_report.
+
+При SLOW_QUERY_THRESHOLD_MS = None обёртка не устанавливается.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_origin = ContextVar('slow_query_origin', default=None)
+_explaining = ContextVar('slow_query_explaining', default=False)
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+}
+COMMAND_RE = re.compile(r'management[\\/]commands[\\/](\w+)\.py$')
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+WHITESPACE_RE = re.compile(r'\s+')
+MAX_FRAMES = 5
+
+
+def is_enabled():
+    return settings.SLOW_QUERY_THRESHOLD_MS is not None
+
+
+def normalize_sql(sql):
+    """Приводит запросы, отличающиеся только значениями, к одному виду."""
+    sql = LITERAL_RE.sub('%s', sql)
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def get_call_chain():
+    """Функции проекта в стеке вызова запроса, от внешней к внутренней."""
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    chain = []
+    command = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base_dir) and 'site-packages' not in filename:
+            code = frame.f_code
+            chain.append(
+                f'{os.path.relpath(filename, base_dir)}:{frame.f_lineno} '
+                f'{getattr(code, "co_qualname", code.co_name)}'
+            )
+            match = COMMAND_RE.search(filename)
+            if match:
+                command = match.group(1)
+        frame = frame.f_back
+    chain.reverse()
+    return chain[-MAX_FRAMES:], command
+
+
+def explain(connection, sql, params):
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    token = _explaining.set(True)
+    try:
+        # Ошибка EXPLAIN внутри транзакции PostgreSQL прервала бы её
+        # (InFailedSqlTransaction), поэтому он выполняется в точке
+        # сохранения, которая откатывается вместе с ошибкой.
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                return [
+                    ' '.join(str(column) for column in row)
+                    for row in cursor.fetchall()
+                ]
+    except Exception as error:
+        return [f'EXPLAIN failed: {error}']
+    finally:
+        _explaining.reset(token)
+
+
+def record_slow_query(execute, sql, params, many, context):
+    if _explaining.get():
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return result
+
+    chain, command = get_call_chain()
+    connection = context['connection']
+    write_entry({
+        'time': time.time(),
+        'duration_ms': round(duration_ms, 3),
+        'database': connection.alias,
+        'origin': _origin.get() or (
+            f'command {command}' if command else 'unknown'
+        ),
+        'chain': chain,
+        'sql': normalize_sql(sql),
+        'params': None if many else [str(param) for param in params or ()],
+        'plan': None if many else explain(connection, sql, params),
+    })
+    return result
+
+
+def write_entry(entry):
+    try:
+        with open(settings.SLOW_QUERY_LOG, 'a', encoding='utf-8') as log:
+            log.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    except OSError:
+        logger.exception('Cannot write slow query log')
+
+
+def install(connection):
+    """Подключает обёртку к соединению, если она ещё не подключена."""
+    if record_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_slow_query)
+
+
+def on_connection_created(sender, connection, **kwargs):
+    if is_enabled():
+        install(connection)
+
+
+class SlowQueryOriginMiddleware:
+    """Помечает запросы к базе именем маршрута, который их выполняет."""
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _origin.set(f'{request.method} {request.path}')
+        try:
+            return self.get_response(request)
+        finally:
+            _origin.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        _origin.set(f'view {match.url_name or match._func_path}')
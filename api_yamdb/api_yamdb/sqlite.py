@@ -0,0 +1,34 @@
+"""
+Настройка соединений SQLite для конкурентной нагрузки.
+
+На каждое новое соединение выполняются PRAGMA из SQLITE_PRAGMAS.
+В режиме WAL читатели не блокируются писателем, synchronous=NORMAL
+в WAL не теряет целостность при сбое процесса, busy_timeout заставляет
+писателя ждать блокировку вместо мгновенной ошибки "database is locked".
+"""
+import re
+
+from django.conf import settings
+
+PRAGMA_NAME_RE = re.compile(r'^\w+$')
+
+
+def pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME_RE.match(name) or not PRAGMA_NAME_RE.match(
+                str(value).lstrip('-')):
+            raise ValueError(f'Invalid PRAGMA {name} = {value}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def apply_pragmas(connection, pragmas):
+    """Выполняет PRAGMA на соединении sqlite3 (DB-API)."""
+    for statement in pragma_statements(pragmas):
+        connection.execute(statement).fetchall()
+
+
+def on_connection_created(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite' and settings.SQLITE_PRAGMAS:
+        apply_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
@@ -0,0 +1,151 @@
+"""
+Запись выборки рабочего трафика для последующего воспроизведения.
+
+Для доли запросов TRAFFIC_CAPTURE_RATE в TRAFFIC_CAPTURE_DIR пишется
+строка JSON: метод, путь, строка запроса, маршрут, класс пользователя
+(anonymous, user, moderator, admin, superuser), статус и длительность.
+Заголовки, в том числе Authorization и cookies, не записываются.
+Тело изменяющих запросов сохраняется целиком, только если оно не длиннее
+TRAFFIC_CAPTURE_MAX_BODY, путь не входит в TRAFFIC_CAPTURE_REDACT_PATHS,
+тело — JSON или form-urlencoded и ни на одном уровне вложенности в нём
+нет полей из TRAFFIC_CAPTURE_SENSITIVE_FIELDS. В остальных случаях
+(включая multipart и тела, которые не удалось разобрать) сохраняется
+только SHA-256 тела. Строка запроса записывается как есть, поэтому
+секреты в параметрах URL передавать нельзя.
+
+Каждый процесс пишет в свой файл traffic-<pid>.jsonl с ротацией по
+размеру. Воспроизводит трафик команда replay_traffic.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+ANONYMOUS = 'anonymous'
+
+
+def get_identity(user):
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS
+    if user.is_superuser:
+        return 'superuser'
+    return user.role
+
+
+def get_fields(value):
+    """Имена полей JSON на всех уровнях вложенности."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield key
+            yield from get_fields(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from get_fields(item)
+
+
+def parse_fields(content_type, text):
+    """Имена полей тела или None, если формат не разбирается."""
+    try:
+        if content_type == 'application/json':
+            return set(get_fields(json.loads(text)))
+        if content_type == 'application/x-www-form-urlencoded':
+            return {
+                key for key, _ in parse_qsl(text, keep_blank_values=True)
+            }
+    except ValueError:
+        pass
+    return None
+
+
+def get_capture_logger():
+    """Логгер с ротируемым файлом этого процесса."""
+    directory = Path(settings.TRAFFIC_CAPTURE_DIR)
+    capture_logger = logging.getLogger(f'{__name__}.capture')
+    path = directory / f'traffic-{os.getpid()}.jsonl'
+    handler = capture_logger.handlers[0] if capture_logger.handlers else None
+    if handler is None or handler.baseFilename != str(path.absolute()):
+        directory.mkdir(parents=True, exist_ok=True)
+        for stale in capture_logger.handlers:
+            capture_logger.removeHandler(stale)
+            stale.close()
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.TRAFFIC_CAPTURE_MAX_BYTES,
+            backupCount=settings.TRAFFIC_CAPTURE_BACKUPS,
+            encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        capture_logger.addHandler(handler)
+        capture_logger.setLevel(logging.INFO)
+        capture_logger.propagate = False
+    return capture_logger
+
+
+class TrafficCaptureMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.TRAFFIC_CAPTURE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.TRAFFIC_CAPTURE_RATE:
+            return self.get_response(request)
+
+        # Тело читается до обработки: после разбора DRF поток уже прочитан.
+        body = request.body if request.method in WRITE_METHODS else b''
+        started_at = time.time()
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        entry = {
+            'time': started_at,
+            'method': request.method,
+            'path': request.path,
+            'query': request.META.get('QUERY_STRING', ''),
+            'route': match.url_name if match else None,
+            'identity': get_identity(getattr(request, 'user', None)),
+            'content_type': request.content_type,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+        }
+        if body:
+            entry.update(
+                self.capture_body(request.path, request.content_type, body)
+            )
+        get_capture_logger().info(json.dumps(entry, ensure_ascii=False))
+        return response
+
+    def capture_body(self, path, content_type, body):
+        if (len(body) <= settings.TRAFFIC_CAPTURE_MAX_BODY
+                and not path.startswith(
+                    tuple(settings.TRAFFIC_CAPTURE_REDACT_PATHS))):
+            try:
+                text = body.decode()
+                fields = parse_fields(content_type, text)
+            except UnicodeDecodeError:
+                fields = None
+            if fields is not None and fields.isdisjoint(
+                    settings.TRAFFIC_CAPTURE_SENSITIVE_FIELDS):
+                return {'body': text}
+        return {'body_sha256': hashlib.sha256(body).hexdigest()}
+
+
+def read_traffic(directory):
+    """Записи всех процессов и ротированных файлов в порядке времени."""
+    entries = []
+    for path in Path(directory).glob('traffic-*.jsonl*'):
+        with open(path, encoding='utf-8') as log:
+            entries += [json.loads(line) for line in log if line.strip()]
+    return sorted(entries, key=lambda entry: entry['time'])
@@ -0,0 +1,137 @@
+"""
+Прогрев приложения в главном процессе до fork воркеров.
+
+Без прогрева каждый воркер на первых запросах сам компилирует
+регулярные выражения маршрутов, импортирует классы из настроек DRF,
+строит поля сериализаторов и формы фильтров, и эти запросы медленные.
+warmup() делает всё это один раз до fork (gunicorn с preload_app):
+воркеры получают готовые структуры через copy-on-write.
+
+Перед fork закрываются соединения с базой и кэшами: общий сокет или
+файл SQLite в нескольких процессах портит их состояние. Затем объекты
+переносятся в постоянное поколение сборщика мусора (gc.freeze), чтобы
+сборка в воркере не трогала их заголовки и не копировала страницы.
+"""
+import gc
+import logging
+import time
+
+from django.core.cache import close_caches
+from django.db import DatabaseError, connections
+from django.urls import URLResolver, get_resolver
+from rest_framework.generics import GenericAPIView
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+
+def iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def resolve_routes():
+    """Компилирует маршруты и возвращает view, созданные DRF."""
+    resolver = get_resolver()
+    # reverse_dict заполняется обходом всех вложенных URLResolver.
+    resolver.reverse_dict
+    views = []
+    for pattern in iter_patterns(resolver.url_patterns):
+        pattern.pattern.regex
+        if hasattr(pattern.callback, 'cls'):
+            views.append(pattern.callback)
+    return views
+
+
+def load_api_settings():
+    """Импортирует классы, заданные строками в настройках DRF."""
+    for name in api_settings.import_strings:
+        try:
+            getattr(api_settings, name)
+        except ImportError:
+            # Необязательные зависимости (например, для схем) не нужны.
+            pass
+
+
+def get_serializer_classes(view):
+    view_class = view.cls
+    actions = getattr(view, 'actions', None) or {}
+    classes = set()
+    for action in set(actions.values()) or {None}:
+        instance = view_class(**view.initkwargs)
+        instance.action = action
+        instance.request = None
+        instance.kwargs = {}
+        instance.format_kwarg = None
+        classes.add(instance.get_serializer_class())
+    return classes
+
+
+def warm_views(views):
+    """Строит поля сериализаторов и формы фильтров вьюсетов."""
+    serializers, filtersets = set(), set()
+    for view in views:
+        if not issubclass(view.cls, GenericAPIView):
+            continue
+        serializers |= get_serializer_classes(view)
+        filterset_class = getattr(view.cls, 'filterset_class', None)
+        if filterset_class is not None:
+            filtersets.add(filterset_class)
+    for serializer_class in serializers:
+        serializer_class().fields
+    for filterset_class in filtersets:
+        model = filterset_class._meta.model
+        filterset_class(
+            data={}, queryset=model._default_manager.none()
+        ).is_valid()
+    return serializers, filtersets
+
+
+def prime_reference_data():
+    """
+    Читает жанры и категории через их сериализаторы: таблицы попадают
+    в страничный кэш ОС, общий для воркеров, а путь запроса компилируется.
+    """
+    from api.serializers import CategorySerializer, GenreSerializer
+    from reviews.models import Category, Genre
+
+    renderer = JSONRenderer()
+    for model, serializer_class in (
+        (Genre, GenreSerializer), (Category, CategorySerializer)
+    ):
+        try:
+            renderer.render(
+                serializer_class(model.objects.all(), many=True).data
+            )
+        except DatabaseError:
+            logger.warning('Warmup: cannot read %s', model.__name__)
+
+
+def release_connections():
+    connections.close_all()
+    close_caches()
+
+
+def warmup(freeze=True):
+    """Прогревает приложение перед fork. Возвращает сводку."""
+    started = time.perf_counter()
+    load_api_settings()
+    views = resolve_routes()
+    serializers, filtersets = warm_views(views)
+    prime_reference_data()
+    release_connections()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    summary = {
+        'views': len(views),
+        'serializers': len(serializers),
+        'filtersets': len(filtersets),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+    logger.info('Warmup done: %s', summary)
+    return summary
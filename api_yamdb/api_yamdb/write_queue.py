@@ -0,0 +1,122 @@
+"""
+Очередь записи с одним писателем и групповым коммитом для SQLite.
+
+SQLite допускает одного писателя даже в режиме WAL: одновременные POST
+отзывов и комментариев из многих потоков ждут блокировку по очереди,
+и хвост задержек растёт. При WRITE_QUEUE_ENABLED изменения передаются
+в поток-писатель процесса. Он собирает задания, пришедшие в течение
+WRITE_QUEUE_WINDOW_MS, и выполняет их в одной транзакции: каждое
+задание в своей точке сохранения, поэтому ошибка одного задания не
+откатывает остальные. Чтение идёт по обычным соединениям и писателя
+не ждёт.
+
+Если вызывающий код уже внутри транзакции, задание выполняется
+на месте: писатель не увидит её незакоммиченные изменения.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+class WriteQueue:
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.jobs = queue.SimpleQueue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """Выполняет func в потоке-писателе и возвращает её результат."""
+        future = Future()
+        self.jobs.put((future, func, args, kwargs))
+        self.ensure_started()
+        return future.result()
+
+    def ensure_started(self):
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name='write-queue', daemon=True
+                )
+                self.thread.start()
+
+    def stop(self):
+        """Останавливает поток-писатель и закрывает его соединение."""
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            self.jobs.put(None)
+            thread.join()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                connections[self.using].close()
+                return
+            batch = [job]
+            deadline = (
+                time.monotonic() + settings.WRITE_QUEUE_WINDOW_MS / 1000
+            )
+            while len(batch) < settings.WRITE_QUEUE_MAX_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    job = self.jobs.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if job is None:
+                    self.jobs.put(None)
+                    break
+                batch.append(job)
+            self.commit(batch)
+
+    def commit(self, batch):
+        results = []
+        try:
+            with transaction.atomic(using=self.using):
+                for future, func, args, kwargs in batch:
+                    try:
+                        with transaction.atomic(using=self.using):
+                            results.append((future, func(*args, **kwargs)))
+                    except Exception as error:
+                        future.set_exception(error)
+        except Exception as error:
+            # Не удался сам коммит: ни одно задание группы не записано.
+            for future, _ in results:
+                future.set_exception(error)
+            connections[self.using].close()
+            return
+        for future, result in results:
+            future.set_result(result)
+
+
+write_queue = WriteQueue()
+
+
+def reset():
+    """Поток-писатель не переживает fork: дочерний процесс создаёт свой."""
+    global write_queue
+    write_queue = WriteQueue()
+
+
+os.register_at_fork(after_in_child=reset)
+
+
+def run_write(func, *args, **kwargs):
+    """Выполняет изменение через очередь записи или на месте в транзакции."""
+    using = write_queue.using
+    if (not settings.WRITE_QUEUE_ENABLED
+            or connections[using].in_atomic_block):
+        with transaction.atomic(using=using):
+            return func(*args, **kwargs)
+    return write_queue.submit(func, *args, **kwargs)
@@ -0,0 +1,63 @@
+"""
+Настройки gunicorn для продакшена.
+
+Запуск из каталога с manage.py:
+    gunicorn -c gunicorn.conf.py api_yamdb.wsgi
+
+С preload_app приложение загружается и прогревается (api_yamdb.warmup)
+в главном процессе один раз, воркеры получают его через fork и делят
+память copy-on-write. Первый запрос воркер обслуживает так же быстро,
+как последующие. Прогрев отключается переменной WARMUP_ENABLED=0.
+
+Воркеры сохраняют метрики в общий каталог METRICS_MULTIPROCESS_DIR,
+чтобы /metrics суммировал все процессы; при запуске каталог очищается
+от снимков процессов прошлого запуска, а снимок завершившегося воркера
+переносится в общий итог.
+"""
+import multiprocessing
+import os
+import tempfile
+from pathlib import Path
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(
+    os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+)
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+preload_app = True
+# Перезапущенный воркер тоже порождается от прогретого главного процесса.
+max_requests = 10000
+max_requests_jitter = 1000
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
+errorlog = '-'
+
+metrics_dir = os.getenv(
+    'METRICS_MULTIPROCESS_DIR',
+    os.path.join(tempfile.gettempdir(), 'yamdb-metrics')
+)
+raw_env = [f'METRICS_MULTIPROCESS_DIR={metrics_dir}']
+
+
+def on_starting(server):
+    directory = Path(metrics_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.iterdir():
+        if stale.suffix in ('.json', '.tmp'):
+            stale.unlink()
+
+
+def child_exit(server, worker):
+    from api_yamdb.metrics import retire_process
+
+    retire_process(metrics_dir, worker.pid)
+
+
+def when_ready(server):
+    """Прогрев в главном процессе перед запуском воркеров."""
+    if preload_app and os.getenv('WARMUP_ENABLED', '1') == '1':
+        from api_yamdb.warmup import warmup
+
+        warmup()
@@ -1,16 +1,240 @@
+from django import forms
 from django.contrib import admin
-from .models import Review, Comment
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.functional import cached_property
+
+from .models import Category, Comment, Genre, PurgeJob, Review, Title
+
+# Ниже этого порога оценка неточна, дешевле посчитать строки честно.
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimate_count(queryset):
+    """
+    Оценка числа строк таблицы из статистики PostgreSQL (pg_class.reltuples)
+    или None, если оценки нет. Другие базы дешёвой оценки не дают.
+    """
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE relname = %s',
+            [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    # До первого ANALYZE reltuples равен -1 (PostgreSQL 14+) или 0.
+    if not row or row[0] <= 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор админки, который не считает строки большой нефильтрованной
+    таблицы в PostgreSQL.
+
+    Для отфильтрованного списка, для небольших таблиц и для баз без
+    статистики выполняется обычный COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        if self.object_list.query.where:
+            return super().count
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """
+    Фильтр по внешнему ключу с виджетом автодополнения.
+
+    В отличие от стандартного RelatedFieldListFilter не выводит в боковую
+    панель все связанные объекты: варианты подгружаются по мере ввода
+    через autocomplete view админки.
+    """
+    template = 'admin/autocomplete_filter.html'
+    field_path = None
+
+    def __init__(self, request, params, model, model_admin):
+        # Параметр без "__", иначе админка проверит его как lookup.
+        self.parameter_name = self.field_path.replace(LOOKUP_SEP, '_')
+        super().__init__(request, params, model, model_admin)
+        field = get_fields_from_path(model, self.field_path)[-1]
+        form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+        self.rendered_widget = form_field.widget.render(
+            self.parameter_name, self.value(),
+            {'id': f'autocomplete_filter_{self.parameter_name}'}
+        )
+        self.preserved_params = [
+            (name, value) for name, value in request.GET.items()
+            if name not in (self.parameter_name, 'p')
+        ]
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{f'{self.field_path}__pk': self.value()})
+        return queryset
+
+
+class TitleFilter(AutocompleteFilter):
+    title = 'произведение'
+    field_path = 'title'
+
+
+class AuthorFilter(AutocompleteFilter):
+    title = 'автор'
+    field_path = 'author'
+
+
+class ReviewTitleFilter(AutocompleteFilter):
+    title = 'произведение'
+    field_path = 'review__title'
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Базовая админка для больших таблиц отзывов и комментариев."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        return super().media + AutocompleteSelect(
+            None, self.admin_site
+        ).media
+
+
+class CascadeCountersAdminMixin:
+    """
+    Пересчитывает счётчики после удаления объекта, которое каскадом
+    удаляет отзывы и комментарии: рейтинг и число отзывов произведений,
+    число комментариев отзывов.
+
+    review_lookup и comment_lookup — пути от отзыва и комментария
+    к удаляемой модели.
+    """
+    review_lookup = None
+    comment_lookup = None
+
+    def get_cascade_targets(self, objects):
+        title_ids = set(Review.objects.filter(
+            **{f'{self.review_lookup}__in': objects}
+        ).values_list('title_id', flat=True))
+        review_ids = set(Comment.objects.filter(
+            **{f'{self.comment_lookup}__in': objects}
+        ).values_list('review_id', flat=True))
+        return title_ids, review_ids
+
+    def refresh_counters(self, title_ids, review_ids):
+        Title.objects.filter(pk__in=title_ids).refresh_ratings()
+        Review.objects.filter(pk__in=review_ids).refresh_comment_counts()
+
+    def delete_model(self, request, obj):
+        targets = self.get_cascade_targets([obj])
+        super().delete_model(request, obj)
+        self.refresh_counters(*targets)
+
+    def delete_queryset(self, request, queryset):
+        targets = self.get_cascade_targets(queryset)
+        super().delete_queryset(request, queryset)
+        self.refresh_counters(*targets)
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name__prefix', 'slug__prefix')
+
+
+@admin.register(Genre)
+class GenreAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name__prefix', 'slug__prefix')
+
+
+@admin.register(Title)
+class TitleAdmin(CascadeCountersAdminMixin, admin.ModelAdmin):
+    review_lookup = 'title'
+    comment_lookup = 'review__title'
+    list_display = ('name', 'year', 'category')
+    list_select_related = ('category',)
+    search_fields = ('name__prefix',)
+    autocomplete_fields = ('category',)
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdmin):
     list_display = ('title', 'text', 'author', 'score', 'pub_date')
-    search_fields = ('title', 'text', 'author')
-    list_filter = ('title', 'author')
+    list_select_related = ('title', 'author')
+    search_fields = ('title__name__prefix', 'author__username__exact')
+    list_filter = (TitleFilter, AuthorFilter)
+    autocomplete_fields = ('title', 'author')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        title_ids = {obj.title_id}
+        if change and 'title' in form.changed_data:
+            title_ids.add(form.initial['title'])
+        Title.objects.filter(pk__in=title_ids).refresh_ratings()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Title.objects.filter(pk=obj.title_id).refresh_ratings()
+
+    def delete_queryset(self, request, queryset):
+        title_ids = set(queryset.values_list('title_id', flat=True))
+        super().delete_queryset(request, queryset)
+        Title.objects.filter(pk__in=title_ids).refresh_ratings()
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ('review', 'author', 'text', 'pub_date')
-    search_fields = ('review__title', 'text', 'author__username')
-    list_filter = ('review__title', 'author')
+    list_select_related = ('review', 'author')
+    search_fields = (
+        'review__title__name__prefix', 'author__username__exact'
+    )
+    list_filter = (ReviewTitleFilter, AuthorFilter)
+    autocomplete_fields = ('review', 'author')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        review_ids = {obj.review_id}
+        if change and 'review' in form.changed_data:
+            review_ids.add(form.initial['review'])
+        Review.objects.filter(pk__in=review_ids).refresh_comment_counts()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Review.objects.filter(pk=obj.review_id).refresh_comment_counts()
+
+    def delete_queryset(self, request, queryset):
+        review_ids = set(queryset.values_list('review_id', flat=True))
+        super().delete_queryset(request, queryset)
+        Review.objects.filter(pk__in=review_ids).refresh_comment_counts()
+
+
+@admin.register(PurgeJob)
+class PurgeJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'status', 'deleted_comments',
+                    'deleted_reviews', 'created', 'finished')
+    list_filter = ('kind', 'status')
+    readonly_fields = list_display + ('error',)
@@ -0,0 +1,100 @@
+"""
+Конвейер изменений произведений.
+
+Обработчики сигналов собирают id произведений, чьё представление
+в API могло измениться: само произведение, его отзывы, связи с
+жанрами, переименование или удаление его категории или жанра.
+После коммита транзакции id передаются подписчикам (хранилище
+документов, кэш карточек) одним набором в порядке подписки.
+
+Набор id хранится в потоке: если транзакция откатится, её id уйдут
+подписчикам со следующим коммитом. Это лишняя, но безвредная работа.
+"""
+import logging
+import threading
+
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+
+from .models import Category, Genre, Review, Title
+from .signals import titles_changed
+
+logger = logging.getLogger(__name__)
+
+subscribers = []
+local = threading.local()
+
+
+def subscribe(func):
+    """func(title_ids) вызывается после коммита изменений произведений."""
+    if func not in subscribers:
+        subscribers.append(func)
+    return func
+
+
+def get_pending():
+    if not hasattr(local, 'pending'):
+        local.pending = set()
+    return local.pending
+
+
+def changed(title_ids):
+    title_ids = set(title_ids)
+    if title_ids:
+        get_pending().update(title_ids)
+        transaction.on_commit(flush)
+
+
+def flush():
+    pending = get_pending()
+    title_ids = set(pending)
+    pending.clear()
+    if not title_ids:
+        return
+    for func in subscribers:
+        # Ошибка подписчика не должна ломать уже закоммиченный запрос.
+        try:
+            func(title_ids)
+        except Exception:
+            logger.exception('Title change subscriber %s failed', func)
+
+
+def title_saved(sender, instance, **kwargs):
+    changed([instance.pk])
+
+
+def review_changed(sender, instance, **kwargs):
+    changed([instance.title_id])
+
+
+def titles_updated(sender, title_ids, **kwargs):
+    changed(title_ids)
+
+
+def genres_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            changed([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        changed(pk_set)
+    elif action == 'pre_clear':
+        changed(instance.titles.values_list('pk', flat=True))
+
+
+def group_changed(sender, instance, created=False, **kwargs):
+    """Переименование или удаление категории или жанра."""
+    if not created:
+        changed(instance.titles.values_list('pk', flat=True))
+
+
+def connect():
+    post_save.connect(title_saved, sender=Title)
+    post_delete.connect(title_saved, sender=Title)
+    post_save.connect(review_changed, sender=Review)
+    post_delete.connect(review_changed, sender=Review)
+    titles_changed.connect(titles_updated, sender=Title)
+    m2m_changed.connect(genres_changed, sender=Title.genre.through)
+    for model in (Category, Genre):
+        post_save.connect(group_changed, sender=model)
+        pre_delete.connect(group_changed, sender=model)
@@ -0,0 +1,22 @@
+class PurgeJobKind:
+    TITLE = 'title'
+    USER = 'user'
+
+    CHOICES = [
+        (TITLE, 'Title'),
+        (USER, 'User'),
+    ]
+
+
+class PurgeJobStatus:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
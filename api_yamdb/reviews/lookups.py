@@ -0,0 +1,31 @@
+"""
+Поиск по префиксу строки, который читается по индексу.
+
+В SQLite startswith превращается в LIKE ... ESCAPE, а LIKE там
+регистронезависим: обычный индекс по колонке для него не применяется,
+и поиск в админке просматривает всю таблицу. Lookup prefix строится как
+диапазон «значение >= префикс AND значение < префикс + U+10FFFF»,
+который SQLite читает по B-дереву. В PostgreSQL он совпадает со
+startswith: для индексированных CharField Django создаёт индекс
+с varchar_pattern_ops, который обслуживает LIKE 'префикс%'.
+"""
+from django.db.models import CharField, Lookup
+from django.db.models.lookups import StartsWith
+
+MAX_CHAR = '\U0010ffff'
+
+
+@CharField.register_lookup
+class Prefix(Lookup):
+    lookup_name = 'prefix'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'({lhs} >= {rhs} AND {lhs} < {rhs})', [
+            *lhs_params, *rhs_params,
+            *lhs_params, *rhs_params[:-1], rhs_params[-1] + MAX_CHAR,
+        ]
+
+    def as_postgresql(self, compiler, connection):
+        return compiler.compile(StartsWith(self.lhs, self.rhs))
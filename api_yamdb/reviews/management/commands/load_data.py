@@ -65,16 +65,23 @@ class Command(BaseCommand):
 
     def load_user(self, data_dir):
         with open(os.path.join(data_dir, 'users.csv'), encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                User.objects.get_or_create(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name']
-                )
+            rows = list(csv.DictReader(f))
+        # Один запрос на уже загруженных пользователей и одна вставка
+        # вместо get_or_create на каждую строку.
+        existing = set(User.objects.filter(
+            id__in=[int(row['id']) for row in rows]
+        ).values_list('id', flat=True))
+        User.objects.bulk_create(
+            User(
+                id=int(row['id']),
+                username=row['username'],
+                email=row['email'],
+                role=row['role'],
+                first_name=row['first_name'],
+                last_name=row['last_name']
+            )
+            for row in rows if int(row['id']) not in existing
+        )
         self.stdout.write(self.style.SUCCESS(
             'Successfully loaded User from CSV'
         ))
@@ -99,6 +106,7 @@ class Command(BaseCommand):
                 except (Title.DoesNotExist, User.DoesNotExist) as e:
                     self.stdout.write(self.style.ERROR(str(e)))
 
+        Title.objects.refresh_ratings()
         self.stdout.write(self.style.SUCCESS(
             'Successfully loaded Review from CSV'
         ))
@@ -124,6 +132,7 @@ class Command(BaseCommand):
                 except (Review.DoesNotExist, User.DoesNotExist) as e:
                     self.stdout.write(self.style.ERROR(str(e)))
 
+        Review.objects.refresh_comment_counts()
         self.stdout.write(self.style.SUCCESS(
             'Successfully loaded Comment from CSV'
         ))
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.constants import PurgeJobStatus
+from reviews.models import PurgeJob
+from reviews.purge import claimable_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs pending background purge jobs and resumes jobs abandoned '
+        'by a crashed or restarted process'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Process pending jobs and exit instead of polling.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Rows deleted per transaction (PURGE_CHUNK_SIZE by default).'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Seconds between polls for new jobs.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job_ids = list(claimable_jobs().values_list('pk', flat=True))
+            for job_id in job_ids:
+                if run_job(job_id, chunk_size=options['chunk_size']):
+                    self.report(PurgeJob.objects.get(pk=job_id))
+            if options['once']:
+                return
+            time.sleep(options['interval'])
+
+    def report(self, job):
+        message = (
+            f'Purge job {job.pk} ({job}): {job.deleted_comments} comments, '
+            f'{job.deleted_reviews} reviews deleted'
+        )
+        if job.status == PurgeJobStatus.DONE:
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(self.style.ERROR(f'{message}. {job.error}'))
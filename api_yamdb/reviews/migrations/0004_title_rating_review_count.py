@@ -0,0 +1,46 @@
+# Generated by Django 3.2 on 2026-10-19 17:39
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import reviews.validators
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    Title.objects.update(
+        rating=Subquery(reviews.annotate(avg=Avg('score')).values('avg')),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(cnt=Count('pk')).values('cnt')), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_name_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.IntegerField(db_index=True, validators=[reviews.validators.validate_year]),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
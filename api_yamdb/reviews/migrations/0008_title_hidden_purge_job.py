@@ -0,0 +1,73 @@
+# Generated by Django 3.2 on 2026-10-19 17:48
+
+from django.db import migrations, models
+
+# Внешние ключи, которые на PostgreSQL получают ON DELETE CASCADE,
+# чтобы при PURGE_DB_CASCADE удаление произведения выполняла база.
+CASCADE_FOREIGN_KEYS = (
+    ('reviews_review', 'title_id', 'reviews_title'),
+    ('reviews_comment', 'review_id', 'reviews_review'),
+    ('reviews_title_genre', 'title_id', 'reviews_title'),
+)
+
+
+def set_db_cascade(apps, schema_editor, on_delete='CASCADE'):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    with connection.cursor() as cursor:
+        for table, column, target in CASCADE_FOREIGN_KEYS:
+            constraints = connection.introspection.get_constraints(
+                cursor, table
+            )
+            for name, info in constraints.items():
+                if not info['foreign_key'] or info['columns'] != [column]:
+                    continue
+                schema_editor.execute(
+                    f'ALTER TABLE {quote(table)} '
+                    f'DROP CONSTRAINT {quote(name)}'
+                )
+                schema_editor.execute(
+                    f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} '
+                    f'FOREIGN KEY ({quote(column)}) '
+                    f'REFERENCES {quote(target)} ("id") '
+                    f'ON DELETE {on_delete} DEFERRABLE INITIALLY DEFERRED'
+                )
+
+
+def unset_db_cascade(apps, schema_editor):
+    set_db_cascade(apps, schema_editor, on_delete='NO ACTION')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_author_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurgeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('title', 'Title'), ('user', 'User')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10)),
+                ('deleted_comments', models.PositiveIntegerField(default=0)),
+                ('deleted_reviews', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ('pk',),
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(set_db_cascade, unset_db_cascade),
+    ]
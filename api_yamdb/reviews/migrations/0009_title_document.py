@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-19 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_hidden_purge_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleDocument',
+            fields=[
+                ('title_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('document', models.JSONField()),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purgejob',
+            name='heartbeat',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
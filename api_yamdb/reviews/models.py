@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models import Avg, Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.core.validators import MaxValueValidator, MinValueValidator
 
 from users.models import User
+from .constants import PurgeJobKind, PurgeJobStatus
+from .signals import titles_changed
 from .validators import validate_year
 
 
@@ -15,7 +19,7 @@ class Genre(models.Model):
     - name: Название жанра (максимальная длина - 200 символов).
     - slug: Уникальный слаг для жанра, используемый в URL.
     """
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
     slug = models.SlugField(unique=True)
 
     class Meta:
@@ -35,7 +39,7 @@ class Category(models.Model):
     - name: Название типа произведения (максимальная длина - 256 символов).
     - slug: Уникальный слаг для типа, используемый в URL.
     """
-    name = models.CharField(max_length=256)
+    name = models.CharField(max_length=256, db_index=True)
     slug = models.SlugField(unique=True)
 
     class Meta:
@@ -45,14 +49,65 @@ class Category(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def visible(self):
+        """Произведения, не помеченные к удалению."""
+        return self.filter(is_hidden=False)
+
+    def refresh_ratings(self):
+        """
+        Пересчитывает rating и review_count выбранных произведений
+        одним UPDATE с подзапросами по отзывам.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        updated = self.update(
+            rating=Subquery(
+                reviews.annotate(avg=Avg('score')).values('avg')
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(cnt=Count('pk')).values('cnt')), 0
+            ),
+        )
+        self.notify_changed()
+        return updated
+
+    def notify_changed(self):
+        """Сообщает подписчикам titles_changed об изменении произведений."""
+        if titles_changed.has_listeners(Title):
+            titles_changed.send(
+                sender=Title,
+                title_ids=list(self.values_list('pk', flat=True))
+            )
+
+
 class Title(models.Model):
-    name = models.CharField(max_length=256)
-    year = models.IntegerField(validators=[validate_year])
+    """
+    Модель произведения.
+
+    Атрибуты rating и review_count денормализованы: они хранят среднюю
+    оценку и число отзывов и обновляются через refresh_ratings() при
+    изменении отзывов, чтобы по ним можно было фильтровать
+    и сортировать по индексу.
+
+    Атрибут is_hidden выставляется при удалении: произведение сразу
+    пропадает из API, а его отзывы и комментарии удаляет фоновая
+    задача PurgeJob.
+    """
+    name = models.CharField(max_length=256, db_index=True)
+    year = models.IntegerField(validators=[validate_year], db_index=True)
     description = models.TextField(blank=True)
     genre = models.ManyToManyField(Genre, related_name='titles')
     category = models.ForeignKey(
         Category, on_delete=models.SET_NULL, related_name='titles', null=True
     )
+    rating = models.FloatField(null=True, blank=True, db_index=True)
+    review_count = models.PositiveIntegerField(default=0, db_index=True)
+    is_hidden = models.BooleanField(default=False, db_index=True)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ('name',)
@@ -61,7 +116,47 @@ class Title(models.Model):
         return self.name
 
 
+class TitleDocument(models.Model):
+    """
+    Готовое к отдаче представление произведения (модель чтения).
+
+    Атрибут document хранит JSON произведения в том виде, в каком его
+    отдаёт API: с категорией, жанрами и рейтингом. Документ есть только
+    у видимых произведений, его обновляет конвейер reviews.changes,
+    а целиком хранилище пересобирает команда rebuild_title_documents.
+    Внешнего ключа нет: таблица не участвует в удалении произведений.
+    """
+    title_id = models.BigIntegerField(primary_key=True)
+    document = models.JSONField()
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Document of title {self.title_id}'
+
+
+class ReviewQuerySet(models.QuerySet):
+
+    def refresh_comment_counts(self):
+        """Пересчитывает comment_count выбранных отзывов одним UPDATE."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review')
+        return self.update(comment_count=Coalesce(
+            Subquery(comments.annotate(cnt=Count('pk')).values('cnt')), 0
+        ))
+
+    def change_comment_count(self, delta):
+        """Атомарно сдвигает comment_count на delta без чтения строки."""
+        return self.update(comment_count=F('comment_count') + delta)
+
+
 class Review(models.Model):
+    """
+    Модель отзыва на произведение.
+
+    Атрибут comment_count денормализован и хранит число комментариев
+    к отзыву, чтобы клиентам не нужно было запрашивать их список.
+    """
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -77,10 +172,29 @@ class Review(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(10)]
     )
     pub_date = models.DateTimeField(auto_now_add=True)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
         unique_together = ('author', 'title')
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date'), name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=('title', 'score'), name='review_title_score_idx'
+            ),
+            models.Index(
+                fields=('title', 'comment_count'),
+                name='review_title_comments_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='review_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text
@@ -108,6 +222,52 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date'),
+                name='comment_review_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='comment_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+
+class PurgeJob(models.Model):
+    """
+    Фоновая задача удаления объекта вместе со связанным контентом.
+
+    Атрибуты:
+    - kind: Тип удаляемого объекта (произведение или пользователь).
+    - object_id: ID удаляемого объекта.
+    - status: Состояние задачи.
+    - deleted_comments, deleted_reviews: Прогресс удаления.
+    - error: Текст ошибки, если задача завершилась неудачно.
+    - heartbeat: Время последнего признака жизни обработчика; задачу
+      в статусе running без него дольше PURGE_JOB_STALE_AFTER секунд
+      забирает другой обработчик.
+    """
+    kind = models.CharField(max_length=10, choices=PurgeJobKind.CHOICES)
+    object_id = models.BigIntegerField()
+    status = models.CharField(
+        max_length=10,
+        choices=PurgeJobStatus.CHOICES,
+        default=PurgeJobStatus.PENDING,
+        db_index=True
+    )
+    deleted_comments = models.PositiveIntegerField(default=0)
+    deleted_reviews = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    heartbeat = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('pk',)
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}: {self.status}'
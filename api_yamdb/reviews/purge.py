@@ -0,0 +1,232 @@
+"""
+Фоновое удаление произведений и пользователей вместе с их контентом.
+
+Удаление через CASCADE-коллектор Django загружает в память все
+связанные объекты и держит одну длинную транзакцию. Здесь контент
+удаляется по частям: сначала комментарии, затем отзывы, затем сам
+объект, каждая часть — отдельная короткая транзакция по диапазону id.
+
+Режим запуска задач задаёт настройка PURGE_JOBS_MODE:
+- 'thread' — в фоновом потоке сразу после коммита запроса;
+- 'inline' — синхронно после коммита (удобно для тестов и отладки);
+- 'queue' — задачи выполняет команда process_purge_jobs.
+
+Обработчик отмечает задачу heartbeat при захвате и после каждой
+порции. Задачу, прерванную падением или перезапуском процесса, после
+PURGE_JOB_STALE_AFTER секунд без heartbeat снова забирает
+process_purge_jobs, поэтому в режиме 'thread' команду тоже нужно
+запускать, например по расписанию с --once. Удаление по частям
+идемпотентно: повторный запуск доудаляет оставшиеся строки.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .constants import PurgeJobKind, PurgeJobStatus
+from .models import Comment, PurgeJob, Review, Title, User
+
+logger = logging.getLogger(__name__)
+
+PURGE_HANDLERS = {}
+
+
+def purge_handler(kind):
+    """Регистрирует функцию удаления для типа задачи."""
+    def decorator(func):
+        PURGE_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def schedule_purge(kind, object_id):
+    """
+    Создаёт задачу удаления и запускает её после коммита транзакции.
+
+    Если для объекта уже есть незавершённая задача, возвращает её:
+    повторный DELETE не ставит вторую задачу на те же строки.
+    """
+    job = PurgeJob.objects.filter(
+        kind=kind, object_id=object_id,
+        status__in=(PurgeJobStatus.PENDING, PurgeJobStatus.RUNNING)
+    ).first()
+    if job is not None:
+        return job
+    job = PurgeJob.objects.create(kind=kind, object_id=object_id)
+    transaction.on_commit(lambda: dispatch_job(job.pk))
+    return job
+
+
+def dispatch_job(job_id):
+    mode = settings.PURGE_JOBS_MODE
+    if mode == 'inline':
+        run_job(job_id)
+    elif mode == 'thread':
+        # Поток не демонический: при штатной остановке процесс
+        # дожидается задачи, а не обрывает её на середине.
+        threading.Thread(target=run_job_in_thread, args=(job_id,)).start()
+
+
+def run_job_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
+
+
+def claimable_jobs():
+    """Задачи, ожидающие запуска или брошенные упавшим обработчиком."""
+    stale = timezone.now() - timedelta(
+        seconds=settings.PURGE_JOB_STALE_AFTER
+    )
+    return PurgeJob.objects.filter(
+        Q(status=PurgeJobStatus.PENDING)
+        | Q(status=PurgeJobStatus.RUNNING, heartbeat__lt=stale)
+        | Q(status=PurgeJobStatus.RUNNING, heartbeat__isnull=True)
+    )
+
+
+def touch(job):
+    PurgeJob.objects.filter(pk=job.pk).update(heartbeat=timezone.now())
+
+
+def run_job(job_id, chunk_size=None):
+    """
+    Выполняет задачу, если её ещё не взял другой обработчик
+    или если её обработчик перестал отмечать heartbeat.
+
+    Возвращает True, если задача была выполнена этим вызовом.
+    """
+    claimed = claimable_jobs().filter(pk=job_id).update(
+        status=PurgeJobStatus.RUNNING, heartbeat=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    job = PurgeJob.objects.get(pk=job_id)
+    try:
+        PURGE_HANDLERS[job.kind](
+            job, chunk_size or settings.PURGE_CHUNK_SIZE
+        )
+    except Exception as error:
+        logger.exception('Purge job %s failed', job_id)
+        PurgeJob.objects.filter(pk=job_id).update(
+            status=PurgeJobStatus.FAILED,
+            error=str(error),
+            finished=timezone.now()
+        )
+        return True
+    PurgeJob.objects.filter(pk=job_id).update(
+        status=PurgeJobStatus.DONE, finished=timezone.now()
+    )
+    return True
+
+
+def delete_in_chunks(queryset, chunk_size, job, counter_field,
+                     collect_field=None, on_chunk=None):
+    """
+    Удаляет строки queryset порциями по chunk_size, двигаясь по id.
+
+    Каждая порция удаляется по диапазону id внутри своей транзакции,
+    прогресс сохраняется в поле counter_field задачи. Если указан
+    collect_field, значения этого поля удалённых строк собираются
+    и возвращаются; on_chunk вызывается с ними внутри транзакции порции.
+    """
+    collected = set()
+    total = 0
+    last_id = 0
+    while True:
+        ids = list(
+            queryset.filter(pk__gt=last_id).order_by('pk').values_list(
+                'pk', flat=True
+            )[:chunk_size]
+        )
+        if not ids:
+            return collected
+        last_id = ids[-1]
+        chunk = queryset.filter(pk__range=(ids[0], last_id))
+        with transaction.atomic():
+            values = set()
+            if collect_field:
+                values = set(chunk.values_list(collect_field, flat=True))
+            deleted, _ = chunk.delete()
+            if on_chunk:
+                on_chunk(values)
+        collected |= values
+        total += deleted
+        PurgeJob.objects.filter(pk=job.pk).update(
+            heartbeat=timezone.now(),
+            **{counter_field: F(counter_field) + deleted}
+        )
+        logger.info(
+            'Purge job %s: %s %s deleted', job.pk, total, counter_field
+        )
+
+
+def in_batches(values, size):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def use_db_cascade():
+    """ON DELETE CASCADE на уровне базы включён и поддерживается."""
+    return (
+        settings.PURGE_DB_CASCADE and connection.vendor == 'postgresql'
+    )
+
+
+@purge_handler(PurgeJobKind.TITLE)
+def purge_title(job, chunk_size):
+    titles = Title.objects.filter(pk=job.object_id)
+    if use_db_cascade():
+        # Внешние ключи объявлены с ON DELETE CASCADE (миграция 0008),
+        # база удаляет отзывы, комментарии и связи с жанрами сама,
+        # поэтому коллектор Django обходим.
+        titles._raw_delete(titles.db)
+        return
+    delete_in_chunks(
+        Comment.objects.filter(review__title_id=job.object_id),
+        chunk_size, job, 'deleted_comments'
+    )
+    delete_in_chunks(
+        Review.objects.filter(title_id=job.object_id),
+        chunk_size, job, 'deleted_reviews'
+    )
+    titles.delete()
+
+
+@purge_handler(PurgeJobKind.USER)
+def purge_user(job, chunk_size):
+    """
+    Удаляет комментарии и отзывы пользователя, затем его самого.
+
+    Счётчики комментариев затронутых отзывов обновляются в каждой
+    порции, рейтинги произведений пересчитываются один раз в конце
+    пакетными UPDATE, а не после каждого удалённого отзыва.
+    """
+    delete_in_chunks(
+        Comment.objects.filter(author_id=job.object_id),
+        chunk_size, job, 'deleted_comments',
+        collect_field='review_id',
+        on_chunk=lambda review_ids: Review.objects.filter(
+            pk__in=review_ids
+        ).refresh_comment_counts()
+    )
+    delete_in_chunks(
+        Comment.objects.filter(review__author_id=job.object_id),
+        chunk_size, job, 'deleted_comments'
+    )
+    title_ids = delete_in_chunks(
+        Review.objects.filter(author_id=job.object_id),
+        chunk_size, job, 'deleted_reviews',
+        collect_field='title_id'
+    )
+    for batch in in_batches(title_ids, chunk_size):
+        Title.objects.filter(pk__in=batch).refresh_ratings()
+        touch(job)
+    User.objects.filter(pk=job.object_id).delete()
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Отправляется, когда данные произведений меняются в обход save():
+# массовым UPDATE (рейтинг, скрытие при удалении). Аргумент title_ids —
+# список id изменённых произведений.
+titles_changed = Signal()
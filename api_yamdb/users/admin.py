@@ -1,11 +1,14 @@
 from django.contrib import admin
+from reviews.admin import CascadeCountersAdminMixin
 
 from .models import User
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(CascadeCountersAdminMixin, admin.ModelAdmin):
+    review_lookup = 'author'
+    comment_lookup = 'author'
     list_display = ('username', 'email', 'first_name',
                     'last_name', 'role', 'bio')
-    search_fields = ('username', 'email')
+    search_fields = ('username__prefix', 'email__prefix')
     ordering = ('username',)
@@ -8,3 +8,11 @@ class UserRole:
         (MODERATOR, 'Moderator'),
         (ADMIN, 'Admin'),
     ]
+
+
+# Флаги Django, которые получает пользователь, созданный администратором.
+ROLE_FLAGS = {
+    UserRole.USER: {},
+    UserRole.MODERATOR: {'is_staff': True},
+    UserRole.ADMIN: {'is_staff': True, 'is_superuser': True},
+}
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,28 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def purge_jobs_inline(settings):
+    """Фоновые задачи удаления выполняются сразу после коммита."""
+    settings.PURGE_JOBS_MODE = 'inline'
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(settings, tmp_path_factory):
+    """Общий файловый кэш — в своём каталоге для каждого теста."""
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path_factory.mktemp('shared_cache')),
+    }}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """LocMem-кэш живёт весь прогон, а id объектов между тестами повторяются."""
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
@@ -1,8 +1,11 @@
+import threading
 from http import HTTPStatus
 
 import pytest
 from django.core import mail
+from django.db import connection
 from django.db.utils import IntegrityError
+from rest_framework.test import APIClient
 
 from tests.utils import (
     invalid_data_for_user_patch_and_creation,
@@ -375,3 +378,46 @@ class Test00UserRegistration:
             'пользователя, созданного администратором,  возвращает ответ '
             'со статусом 200.'
         )
+
+    def test_concurrent_signup_same_user(self, django_user_model):
+        threads_count = 8
+        valid_data = {
+            'email': 'concurrent@yamdb.fake',
+            'username': 'concurrent_user'
+        }
+        barrier = threading.Barrier(threads_count)
+        statuses = []
+        errors = []
+
+        def signup():
+            try:
+                barrier.wait()
+                response = APIClient().post(self.URL_SIGNUP, data=valid_data)
+                statuses.append(response.status_code)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=signup) for _ in range(threads_count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, (
+            f'Параллельные POST-запросы к `{self.URL_SIGNUP}` с одинаковыми '
+            f'данными не должны завершаться исключением: {errors[0]!r}'
+        )
+        assert statuses == [HTTPStatus.OK] * threads_count, (
+            f'Параллельные POST-запросы к `{self.URL_SIGNUP}` с одинаковыми '
+            'данными должны возвращать ответ со статусом 200.'
+        )
+        assert django_user_model.objects.filter(
+            username=valid_data['username']
+        ).count() == 1, (
+            f'Параллельные POST-запросы к `{self.URL_SIGNUP}` с одинаковыми '
+            'данными должны создавать ровно одного пользователя.'
+        )
@@ -1,9 +1,11 @@
 from http import HTTPStatus
 
 import pytest
+from django.core.management import call_command
 
+from reviews.models import Comment, PurgeJob, Review, Title
 from tests.utils import (
-    check_pagination, invalid_data_for_user_patch_and_creation
+    check_pagination, create_comments, invalid_data_for_user_patch_and_creation
 )
 
 
@@ -564,3 +566,99 @@ class Test01UserAPI:
             f'Проверьте, что PATCH-запрос к `{self.USERS_ME_URL}` с ключом '
             '`role` не изменяет роль пользователя.'
         )
+
+    def test_11_users_activity(self, client, admin_client, admin,
+                               user_client, user, moderator_client,
+                               moderator, django_assert_max_num_queries):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        _, _, titles = create_comments(admin_client, author_map)
+
+        url = f'{self.USERS_URL}{user.username}/reviews/'
+        with django_assert_max_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert 'next' in data and len(data['results']) == 1, (
+            f'Проверьте, что `{url}` возвращает постраничный список отзывов '
+            'пользователя.'
+        )
+        review = data['results'][0]
+        assert (review['author'] == user.username
+                and review['title_name'] == titles[0]['name']), (
+            f'Проверьте, что каждый отзыв в ответе `{url}` содержит автора '
+            'и название произведения.'
+        )
+
+        url = f'{self.USERS_ME_URL}comments/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{url}` возвращает ответ со статусом 401.'
+        )
+        response = user_client.get(url)
+        comments = response.json()['results']
+        assert (len(comments) == 1
+                and comments[0]['title_id'] == titles[0]['id']), (
+            f'Проверьте, что `{url}` возвращает комментарии текущего '
+            'пользователя вместе с произведением.'
+        )
+
+    def test_12_users_delete_purges_in_background(self, admin_client, admin,
+                                                  user_client, user,
+                                                  moderator_client, moderator,
+                                                  django_user_model, settings):
+        settings.PURGE_JOBS_MODE = 'queue'
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+
+        response = admin_client.delete(f'{self.USERS_URL}{admin.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not django_user_model.objects.get(pk=admin.pk).is_active, (
+            'Проверьте, что DELETE-запрос к `/api/v1/users/{username}/` '
+            'сразу отключает учётную запись.'
+        )
+        assert admin_client.get(self.USERS_ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токен отключённого пользователя не принимается.'
+
+        call_command('process_purge_jobs', '--once', '--chunk-size=1')
+
+        assert not django_user_model.objects.filter(pk=admin.pk).exists()
+        assert not Review.objects.filter(author=admin).exists()
+        assert not Comment.objects.filter(review_id=reviews[0]['id']).exists()
+        remaining = Review.objects.filter(title_id=titles[0]['id'])
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.review_count == remaining.count() == 2, (
+            'Проверьте, что после удаления пользователя пересчитываются '
+            'рейтинги и число отзывов затронутых произведений.'
+        )
+
+    def test_13_users_repeated_delete(self, client, admin_client, user,
+                                      settings):
+        settings.PURGE_JOBS_MODE = 'queue'
+        url = f'{self.USERS_URL}{user.username}/'
+        for _ in range(2):
+            response = admin_client.delete(url)
+            assert response.status_code == HTTPStatus.NO_CONTENT
+        assert PurgeJob.objects.filter(object_id=user.pk).count() == 1, (
+            f'Проверьте, что повторный DELETE-запрос к `{url}` не ставит '
+            'вторую задачу удаления, пока первая не завершена.'
+        )
+
+        for suffix in ('reviews/', 'comments/'):
+            response = client.get(f'{url}{suffix}')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}{suffix}` для '
+                'отключённого пользователя возвращает ответ со статусом 404.'
+            )
@@ -1,10 +1,14 @@
+from datetime import timedelta
 from http import HTTPStatus
 
 import pytest
+from django.core.management import call_command
+from django.utils import timezone
 
+from reviews.models import Comment, PurgeJob, Review, Title
 from tests.utils import (
     check_pagination, check_permissions, create_categories, create_genre,
-    create_titles
+    create_single_comment, create_single_review, create_titles
 )
 
 
@@ -353,3 +357,126 @@ class Test04TitleAPI:
             f'Проверьте, что PUT-запрос к `{self.TITLES_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_titles_range_and_multi_value_filters(self, admin_client,
+                                                     user_client):
+        titles, categories, genres = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 8)
+
+        expected = (
+            ('year_min=1985', {titles[1]['id']}),
+            ('year_max=1985', {titles[0]['id']}),
+            ('year_min=1980&year_max=1990',
+             {titles[0]['id'], titles[1]['id']}),
+            ('rating_min=7', {titles[0]['id']}),
+            ('rating_max=7', set()),
+            ('min_reviews=1', {titles[0]['id']}),
+            (f'category={categories[0]["slug"]},{categories[1]["slug"]}',
+             {titles[0]['id'], titles[1]['id']}),
+            (f'genre={genres[0]["slug"]},{genres[1]["slug"]}',
+             {titles[0]['id']}),
+            (f'genre={genres[0]["slug"]},{genres[2]["slug"]}',
+             {titles[0]['id'], titles[1]['id']}),
+            (f'genre={genres[0]["slug"]},{genres[1]["slug"]}&genre_match=all',
+             {titles[0]['id']}),
+            (f'genre={genres[0]["slug"]},{genres[2]["slug"]}&genre_match=all',
+             set()),
+        )
+        for query, title_ids in expected:
+            response = admin_client.get(f'{self.TITLES_URL}?{query}')
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            ids = [title['id'] for title in data['results']]
+            assert len(ids) == len(title_ids) and set(ids) == title_ids, (
+                f'Проверьте, что фильтр `{self.TITLES_URL}?{query}` '
+                'возвращает подходящие произведения без повторов.'
+            )
+            assert data['count'] == len(title_ids), (
+                f'Проверьте, что для `{self.TITLES_URL}?{query}` ключ `count` '
+                'учитывает каждое произведение один раз.'
+            )
+
+    def test_08_titles_ordering_whitelist(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+
+        response = client.get(f'{self.TITLES_URL}?ordering=-year')
+        assert response.status_code == HTTPStatus.OK
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [titles[1]['id'], titles[0]['id']], (
+            f'Проверьте, что `{self.TITLES_URL}?ordering=-year` сортирует '
+            'произведения по убыванию года выпуска.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}?ordering=description')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что сортировка `{self.TITLES_URL}` по полю, '
+            'отсутствующему в `ordering_fields`, возвращает ответ со '
+            'статусом 400.'
+        )
+
+    def test_09_title_delete_purges_in_background(self, admin_client,
+                                                  user_client, settings):
+        settings.PURGE_JOBS_MODE = 'queue'
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Отзыв', 5)
+        for text in ('Первый', 'Второй', 'Третий'):
+            create_single_comment(
+                user_client, title_id, review.json()['id'], text
+            )
+
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что после DELETE-запроса к `{url}` произведение '
+            'сразу становится недоступным.'
+        )
+        assert Review.objects.filter(title_id=title_id).exists(), (
+            'Проверьте, что отзывы удаляются фоновой задачей, а не в '
+            'запросе на удаление произведения.'
+        )
+
+        call_command('process_purge_jobs', '--once', '--chunk-size=2')
+
+        job = PurgeJob.objects.get(object_id=title_id)
+        assert job.status == 'done'
+        assert (job.deleted_comments, job.deleted_reviews) == (3, 1), (
+            'Проверьте, что задача удаления сохраняет прогресс удаления '
+            'комментариев и отзывов.'
+        )
+        assert not Title.objects.filter(pk=title_id).exists()
+        assert not Comment.objects.filter(review__title_id=title_id).exists()
+        assert Title.objects.filter(pk=titles[1]['id']).exists()
+
+    def test_10_stale_purge_job_is_resumed(self, admin_client, user_client,
+                                           settings):
+        settings.PURGE_JOBS_MODE = 'queue'
+        titles, _, _ = create_titles(admin_client)
+        crashed, busy = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, crashed, 'Отзыв', 5)
+        for title_id in (crashed, busy):
+            admin_client.delete(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+            )
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.PURGE_JOB_STALE_AFTER + 1)
+        PurgeJob.objects.filter(object_id=crashed).update(
+            status='running', heartbeat=stale
+        )
+        PurgeJob.objects.filter(object_id=busy).update(
+            status='running', heartbeat=now
+        )
+
+        call_command('process_purge_jobs', '--once')
+
+        assert PurgeJob.objects.get(object_id=crashed).status == 'done', (
+            'Проверьте, что задача, брошенная упавшим обработчиком, '
+            'снова выполняется после PURGE_JOB_STALE_AFTER секунд.'
+        )
+        assert not Title.objects.filter(pk=crashed).exists()
+        assert not Review.objects.filter(title_id=crashed).exists()
+        assert PurgeJob.objects.get(object_id=busy).status == 'running', (
+            'Проверьте, что выполняющаяся задача не запускается повторно.'
+        )
+        assert Title.objects.filter(pk=busy).exists()
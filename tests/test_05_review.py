@@ -1,7 +1,9 @@
 from http import HTTPStatus
 
 import pytest
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 
 from tests.utils import (
     check_fields, check_pagination, create_reviews, create_single_review,
@@ -413,3 +415,82 @@ class Test05ReviewAPI:
             f'Проверьте, что PUT-запрос к `{self.REVIEW_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_reviews_pagination_without_count_scan(
+            self, client, admin_client, admin, user_client, user,
+            moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        _, titles = create_reviews(admin_client, author_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}?limit=2')
+        data = response.json()
+        assert data['count'] == 3 and len(data['results']) == 2
+        assert data['next'], (
+            f'Проверьте, что для `{url}` ключ `next` заполнен, если '
+            'за текущей страницей есть ещё отзывы.'
+        )
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), (
+            f'Проверьте, что `count` для `{url}` берётся из '
+            '`Title.review_count`, а не из запроса COUNT(*).'
+        )
+
+        response = client.get(f'{url}?limit=2&offset=2&count=false')
+        data = response.json()
+        assert 'count' not in data and data['next'] is None, (
+            f'Проверьте, что запрос `{url}?count=false` не возвращает '
+            '`count`, а на последней странице `next` равен None.'
+        )
+
+    def test_08_list_counts_cached_until_change(self, client, admin_client,
+                                                settings):
+        titles, categories, genres = create_titles(admin_client)
+        titles_url = f'/api/v1/titles/?category={categories[0]["slug"]}'
+
+        def get_count(url):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            counted = any(
+                'COUNT(' in query['sql'] for query in context.captured_queries
+            )
+            return response.json()['count'], counted
+
+        assert get_count(titles_url) == (1, True)
+        assert get_count(titles_url) == (1, False), (
+            f'Проверьте, что повторный запрос `{titles_url}` берёт `count` '
+            'из кэша, а не из запроса COUNT(*).'
+        )
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        assert get_count(titles_url) == (2, True), (
+            f'Проверьте, что после создания произведения `count` для '
+            f'`{titles_url}` пересчитывается.'
+        )
+
+        genres_url = '/api/v1/genres/'
+        assert get_count(genres_url) == (len(genres), True)
+        assert get_count(genres_url) == (len(genres), False)
+        admin_client.delete(f'{genres_url}{genres[0]["slug"]}/')
+        assert get_count(genres_url) == (len(genres) - 1, True), (
+            f'Проверьте, что после удаления жанра `count` для `{genres_url}` '
+            'пересчитывается.'
+        )
+
+        settings.LIST_COUNT_CACHE_ALIAS = 'default'
+        assert get_count(genres_url) == (len(genres) - 1, True)
+        assert get_count(genres_url) == (len(genres) - 1, True), (
+            'Проверьте, что в кэше памяти процесса число объектов '
+            'не кэшируется.'
+        )
@@ -366,3 +366,36 @@ class Test06CommentAPI:
             f'Проверьте, что PUT-запрос к `{self.COMMENT_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_08_review_comment_count(self, client, admin_client, admin,
+                                     user_client, user, moderator_client,
+                                     moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = client.get(f'{reviews_url}?ordering=-comment_count')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert results[0]['id'] == reviews[0]['id'], (
+            f'Проверьте, что `{reviews_url}` поддерживает сортировку по '
+            '`comment_count`.'
+        )
+        assert results[0]['comment_count'] == len(comments), (
+            f'Проверьте, что ответ на GET-запрос к `{reviews_url}` содержит '
+            'поле `comment_count` с числом комментариев к отзыву.'
+        )
+
+        admin_client.delete(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id'],
+            comment_id=comments[0]['id']
+        ))
+        response = client.get(f'{reviews_url}{reviews[0]["id"]}/')
+        assert response.json()['comment_count'] == len(comments) - 1, (
+            'Проверьте, что удаление комментария уменьшает `comment_count` '
+            'отзыва.'
+        )
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from api_yamdb.replicas import get_client_key
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+class Test08DatabaseReplicas:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.fixture(autouse=True)
+    def read_replicas(self, settings):
+        settings.READ_REPLICAS = ['replica']
+
+    def request(self, method, *args, **kwargs):
+        with CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['replica']) as replica:
+                response = method(*args, **kwargs)
+        return response, len(primary), len(replica)
+
+    def test_01_safe_requests_read_from_replica(self, client, admin_client,
+                                               settings):
+        create_titles(admin_client)
+        caches[settings.PRIMARY_STICKINESS_CACHE_ALIAS].clear()
+
+        response, primary, replica = self.request(client.get, self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert replica and not primary, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` читает данные '
+            'с реплики, а не из основной базы.'
+        )
+
+    def test_02_writes_stick_to_primary(self, admin_client, user_client,
+                                        client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        response, primary, replica = self.request(
+            user_client.post, url, data={'text': 'Отзыв', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert primary and not replica, (
+            f'Проверьте, что POST-запрос к `{url}` работает только с '
+            'основной базой.'
+        )
+
+        response, primary, replica = self.request(user_client.get, url)
+        assert response.status_code == HTTPStatus.OK
+        assert primary and not replica, (
+            'Проверьте, что после записи клиент читает из основной базы '
+            'в течение `PRIMARY_STICKINESS_SECONDS`.'
+        )
+
+        response, primary, replica = self.request(client.get, url)
+        assert replica and not primary, (
+            'Проверьте, что запись одного клиента не переключает чтение '
+            'остальных клиентов на основную базу.'
+        )
+
+    def test_03_stickiness_expires(self, admin_client, user_client,
+                                   settings):
+        settings.PRIMARY_STICKINESS_SECONDS = 0
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+
+        response, primary, replica = self.request(user_client.get, url)
+        assert replica and not primary, (
+            'Проверьте, что по истечении `PRIMARY_STICKINESS_SECONDS` '
+            'клиент снова читает с реплики.'
+        )
+
+    def test_04_stale_replica(self, admin_client, user_client, client,
+                              settings):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Реплика в тестах не получает записей основной базы.'
+        )
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            review['text'] for review in response.json()['results']
+        ] == ['Отзыв'], (
+            'Проверьте, что после записи клиент видит её, даже если '
+            'реплика отстаёт.'
+        )
+        # Следующий запрос клиента может обработать другой воркер.
+        other_worker = FileBasedCache(
+            settings.CACHES[settings.PRIMARY_STICKINESS_CACHE_ALIAS][
+                'LOCATION'
+            ], {}
+        )
+        assert other_worker.get(get_client_key(response.wsgi_request)), (
+            'Проверьте, что отметка о записи хранится в кэше, общем для '
+            'всех воркеров.'
+        )
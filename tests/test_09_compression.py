@@ -0,0 +1,77 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+
+from api_yamdb import compression
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09Compression:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def small_threshold(self, settings):
+        settings.COMPRESSION_MIN_SIZE = 100
+        caches[settings.COMPRESSION_CACHE_ALIAS].clear()
+
+    def test_01_gzip_response(self, client, admin_client):
+        create_titles(admin_client)
+        plain = client.get(self.TITLES_URL)
+
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Encoding'] == 'gzip', (
+            f'Проверьте, что ответ `{self.TITLES_URL}` сжимается, если клиент '
+            'передал `Accept-Encoding: gzip`.'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert json.loads(gzip.decompress(response.content)) == plain.json()
+
+    def test_02_compressed_body_is_cached(self, client, admin_client,
+                                          monkeypatch):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        def fail(content):
+            raise AssertionError('Повторный ответ сжат заново.')
+
+        monkeypatch.setitem(compression.COMPRESSORS, 'gzip', fail)
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что одинаковые ответы берут сжатое тело из кэша.'
+        )
+
+    def test_03_no_compression_without_accept_encoding(self, client,
+                                                       admin_client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        assert not response.has_header('Content-Encoding')
+
+    def test_04_only_repeated_responses_are_cached(self, client,
+                                                   admin_client, settings):
+        create_titles(admin_client)
+        compression_cache = caches[settings.COMPRESSION_CACHE_ALIAS]
+        response = admin_client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response['Content-Encoding'] == 'gzip'
+        settings.COMPRESSION_CACHE_ROUTES = ('genre-list',)
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        assert not compression_cache._cache, (
+            'Проверьте, что ответы авторизованным пользователям и маршрутам '
+            'не из `COMPRESSION_CACHE_ROUTES` сжимаются без кэша.'
+        )
+        settings.COMPRESSION_CACHE_ROUTES = ('title-list',)
+        client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert len(compression_cache._cache) == 1
+        assert not caches['default']._cache, (
+            'Проверьте, что сжатые тела лежат в отдельном кэше.'
+        )
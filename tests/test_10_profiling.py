@@ -0,0 +1,52 @@
+import pstats
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10Profiling:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def profiling(self, settings, tmp_path):
+        settings.PROFILING_SECRET = 'secret'
+        settings.PROFILING_DIR = tmp_path
+        return tmp_path
+
+    def test_01_profile_by_secret_header(self, client, profiling):
+        response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not list(profiling.iterdir()), (
+            'Проверьте, что запросы без заголовка `X-Profile` не '
+            'профилируются.'
+        )
+
+        client.get(self.TITLES_URL, HTTP_X_PROFILE='wrong')
+        assert not list(profiling.iterdir())
+
+        response = client.get(self.TITLES_URL, HTTP_X_PROFILE='секрет')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что заголовок `X-Profile` с не-ASCII символами '
+            'не приводит к ошибке сервера.'
+        )
+        assert not list(profiling.iterdir())
+
+        client.get(self.TITLES_URL, HTTP_X_PROFILE='secret')
+        profiles = list((profiling / 'title-list').glob('*.prof'))
+        assert len(profiles) == 1, (
+            'Проверьте, что запрос с верным заголовком `X-Profile` '
+            'сохраняет профиль в каталог view.'
+        )
+        assert pstats.Stats(str(profiles[0])).total_calls
+
+    def test_02_collapsed_stacks(self, client, profiling, settings):
+        settings.PROFILING_FORMAT = 'collapsed'
+        settings.PROFILING_INTERVAL = 0.0001
+        client.get(self.TITLES_URL, HTTP_X_PROFILE='secret')
+        profiles = list((profiling / 'title-list').glob('*.collapsed'))
+        assert len(profiles) == 1
+        for line in profiles[0].read_text(encoding='utf-8').splitlines():
+            stack, count = line.rsplit(' ', 1)
+            assert ';' in stack and int(count) > 0
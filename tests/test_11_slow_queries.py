@@ -0,0 +1,89 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api_yamdb import slow_queries
+from api_yamdb.slow_queries import install, normalize_sql, record_slow_query
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11SlowQueries:
+
+    @pytest.fixture
+    def slow_query_log(self, settings, tmp_path):
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        settings.SLOW_QUERY_LOG = tmp_path / 'slow.jsonl'
+        install(connection)
+        yield settings.SLOW_QUERY_LOG
+        connection.execute_wrappers.remove(record_slow_query)
+
+    def test_01_normalize_sql(self):
+        assert normalize_sql(
+            'SELECT "a" FROM "t"  WHERE "b" IN (%s, %s, %s)\n'
+            "AND \"c\" = 'x' LIMIT 21"
+        ) == 'SELECT "a" FROM "t" WHERE "b" IN (...) AND "c" = %s LIMIT %s'
+
+    def test_02_slow_queries_logged_with_plan(self, client, slow_query_log):
+        client.get('/api/v1/titles/?name=test')
+        entries = [
+            json.loads(line)
+            for line in slow_query_log.read_text(encoding='utf-8').splitlines()
+        ]
+        selects = [
+            entry for entry in entries
+            if entry['sql'].startswith('SELECT')
+            and 'reviews_title' in entry['sql']
+        ]
+        assert selects, (
+            'Проверьте, что запросы дольше порога записываются в журнал.'
+        )
+        entry = selects[0]
+        assert entry['origin'] == 'view title-list', (
+            'Проверьте, что для запроса записывается маршрут, '
+            'который его выполнил.'
+        )
+        assert entry['plan'], (
+            'Проверьте, что для SELECT сохраняется план выполнения.'
+        )
+        assert 'test' in entry['params']
+        assert any('api/' in frame for frame in entry['chain'])
+
+        output = StringIO()
+        call_command('slow_queries_report', stdout=output)
+        report = output.getvalue()
+        assert 'view title-list' in report
+        assert 'plan:' in report
+
+    def test_03_failed_explain_rolls_back_to_savepoint(self, slow_query_log,
+                                                       monkeypatch):
+        monkeypatch.setitem(
+            slow_queries.EXPLAIN_PREFIXES, connection.vendor, 'NOT SQL '
+        )
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 2')
+                assert cursor.fetchone() == (2,)
+        entry = next(
+            entry for entry in map(
+                json.loads,
+                slow_query_log.read_text(encoding='utf-8').splitlines()
+            )
+            if entry['sql'] == 'SELECT %s'
+        )
+        assert entry['plan'][0].startswith('EXPLAIN failed'), (
+            'Проверьте, что ошибка EXPLAIN записывается вместо плана.'
+        )
+        assert any(
+            query['sql'].startswith('ROLLBACK TO SAVEPOINT')
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что неудачный EXPLAIN внутри транзакции '
+            'откатывается к точке сохранения и не прерывает транзакцию.'
+        )
@@ -0,0 +1,141 @@
+import gc
+import re
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from api_yamdb import metrics
+
+
+def get_metric(text, name, **labels):
+    for line in text.splitlines():
+        if not line.startswith(name + '{') and not line.startswith(name + ' '):
+            continue
+        if all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Metrics:
+
+    @pytest.fixture(autouse=True)
+    def clean_metrics(self):
+        metrics.reset()
+        yield
+        metrics.reset()
+
+    def test_01_metrics_per_route(self, client):
+        for _ in range(3):
+            client.get('/api/v1/titles/?offset=20')
+        client.get('/api/v1/genres/')
+
+        response = client.get('/metrics')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+
+        assert get_metric(
+            text, 'yamdb_requests_total', route='title-list', status='200'
+        ) == 3, 'Проверьте, что запросы считаются по имени маршрута.'
+        assert get_metric(
+            text, 'yamdb_request_duration_seconds_count', route='title-list'
+        ) == 3
+        assert get_metric(
+            text, 'yamdb_request_duration_seconds_bucket',
+            route='genre-list', le='+Inf'
+        ) == 1
+        assert get_metric(
+            text, 'yamdb_db_queries_total', route='title-list'
+        ) >= 3, 'Проверьте, что считаются запросы к базе.'
+        assert get_metric(
+            text, 'yamdb_pagination_offset_bucket', route='title-list',
+            le='50.0'
+        ) == 3
+        assert get_metric(
+            text, 'yamdb_purge_jobs', status='pending'
+        ) == 0
+        assert re.search(r'# TYPE yamdb_throttled_requests_total counter', text)
+
+    def test_02_multiprocess_mode(self, client, settings, tmp_path):
+        settings.METRICS_MULTIPROCESS_DIR = str(tmp_path)
+        (tmp_path / '1-worker.json').write_text(
+            '{"counters": [["yamdb_requests_total", '
+            '[["method", "GET"], ["route", "title-list"], ["status", "200"]],'
+            ' 5]], "histograms": []}'
+        )
+        client.get('/api/v1/titles/')
+        text = client.get('/metrics').content.decode()
+        assert get_metric(
+            text, 'yamdb_requests_total', route='title-list', status='200'
+        ) == 6, (
+            'Проверьте, что в многопроцессном режиме метрики '
+            'суммируются по всем процессам.'
+        )
+
+    def test_03_finished_threads_are_folded(self):
+        def work():
+            metrics.inc('yamdb_db_queries_total', route='thread')
+            metrics.observe(
+                'yamdb_request_duration_seconds', 0.01, route='thread'
+            )
+
+        for _ in range(50):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+        del thread
+        gc.collect()
+        counters, histograms = metrics.snapshot()
+        key = (('route', 'thread'),)
+        assert counters['yamdb_db_queries_total', key] == 50
+        assert histograms['yamdb_request_duration_seconds', key][2] == 50
+        assert len(metrics._shards) <= 2, (
+            'Проверьте, что метрики завершившихся потоков переносятся '
+            'в общий итог процесса, а их наборы не хранятся.'
+        )
+
+    def test_04_access_control(self, client, settings):
+        settings.METRICS_ALLOWED_IPS = ()
+        assert client.get('/metrics').status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что /metrics недоступен с адресов не из '
+            'METRICS_ALLOWED_IPS.'
+        )
+        settings.METRICS_SECRET = 'секрет'
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer другой'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer секрет'
+        ).status_code == HTTPStatus.OK
+        settings.METRICS_ALLOWED_IPS = ('127.0.0.1',)
+        assert client.get('/metrics').status_code == HTTPStatus.OK
+
+    def test_05_dead_workers_are_retired(self, client, settings, tmp_path):
+        settings.METRICS_MULTIPROCESS_DIR = str(tmp_path)
+        for name in ('100-first', '101-second'):
+            (tmp_path / f'{name}.json').write_text(
+                '{"counters": [["yamdb_db_queries_total", '
+                '[["route", "title-list"]], 2]], "histograms": []}'
+            )
+        (tmp_path / '102-third.tmp').write_text('{"counters": [')
+
+        def queries():
+            text = client.get('/metrics').content.decode()
+            return get_metric(
+                text, 'yamdb_db_queries_total', route='title-list'
+            )
+
+        assert queries() == 4
+        metrics.retire_process(tmp_path, 100)
+        assert queries() == 4, (
+            'Проверьте, что метрики завершившегося воркера сохраняются '
+            'в общем итоге и не считаются дважды.'
+        )
+        metrics.retire_process(tmp_path, 101)
+        metrics.retire_process(tmp_path, 102)
+        assert queries() == 4
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            f'{metrics._snapshot_name}.json', metrics.RETIRED_FILE
+        ], 'Проверьте, что снимки завершившихся воркеров удаляются.'
@@ -0,0 +1,62 @@
+import re
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+User = get_user_model()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13LoadTest:
+
+    @pytest.fixture
+    def collection_users(self):
+        # Пользователи, которых создаёт postman_collection/set_up_data.sh.
+        User.objects.create_superuser(
+            'superuser', 'superuser@admin.ru', '5eCretPaSsw0rD'
+        )
+        User.objects.create_user(
+            'admin-user', 'admin-user@admin.ru', role='admin'
+        )
+        User.objects.create_user(
+            'moderator', 'moderator@admin.ru', role='moderator'
+        )
+
+    def test_01_replay_collection(self, live_server, collection_users):
+        output = StringIO()
+        call_command(
+            'load_test', base_url=live_server.url, users=2,
+            folder=['categories', 'titles'], stdout=output
+        )
+        lines = output.getvalue().splitlines()
+        assert lines[0] == '2 virtual users x 1 iterations x 47 requests'
+        assert re.fullmatch(
+            r'94 requests in [\d.]+s, [\d.]+ req/s, errors 0\.0%', lines[1]
+        ), 'Проверьте, что запросы коллекции выполняются без ошибок сервера.'
+        assert lines[2].split() == [
+            'folder', 'reqs', 'req/s', 'errors', 'unexp.',
+            'p50', 'ms', 'p90', 'ms', 'p99', 'ms',
+        ]
+        rows = {}
+        for line in lines[3:]:
+            folder, reqs, rate, errors, unexpected, *latencies = line.split()
+            assert float(rate) > 0
+            assert errors == '0.0%', (
+                f'Проверьте, что в папке `{folder}` нет ошибок сервера.'
+            )
+            assert 0 <= float(unexpected.rstrip('%')) <= 100
+            p50, p90, p99 = map(float, latencies)
+            assert 0 < p50 <= p90 <= p99
+            rows[folder] = int(reqs)
+        # Число запросов в папке коллекции, умноженное на двух пользователей.
+        assert rows == {
+            'categories/categories_creation': 4,
+            'categories/categories_creation_bad_requests': 18,
+            'categories': 2,
+            'titles/titles_creation': 6,
+            'titles/get_titles_info': 12,
+            'titles/update_titles': 6,
+            'titles/titles_bad_requests': 46,
+        }, 'Проверьте, что отчёт содержит строку для каждой папки сценария.'
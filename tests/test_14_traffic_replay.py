@@ -0,0 +1,91 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api_yamdb.traffic import read_traffic
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TrafficReplay:
+
+    @pytest.fixture
+    def traffic_dir(self, settings, tmp_path):
+        settings.TRAFFIC_CAPTURE_RATE = 1
+        settings.TRAFFIC_CAPTURE_DIR = tmp_path
+        return tmp_path
+
+    def test_01_capture(self, admin_client, client, traffic_dir):
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'},
+            format='json'
+        )
+        client.get('/api/v1/categories/?search=%D0%A4%D0%B8')
+        client.post(
+            '/api/v1/auth/signup/',
+            data={'username': 'capture', 'email': 'capture@yamdb.fake'},
+            content_type='application/json'
+        )
+
+        entries = read_traffic(traffic_dir)
+        assert [entry['method'] for entry in entries] == [
+            'POST', 'GET', 'POST'
+        ], 'Проверьте, что при TRAFFIC_CAPTURE_RATE = 1 пишутся все запросы.'
+        create, search, signup = entries
+        assert create['identity'] == 'admin', (
+            'Проверьте, что в записи сохраняется класс пользователя.'
+        )
+        assert create['route'] == 'category-list'
+        assert json.loads(create['body'])['slug'] == 'films'
+        assert search['identity'] == 'anonymous'
+        assert search['query'] == 'search=%D0%A4%D0%B8'
+        assert 'body' not in signup and 'body_sha256' in signup, (
+            'Проверьте, что тела запросов к /auth/ не сохраняются.'
+        )
+
+    def test_02_sensitive_fields(self, admin_client, traffic_dir):
+        admin_client.post('/api/v1/users/', data={
+            'username': 'capture', 'email': 'capture@yamdb.fake',
+            'password': 'секрет',
+        }, format='json')
+        admin_client.post('/api/v1/genres/', data={
+            'name': 'Драма', 'slug': 'drama', 'extra': [{'token': 'x'}],
+        }, format='json')
+        admin_client.post(
+            '/api/v1/genres/', data='name=Комедия&slug=comedy',
+            content_type='application/x-www-form-urlencoded'
+        )
+        admin_client.post('/api/v1/genres/', data={
+            'name': 'Триллер', 'slug': 'thriller'
+        }, format='multipart')
+
+        user, nested, form, multipart = read_traffic(traffic_dir)
+        for entry in (user, nested, multipart):
+            assert 'body' not in entry and 'body_sha256' in entry, (
+                'Проверьте, что тела с паролями и токенами, а также тела, '
+                'которые не удалось разобрать, не сохраняются.'
+            )
+        assert form['body'] == 'name=Комедия&slug=comedy'
+
+    def test_03_replay(self, admin_client, live_server, traffic_dir,
+                       settings):
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'},
+            format='json'
+        )
+        admin_client.delete('/api/v1/categories/films/')
+        admin_client.get('/api/v1/categories/')
+        settings.TRAFFIC_CAPTURE_RATE = 0
+
+        output = StringIO()
+        call_command(
+            'replay_traffic', base_url=live_server.url, speed=0,
+            concurrency=1, stdout=output
+        )
+        report = output.getvalue()
+        assert 'Replaying 3 requests' in report
+        assert '0 with a different status than recorded' in report, (
+            'Проверьте, что трафик воспроизводится с теми же ответами.'
+        )
+        assert 'category-list' in report
@@ -0,0 +1,30 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15SqliteTuning:
+
+    def test_01_pragmas_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal', (
+                'Проверьте, что соединения SQLite работают в режиме WAL.'
+            )
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 5000
+            cursor.execute('PRAGMA synchronous')
+            # 1 — NORMAL.
+            assert cursor.fetchone()[0] == 1
+
+    def test_02_benchmark(self):
+        output = StringIO()
+        call_command(
+            'benchmark_sqlite', readers=2, writers=2, duration=0.2,
+            reviews=100, stdout=output
+        )
+        report = output.getvalue()
+        assert 'default' in report and 'tuned' in report
@@ -0,0 +1,70 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, transaction
+
+from api_yamdb.write_queue import run_write, write_queue
+from reviews.models import Category, Title
+from tests.utils import create_titles
+
+
+def pending_commit_callbacks(name):
+    Category.objects.create(name=name, slug=name)
+    transaction.on_commit(lambda: None)
+    return len(connection.run_on_commit)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16WriteQueue:
+
+    @pytest.fixture(autouse=True)
+    def enable_write_queue(self, settings):
+        settings.WRITE_QUEUE_ENABLED = True
+        settings.WRITE_QUEUE_WINDOW_MS = 200
+        yield
+        write_queue.stop()
+
+    def test_01_group_commit(self):
+        barrier = threading.Barrier(5)
+        results = []
+
+        def submit(index):
+            barrier.wait()
+            results.append(run_write(pending_commit_callbacks, f'c{index}'))
+
+        threads = [
+            threading.Thread(target=submit, args=(index,))
+            for index in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert Category.objects.count() == 5
+        assert max(results) > 1, (
+            'Проверьте, что записи, пришедшие в пределах окна, '
+            'коммитятся одной транзакцией.'
+        )
+
+    def test_02_failed_job_is_isolated(self):
+        def fail():
+            Category.objects.create(name='broken', slug='broken')
+            raise ValueError('broken')
+
+        with pytest.raises(ValueError):
+            run_write(fail)
+        run_write(Category.objects.create, name='ok', slug='ok')
+        assert list(Category.objects.values_list('slug', flat=True)) == [
+            'ok'
+        ], 'Проверьте, что ошибка задания откатывает только его изменения.'
+
+    def test_03_review_through_queue(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating, title.review_count) == (7, 1)
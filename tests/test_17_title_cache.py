@@ -0,0 +1,140 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import title_cache
+from api_yamdb import metrics
+from reviews.models import Genre, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleCache:
+
+    @pytest.fixture(autouse=True)
+    def clean_metrics(self):
+        metrics.reset()
+        yield
+        metrics.reset()
+
+    def get_title(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_repeated_reads_are_cached(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        first = self.get_title(client, titles[0]['id'])
+        with CaptureQueriesContext(connection) as queries:
+            second = self.get_title(client, titles[0]['id'])
+        assert second == first
+        assert not queries.captured_queries, (
+            'Проверьте, что повторный GET-запрос к `/api/v1/titles/{id}/` '
+            'отдаёт карточку из кэша без запросов к базе.'
+        )
+        text = client.get('/metrics').content.decode()
+        assert (
+            'yamdb_cache_hit_ratio{cache="title_detail"} 0.5' in text
+        ), 'Проверьте, что доля попаданий в кэш карточек экспортируется.'
+
+    def test_02_reviews_invalidate(self, client, admin_client,
+                                   user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_title(client, title_id)['rating'] is None
+        response = create_single_review(user_client, title_id, 'Текст', 7)
+        assert self.get_title(client, title_id)['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш карточки.'
+        )
+        review_url = f'/api/v1/titles/{title_id}/reviews/'
+        user_client.patch(
+            f'{review_url}{response.json()["id"]}/', data={'score': 3},
+            format='json'
+        )
+        assert self.get_title(client, title_id)['rating'] == 3, (
+            'Проверьте, что изменение отзыва сбрасывает кэш карточки.'
+        )
+        user_client.delete(f'{review_url}{response.json()["id"]}/')
+        assert self.get_title(client, title_id)['rating'] is None, (
+            'Проверьте, что удаление отзыва сбрасывает кэш карточки.'
+        )
+
+    def test_03_title_and_genres_invalidate(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        title_id = titles[0]['id']
+        self.get_title(client, title_id)
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/',
+            data={'name': 'Терминатор 2', 'genre': [genres[2]['slug']]},
+            format='json'
+        )
+        title = self.get_title(client, title_id)
+        assert title['name'] == 'Терминатор 2'
+        assert [genre['slug'] for genre in title['genre']] == ['drama'], (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш.'
+        )
+        Genre.objects.get(slug='comedy').titles.add(title_id)
+        assert len(self.get_title(client, title_id)['genre']) == 2, (
+            'Проверьте, что изменение связи со стороны жанра сбрасывает кэш.'
+        )
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что удалённое произведение не отдаётся из кэша.'
+        )
+
+    def test_04_renames_invalidate(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        self.get_title(client, title_id)
+        title = Title.objects.get(pk=title_id)
+        category = title.category
+        category.name = 'Кино'
+        category.save()
+        assert self.get_title(client, title_id)['category']['name'] == (
+            'Кино'
+        ), 'Проверьте, что переименование категории сбрасывает кэш.'
+        genre = title.genre.get(slug='horror')
+        genre.name = 'Хоррор'
+        genre.save()
+        names = [
+            genre['name'] for genre in self.get_title(client, title_id)['genre']
+        ]
+        assert 'Хоррор' in names, (
+            'Проверьте, что переименование жанра сбрасывает кэш.'
+        )
+
+    def test_05_invalidation_is_seen_by_other_workers(self, settings,
+                                                      monkeypatch):
+        location = settings.CACHES['shared']['LOCATION']
+        worker, other_worker = (
+            FileBasedCache(location, {}), FileBasedCache(location, {})
+        )
+        monkeypatch.setattr(title_cache, 'get_cache', lambda: worker)
+        _, version = title_cache.get_detail(1)
+        title_cache.set_detail(1, version, {'rating': 5})
+        assert title_cache.get_detail(1)[0] == {'rating': 5}
+        monkeypatch.setattr(title_cache, 'get_cache', lambda: other_worker)
+        title_cache.invalidate([1])
+        monkeypatch.setattr(title_cache, 'get_cache', lambda: worker)
+        assert title_cache.get_detail(1)[0] is None, (
+            'Проверьте, что сброс кэша карточки в одном воркере '
+            'виден другим воркерам.'
+        )
+
+    def test_06_process_local_cache_is_not_used(self, client, admin_client,
+                                                settings):
+        settings.TITLE_CACHE_ALIAS = 'default'
+        titles, _, _ = create_titles(admin_client)
+        self.get_title(client, titles[0]['id'])
+        self.get_title(client, titles[0]['id'])
+        assert not caches['default'].get(
+            title_cache.DETAIL_KEY.format(titles[0]['id'])
+        ), (
+            'Проверьте, что карточки не кэшируются в памяти процесса, '
+            'где другие воркеры не могут их сбросить.'
+        )
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from api import title_documents
+from reviews.models import Genre, TitleDocument
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleDocuments:
+
+    def test_01_documents_follow_changes(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        document = TitleDocument.objects.get(pk=title_id).document
+        assert document == admin_client.get(
+            f'/api/v1/titles/{title_id}/'
+        ).json(), (
+            'Проверьте, что документ произведения совпадает с ответом API.'
+        )
+        create_single_review(user_client, title_id, 'Текст', 8)
+        document = TitleDocument.objects.get(pk=title_id).document
+        assert document['rating'] == 8, (
+            'Проверьте, что новый отзыв обновляет документ произведения.'
+        )
+        genre = Genre.objects.get(slug='horror')
+        genre.name = 'Хоррор'
+        genre.save()
+        document = TitleDocument.objects.get(pk=title_id).document
+        assert 'Хоррор' in [genre['name'] for genre in document['genre']], (
+            'Проверьте, что переименование жанра обновляет документы '
+            'всех его произведений.'
+        )
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        assert not TitleDocument.objects.filter(pk=title_id).exists(), (
+            'Проверьте, что у удалённого произведения нет документа.'
+        )
+
+    def test_02_reads_use_documents(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[1]['id']
+        document = TitleDocument.objects.get(pk=title_id).document
+        document['description'] = 'Из хранилища документов'
+        TitleDocument.objects.filter(pk=title_id).update(document=document)
+        response = client.get('/api/v1/titles/?genre=drama')
+        assert [
+            title['description'] for title in response.json()['results']
+        ] == ['Из хранилища документов'], (
+            'Проверьте, что список произведений с фильтрами отдаётся '
+            'из хранилища документов.'
+        )
+        assert client.get(f'/api/v1/titles/{title_id}/').json() == document
+
+    def test_03_missing_documents_fall_back(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        expected = client.get('/api/v1/titles/').json()
+        TitleDocument.objects.all().delete()
+        assert client.get('/api/v1/titles/').json() == expected, (
+            'Проверьте, что произведения без документа строятся '
+            'сериализатором.'
+        )
+
+    def test_04_hidden_titles_are_not_served(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/'
+        assert client.get(url).status_code == HTTPStatus.OK
+        with mock.patch.object(
+            title_documents, 'build_documents', side_effect=RuntimeError
+        ):
+            admin_client.delete(url)
+        assert TitleDocument.objects.filter(pk=title_id).exists()
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что документ скрытого произведения не отдаётся, '
+            'даже если его не удалось удалить из хранилища.'
+        )
+        assert title_id not in [
+            title['id'] for title in client.get('/api/v1/titles/').json()[
+                'results'
+            ]
+        ]
+
+    def test_05_rebuild_command(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        expected = dict(
+            TitleDocument.objects.values_list('title_id', 'document')
+        )
+        TitleDocument.objects.all().delete()
+        TitleDocument.objects.create(title_id=10 ** 6, document={})
+        call_command(
+            'rebuild_title_documents', batch_size=1, workers=2,
+            stdout=StringIO()
+        )
+        assert dict(
+            TitleDocument.objects.values_list('title_id', 'document')
+        ) == expected, (
+            'Проверьте, что rebuild_title_documents собирает документы '
+            'всех видимых произведений и удаляет лишние.'
+        )
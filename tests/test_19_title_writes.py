@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre, Title
+from tests.utils import create_categories
+
+
+def through_queries(queries, statement):
+    return [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith(statement)
+        and '"reviews_title_genre"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleWrites:
+
+    @pytest.fixture(autouse=True)
+    def genres(self):
+        return Genre.objects.bulk_create(
+            Genre(name=f'Жанр {index}', slug=f'genre-{index}')
+            for index in range(5)
+        )
+
+    def create_title(self, admin_client, genres):
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': 'Произведение', 'year': 2000, 'category': 'films',
+                'genre': [genre.slug for genre in genres],
+            }, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        return response.json(), len(queries)
+
+    def test_01_create_queries_do_not_depend_on_genres(self, admin_client,
+                                                       genres):
+        create_categories(admin_client)
+        _, one_genre = self.create_title(admin_client, genres[:1])
+        title, five_genres = self.create_title(admin_client, genres)
+        assert five_genres == one_genre, (
+            'Проверьте, что число запросов при создании произведения '
+            'не зависит от числа жанров.'
+        )
+        assert [genre['slug'] for genre in title['genre']] == [
+            genre.slug for genre in genres
+        ]
+
+    def test_02_genre_update_is_a_diff(self, admin_client, genres):
+        create_categories(admin_client)
+        title, _ = self.create_title(admin_client, genres[:3])
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.patch(
+                f'/api/v1/titles/{title["id"]}/',
+                data={'genre': [genres[2].slug, genres[3].slug,
+                                genres[4].slug]},
+                format='json'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert len(through_queries(queries, 'DELETE')) == 1, (
+            'Проверьте, что лишние жанры удаляются одним запросом.'
+        )
+        assert len(through_queries(queries, 'INSERT')) == 1, (
+            'Проверьте, что новые жанры добавляются одним запросом.'
+        )
+        assert set(
+            Title.objects.get(pk=title['id']).genre.values_list(
+                'slug', flat=True
+            )
+        ) == {'genre-2', 'genre-3', 'genre-4'}
+
+    def test_03_unknown_genre(self, admin_client, genres):
+        create_categories(admin_client)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Произведение', 'year': 2000, 'category': 'films',
+            'genre': [genres[0].slug, 'unknown'],
+        }, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'genre': ['Object with slug=unknown does not exist.']
+        }, (
+            'Проверьте, что несуществующий жанр возвращает ту же ошибку, '
+            'что и SlugRelatedField.'
+        )
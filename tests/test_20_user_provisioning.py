@@ -0,0 +1,173 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import provisioning
+from api_yamdb.traffic import read_traffic
+from users.models import User
+
+URL = '/api/auth/admin/create/bulk/'
+
+
+def user_rows(count, prefix='bulk'):
+    return [
+        {'username': f'{prefix}{index}', 'email': f'{prefix}{index}@yamdb.fake'}
+        for index in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20UserProvisioning:
+
+    @pytest.fixture(autouse=True)
+    def hash_workers(self, settings):
+        settings.USER_PROVISION_WORKERS = 2
+
+    def test_01_per_row_results(self, admin_client, user):
+        rows = [
+            {'username': 'moder', 'email': 'moder@yamdb.fake',
+             'role': 'moderator', 'password': 'Ne-prostoi-parol-1'},
+            {'username': 'reader', 'email': 'reader@yamdb.fake',
+             'password': 'Ne-prostoi-parol-2', 'bio': 'bio'},
+            {'username': user.username, 'email': 'other@yamdb.fake'},
+            {'username': 'twin', 'email': 'reader@yamdb.fake'},
+            {'username': 'me', 'email': 'me@yamdb.fake'},
+            {'username': 'editor', 'email': 'editor@yamdb.fake',
+             'role': 'admin'},
+        ]
+        response = admin_client.post(URL, data=rows, format='json')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['created'], data['failed']) == (3, 3)
+        assert [result['status'] for result in data['results']] == [
+            'created', 'created', 'error', 'error', 'error', 'created'
+        ], 'Проверьте, что результат возвращается по каждой строке.'
+        assert 'username' in data['results'][2]['errors']
+        assert 'email' in data['results'][3]['errors'], (
+            'Проверьте, что повтор email внутри запроса отклоняется.'
+        )
+        moder = User.objects.get(username='moder')
+        assert data['results'][0]['id'] == moder.pk
+        assert moder.role == 'moderator' and moder.is_staff
+        assert moder.check_password('Ne-prostoi-parol-1'), (
+            'Проверьте, что переданный пароль сохраняется в виде хэша.'
+        )
+        editor = User.objects.get(username='editor')
+        assert editor.is_superuser and not editor.has_usable_password()
+
+    def test_02_uniqueness_is_one_query(self, admin_client):
+        def count_queries(rows):
+            with CaptureQueriesContext(connection) as queries:
+                response = admin_client.post(URL, data=rows, format='json')
+            assert response.json()['created'] == len(rows)
+            return len(queries)
+
+        assert count_queries(user_rows(5, 'a')) == count_queries(
+            user_rows(50, 'b')
+        ), 'Проверьте, что число запросов не зависит от числа строк.'
+
+    def test_03_permissions(self, client, user_client):
+        assert client.post(
+            URL, data=user_rows(1), content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(
+            URL, data=user_rows(1), format='json'
+        ).status_code == HTTPStatus.FORBIDDEN
+
+    def test_04_command(self, tmp_path):
+        path = tmp_path / 'users.csv'
+        path.write_text(
+            'username,email,role,password\n'
+            'first,first@yamdb.fake,moderator,Ne-prostoi-parol-1\n'
+            'second,second@yamdb.fake,,\n'
+            'first,third@yamdb.fake,,\n',
+            encoding='utf-8'
+        )
+        report = tmp_path / 'report.json'
+        call_command(
+            'provision_users', str(path), report=str(report),
+            stdout=StringIO()
+        )
+        summary = json.loads(report.read_text(encoding='utf-8'))
+        assert (summary['created'], summary['failed']) == (2, 1)
+        assert User.objects.get(username='second').role == 'user'
+
+    def test_05_admin_create_is_one_write(self, admin_client):
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post('/api/auth/admin/create/', data={
+                'username': 'single', 'email': 'single@yamdb.fake',
+                'role': 'moderator',
+            }, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        writes = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE'))
+        ]
+        assert len(writes) == 1, (
+            'Проверьте, что пользователь с ролью создаётся одним запросом.'
+        )
+        assert User.objects.get(username='single').role == 'moderator'
+
+    def test_06_bodies_are_not_captured(self, admin_client, settings,
+                                        tmp_path):
+        settings.TRAFFIC_CAPTURE_RATE = 1
+        settings.TRAFFIC_CAPTURE_DIR = tmp_path
+        admin_client.post(URL, data=user_rows(2), format='json')
+        admin_client.post('/api/auth/admin/create/', data={
+            'username': 'single', 'email': 'single@yamdb.fake',
+        }, format='json')
+        entries = read_traffic(tmp_path)
+        assert len(entries) == 2
+        for entry in entries:
+            assert 'body' not in entry and 'body_sha256' in entry, (
+                'Проверьте, что тела запросов создания пользователей '
+                'не сохраняются в записи трафика.'
+            )
+
+    def test_07_password_rows_are_capped(self, admin_client, settings):
+        settings.USER_PROVISION_MAX_PASSWORD_ROWS = 1
+        rows = user_rows(3)
+        rows[0]['password'] = rows[1]['password'] = 'Ne-prostoi-parol-1'
+        response = admin_client.post(URL, data=rows, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что число строк с паролями в одном запросе '
+            'ограничено USER_PROVISION_MAX_PASSWORD_ROWS.'
+        )
+        assert not User.objects.filter(username__startswith='bulk').exists()
+        del rows[1]['password']
+        response = admin_client.post(URL, data=rows, format='json')
+        assert response.json()['created'] == 3
+
+    def test_08_concurrent_conflicts(self):
+        User.objects.create(username='taken', email='taken@yamdb.fake')
+        rows = [
+            {'username': 'taken', 'email': 'free@yamdb.fake'},
+            {'username': 'free', 'email': 'taken@yamdb.fake'},
+            {'username': 'new', 'email': 'new@yamdb.fake'},
+        ]
+        # Параллельный запрос занял строки между проверкой и вставкой.
+        with mock.patch.object(provisioning, 'reject_duplicates'):
+            results = provisioning.provision_users(rows, workers=1)
+        assert [result.get('errors') for result in results] == [
+            {'username': [provisioning.USERNAME_TAKEN]},
+            {'email': [provisioning.EMAIL_TAKEN]},
+            None,
+        ], 'Проверьте, что в ошибке указано поле, которое оказалось занято.'
+
+    def test_09_request_does_not_start_processes(self, admin_client):
+        rows = user_rows(2)
+        for row in rows:
+            row['password'] = 'Ne-prostoi-parol-1'
+        with mock.patch.object(
+            provisioning, 'ProcessPoolExecutor', side_effect=AssertionError
+        ):
+            response = admin_client.post(URL, data=rows, format='json')
+        assert response.json()['created'] == 2, (
+            'Проверьте, что HTTP-запрос хэширует пароли без пула процессов.'
+        )
@@ -0,0 +1,87 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import authentication
+from users.models import User
+
+URL_ME = '/api/v1/users/me/'
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21AuthTokens:
+
+    @pytest.fixture(autouse=True)
+    def clear_tokens(self):
+        authentication.verified_tokens.clear()
+        yield
+        authentication.verified_tokens.clear()
+
+    def test_01_token_obtain(self, client, user):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/v1/auth/token/', data={
+                'username': user.username,
+                'confirmation_code': default_token_generator.make_token(user),
+            })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert token['user_id'] == user.pk
+        selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"users_user"' in query['sql']
+        ]
+        assert len(selects) == 1, (
+            'Проверьте, что при выдаче токена пользователь загружается '
+            'из базы один раз.'
+        )
+        assert client_for(token).get(URL_ME).status_code == HTTPStatus.OK
+
+    def test_02_verified_tokens_are_cached(self, user):
+        token = str(AccessToken.for_user(user))
+        client = client_for(token)
+        assert client.get(URL_ME).status_code == HTTPStatus.OK
+        with mock.patch.object(
+            authentication.JWTAuthentication, 'get_validated_token'
+        ) as verify:
+            assert client.get(URL_ME).status_code == HTTPStatus.OK
+        verify.assert_not_called()
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        assert client.get(URL_ME).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен из кэша не пропускает '
+            'деактивированного пользователя.'
+        )
+
+    def test_03_cache_is_bounded_and_expires(self, settings, user):
+        settings.JWT_VERIFIED_CACHE_SIZE = 2
+        tokens = [str(AccessToken.for_user(user)) for _ in range(3)]
+        for token in tokens:
+            client_for(token).get(URL_ME)
+        cached = authentication.verified_tokens.tokens
+        assert [raw.decode() for raw in cached] == tokens[1:], (
+            'Проверьте, что кэш хранит не больше JWT_VERIFIED_CACHE_SIZE '
+            'последних токенов.'
+        )
+        expires = AccessToken(tokens[2])['exp']
+        with mock.patch('time.time', return_value=expires + 1):
+            assert authentication.verified_tokens.get(
+                tokens[2].encode()
+            ) is None, 'Проверьте, что токен удаляется из кэша по сроку.'
+
+    def test_04_invalid_token_is_not_cached(self, user):
+        token = str(AccessToken.for_user(user))[:-2] + 'xx'
+        response = client_for(token).get(URL_ME)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert not authentication.verified_tokens.tokens
@@ -0,0 +1,72 @@
+import os
+import runpy
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.db import connection
+
+from api.filters import TitleFilter
+from api.serializers import TitleSerializer, TitleSerializerGet
+from api_yamdb import warmup
+from reviews.models import Genre
+from tests.conftest import MANAGE_PATH
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Warmup:
+
+    def test_01_routes_and_views(self):
+        views = warmup.resolve_routes()
+        assert any(
+            view.cls.__name__ == 'TitleViewSet' for view in views
+        ), 'Проверьте, что прогрев находит вьюсеты из api/urls.py.'
+        serializers, filtersets = warmup.warm_views(views)
+        assert {TitleSerializer, TitleSerializerGet} <= serializers, (
+            'Проверьте, что прогрев создаёт сериализаторы всех действий.'
+        )
+        assert TitleFilter in filtersets
+
+    def test_02_warmup_closes_connections(self):
+        Genre.objects.create(name='Драма', slug='drama')
+        summary = warmup.warmup(freeze=False)
+        assert summary['views'] and summary['serializers']
+        assert connection.connection is None, (
+            'Проверьте, что прогрев закрывает соединения с базой до fork.'
+        )
+
+    def test_03_gunicorn_config(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('METRICS_MULTIPROCESS_DIR', str(tmp_path))
+        config = runpy.run_path(os.path.join(MANAGE_PATH, 'gunicorn.conf.py'))
+        assert config['preload_app'] is True, (
+            'Проверьте, что gunicorn загружает приложение до fork воркеров.'
+        )
+        assert config['raw_env'] == [
+            f'METRICS_MULTIPROCESS_DIR={tmp_path}'
+        ], 'Проверьте, что воркеры gunicorn пишут метрики в общий каталог.'
+
+        (tmp_path / '123.json').write_text('{}')
+        (tmp_path / '124.tmp').write_text('{')
+        config['on_starting'](None)
+        assert not list(tmp_path.iterdir()), (
+            'Проверьте, что при запуске gunicorn удаляются снимки метрик '
+            'процессов прошлого запуска.'
+        )
+
+        (tmp_path / '200-worker.json').write_text(
+            '{"counters": [], "histograms": []}'
+        )
+        config['child_exit'](None, SimpleNamespace(pid=200))
+        assert [path.name for path in tmp_path.iterdir()] == [
+            'retired.json'
+        ], (
+            'Проверьте, что снимок завершившегося воркера переносится '
+            'в общий итог.'
+        )
+
+        with mock.patch.object(warmup, 'warmup') as run_warmup:
+            config['when_ready'](None)
+            run_warmup.assert_called_once_with()
+            monkeypatch.setenv('WARMUP_ENABLED', '0')
+            config['when_ready'](None)
+            run_warmup.assert_called_once_with()
@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from reviews import admin
+from reviews.admin import EstimatedCountPaginator
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Admin:
+
+    @pytest.fixture
+    def titles(self):
+        Title.objects.bulk_create(
+            Title(name=name, year=2000)
+            for name in ('Abc', 'Abcde', 'abc', 'Ab', 'Xyz')
+        )
+
+    def test_01_prefix_search(self, titles):
+        found = Title.objects.filter(name__prefix='Abc')
+        assert sorted(found.values_list('name', flat=True)) == [
+            'Abc', 'Abcde'
+        ], 'Проверьте, что поиск по префиксу учитывает регистр.'
+        with connection.cursor() as cursor:
+            sql, params = found.values('pk').query.sql_with_params()
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert 'SEARCH' in plan and 'INDEX' in plan, (
+            'Проверьте, что поиск по префиксу читается по индексу.'
+        )
+
+    def test_02_admin_search(self, client, user_superuser, titles):
+        client.force_login(user_superuser)
+        response = client.get('/admin/reviews/title/', {'q': 'Abc'})
+        assert response.status_code == HTTPStatus.OK
+        names = [title.name for title in response.context['cl'].result_list]
+        assert names == ['Abc', 'Abcde'], (
+            'Проверьте, что поиск в админке ищет по префиксу названия.'
+        )
+
+    def test_03_paginator_counts_rows(self, titles, monkeypatch):
+        # Порог снижен, чтобы маленькая таблица считалась большой.
+        monkeypatch.setattr(admin, 'ESTIMATED_COUNT_THRESHOLD', 1)
+        Title.objects.exclude(name='Xyz').delete()
+        paginator = EstimatedCountPaginator(Title.objects.all(), 10)
+        assert paginator.count == 1, (
+            'Проверьте, что без статистики PostgreSQL пагинатор админки '
+            'считает строки, а не берёт максимальный id.'
+        )
+
+    def test_04_user_delete_refreshes_counters(self, client, user_superuser,
+                                               user, moderator, titles):
+        client.force_login(user_superuser)
+        title = Title.objects.get(name='Abc')
+        kept = Review.objects.create(
+            title=title, author=moderator, text='kept', score=4
+        )
+        Review.objects.create(title=title, author=user, text='gone', score=10)
+        Comment.objects.create(review=kept, author=user, text='gone')
+        Comment.objects.create(review=kept, author=moderator, text='kept')
+        Title.objects.filter(pk=title.pk).refresh_ratings()
+        Review.objects.filter(pk=kept.pk).refresh_comment_counts()
+
+        response = client.post(
+            f'/admin/users/user/{user.pk}/delete/', {'post': 'yes'}
+        )
+        assert response.status_code == HTTPStatus.FOUND
+        title.refresh_from_db()
+        kept.refresh_from_db()
+        assert (title.review_count, title.rating) == (1, 4), (
+            'Проверьте, что после удаления пользователя в админке '
+            'пересчитываются рейтинг и число отзывов его произведений.'
+        )
+        assert kept.comment_count == 1, (
+            'Проверьте, что после удаления пользователя в админке '
+            'пересчитывается число комментариев отзывов.'
+        )
+
+        response = client.post('/admin/users/user/', {
+            'action': 'delete_selected',
+            '_selected_action': [moderator.pk],
+            'post': 'yes',
+        })
+        assert response.status_code == HTTPStatus.FOUND
+        title.refresh_from_db()
+        assert (title.review_count, title.rating) == (0, None), (
+            'Проверьте, что удаление пользователей списком в админке '
+            'тоже пересчитывает рейтинг произведений.'
+        )
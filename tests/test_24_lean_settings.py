@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+LEAN_SETTINGS = 'api_yamdb.settings_api'
+
+# Запросы без обращения к базе: корень API, /users/me/ без токена
+# (аутентификация и права) и админка, которой в профиле нет.
+REQUESTS_SCRIPT = '''
+import json
+import django
+from django.test import Client
+
+django.setup()
+client = Client()
+print(json.dumps({
+    path: [response.status_code, response['Content-Type']]
+    for path, response in (
+        (path, client.get(path))
+        for path in ('/api/v1/', '/api/v1/users/me/', '/admin/')
+    )
+}))
+'''
+
+
+def run_lean(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=MANAGE_PATH,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': LEAN_SETTINGS},
+        capture_output=True, text=True
+    )
+
+
+class Test24LeanSettings:
+
+    def test_01_check(self):
+        process = run_lean('manage.py', 'check')
+        assert process.returncode == 0, process.stderr
+        assert 'no issues' in process.stdout, (
+            f'Проверьте, что `manage.py check` с профилем `{LEAN_SETTINGS}` '
+            'проходит без ошибок.'
+        )
+
+    def test_02_requests(self):
+        process = run_lean('-c', REQUESTS_SCRIPT)
+        assert process.returncode == 0, process.stderr
+        responses = json.loads(process.stdout.splitlines()[-1])
+        assert responses['/api/v1/'] == [200, 'application/json'], (
+            f'Проверьте, что с профилем `{LEAN_SETTINGS}` API отвечает JSON.'
+        )
+        assert responses['/api/v1/users/me/'][0] == 401, (
+            'Проверьте, что без middleware сессий анонимный запрос '
+            'к /users/me/ получает 401.'
+        )
+        assert responses['/admin/'][0] == 404, (
+            f'Проверьте, что в профиле `{LEAN_SETTINGS}` админка отключена.'
+        )
+
+    def test_03_profile_startup(self):
+        output = StringIO()
+        call_command(
+            'profile_startup', settings_module=LEAN_SETTINGS, runs=1,
+            path='/api/v1/', top=3, target=60, stdout=output
+        )
+        report = output.getvalue()
+        assert f'Settings: {LEAN_SETTINGS}, GET /api/v1/ -> 200 OK' in report
+        assert 'Top 3 modules by cumulative import time:' in report
+        assert 'Within target of 60.000s' in report, (
+            'Проверьте, что profile_startup измеряет время до первого ответа.'
+        )